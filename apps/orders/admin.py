@@ -13,8 +13,9 @@ from django.utils.timezone import now
 
 import stripe
 
-from apps.orders.models import Order, OrderItem, Cart, CartItem
+from apps.orders.models import Order, OrderItem, Cart, CartItem, StripeEvent
 from apps.orders.utils.order import update_order_from_stripe_session
+from apps.orders.utils.webhook_events import claim_for_replay, finish_event, process_event
 
 logger = logging.getLogger(__name__)
 
@@ -227,3 +228,74 @@ class CartItemAdmin(admin.ModelAdmin):
     list_display = ("cart", "product", "quantity")
     list_filter = ("product",)
     search_fields = ("product__name", "cart__user__username")
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ("event_id", "type", "status_badge", "attempts", "created_at", "processed_at")
+    list_filter = ("status", "type", "created_at")
+    search_fields = ("event_id",)
+    date_hierarchy = "created_at"
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "event_id", "type", "status", "attempts", "payload", "last_error",
+        "created_at", "updated_at", "processed_at",
+    )
+
+    actions = ["reprocess_events"]
+
+    # --- Permissions: superusers may inspect and replay, never edit ---
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def status_badge(self, obj: StripeEvent):
+        color = {
+            "processed": "#16a34a",   # green
+            "failed": "#dc2626",      # red
+            "processing": "#2563eb",  # blue
+        }.get(obj.status, "#6b7280")
+        return format_html(
+            '<span style="padding:2px 6px;border-radius:10px;background:{};color:#fff;font-size:12px;">{}</span>',
+            color, obj.get_status_display()
+        )
+    status_badge.short_description = "Status"
+
+    # --- Admin action: replay the stored payload ---
+    def reprocess_events(self, request, queryset):
+        ok = 0
+        errors = 0
+        busy = 0
+
+        for event in queryset:
+            # Claim it first, so a delivery still processing it is left alone
+            if not claim_for_replay(event.event_id):
+                busy += 1
+                continue
+            try:
+                process_event(event.payload)
+                finish_event(event.event_id)
+                ok += 1
+            except Exception as e:
+                errors += 1
+                finish_event(event.event_id, error=e)
+                logger.exception("Admin replay failed for Stripe event %s: %s", event.event_id, e)
+
+        if ok:
+            messages.success(request, f"Reprocessed {ok} event(s).")
+        if errors:
+            messages.error(request, f"Errors reprocessing {errors} event(s); see logs.")
+        if busy:
+            messages.warning(request, f"Skipped {busy} event(s) still being processed.")
+    reprocess_events.short_description = "Reprocess selected events"
@@ -0,0 +1,30 @@
+"""
+Middleware for the orders app.
+Attaches a lazily evaluated cart snapshot to every request and persists
+cookie-backed cart storage on the response.
+Located at apps/orders/middleware.py
+"""
+
+from apps.orders.utils.cart import CartSnapshot
+
+
+class CartMiddleware:
+    """
+    Expose `request.cart`, a CartSnapshot that is only computed when
+    something actually reads it (navbar, cart, checkout or payment views).
+    Must run after AuthenticationMiddleware.
+
+    On the way out, pending cart storage writes (the signed cart cookie)
+    are applied to the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.cart = CartSnapshot(request)
+        response = self.get_response(request)
+        storage = getattr(request, "cart_storage", None)
+        if storage is not None:
+            storage.update_response(response)
+        return response
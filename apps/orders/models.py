@@ -94,6 +94,11 @@ class Order(models.Model):
         blank=True, default=""
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="order_user_created"),
+        ]
+
     def has_shipping(self) -> bool:
         return bool(self.shipping_line1)
 
@@ -188,6 +193,11 @@ class Cart(models.Model):
     is_active = models.BooleanField(
         default=True
     )
+    # Bumped on every change to the cart's items; checked against the
+    # session cart header (see apps/orders/utils/cart.py)
+    version = models.PositiveIntegerField(
+        default=0
+    )
 
     def __str__(self):
         return f"Cart for {self.user.username} (Active: {self.is_active})"
@@ -222,3 +232,52 @@ class CartItem(models.Model):
 
     def subtotal(self):
         return self.quantity * self.product.price
+
+
+class StripeEvent(models.Model):
+    """
+    Ledger of Stripe webhook events, one row per event id. The unique
+    event_id lets a redelivered event be recognised with a single insert;
+    status and payload are kept for debugging and replay from the admin.
+    """
+    STATUS_CHOICES = (
+        ("processing", "Processing"),
+        ("processed", "Processed"),
+        ("failed", "Failed"),
+    )
+
+    event_id = models.CharField(
+        max_length=255, unique=True
+    )
+    type = models.CharField(
+        max_length=64
+    )
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default="processing"
+    )
+    attempts = models.PositiveIntegerField(
+        default=1
+    )
+    payload = models.JSONField(
+        default=dict
+    )
+    last_error = models.TextField(
+        blank=True, default=""
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+    processed_at = models.DateTimeField(
+        blank=True, null=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="stripe_event_status_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} ({self.type}, {self.status})"
@@ -6,52 +6,82 @@ Located at apps/orders/signals.py
 
 import logging
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils.timezone import now  # noqa: F401
 from apps.orders.models import Cart, CartItem
-from apps.orders.utils.cart import get_or_create_cart
+from apps.products.models import Product
+from apps.orders.utils.cart import bump_cart_version, discard_cart_header, get_or_create_cart, upsert_cart_items
+from apps.orders.utils.cart_storage import get_cart_storage
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(user_logged_in)
-def merge_session_cart(sender, request, user, **kwargs):
-    session_cart = request.session.get('cart', {}) or {}
-    if not session_cart:
-        return
-
-    db_cart = get_or_create_cart(user)
-
+def _session_product_quantities(session_cart):
+    """
+    Collapse the product lines of a session cart into {product_id: quantity}.
+    Bundles stay session-only and are skipped.
+    """
+    quantities = {}
     for key, item in session_cart.items():
-        # Skip bundles and any non-product entries
         if isinstance(key, str) and key.startswith("bundle_"):
             continue
 
-        product_id = item.get('product_id')
-        quantity = int(item.get('quantity', 1) or 1)
+        try:
+            product_id = int(item.get('product_id') or 0)
+            quantity = int(item.get('quantity', 1) or 1)
+        except (AttributeError, TypeError, ValueError):
+            continue
 
         if not product_id or quantity <= 0:
             continue
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+@receiver(user_logged_in)
+def merge_session_cart(sender, request, user, **kwargs):
+    """
+    Merge the guest session cart into the user's DB cart on login.
+
+    Runs in one transaction with a fixed number of queries regardless of the
+    number of lines: lines for products deleted since they were added are
+    dropped, and the rest are upserted (see upsert_cart_items), so a line
+    added concurrently from another session keeps both quantities. The
+    guest cart is only emptied once the merge has committed.
+    """
+    storage = get_cart_storage(request)
+    session_cart = storage.guest_cart()
+    if not session_cart:
+        return
+
+    incoming = _session_product_quantities(session_cart)
 
-        existing_item = db_cart.items.filter(product_id=product_id).first()
-        if existing_item:
-            existing_item.quantity += quantity
-            existing_item.save()
-            logger.debug(f"[Cart Merge] Updated quantity for product {product_id} in cart {db_cart.id}")
-        else:
-            CartItem.objects.create(cart=db_cart, product_id=product_id, quantity=quantity)
-            logger.debug(f"[Cart Merge] Added product {product_id} to cart {db_cart.id}")
-
-    request.session['cart'] = {}
-    request.session.modified = True
+    with transaction.atomic():
+        db_cart = get_or_create_cart(user)
+        if incoming:
+            live_ids = set(Product.objects.filter(pk__in=incoming).values_list("pk", flat=True))
+            merged = {product_id: quantity for product_id, quantity in incoming.items() if product_id in live_ids}
+            if merged:
+                upsert_cart_items(db_cart, merged)
+                bump_cart_version(user)
+
+            logger.debug(
+                f"[Cart Merge] Merged {len(merged)} lines into cart {db_cart.id} "
+                f"({len(incoming) - len(merged)} stale lines dropped)"
+            )
+
+    storage.take_guest_cart()
+    discard_cart_header(request)
     logger.info(f"[Cart Merge] Session cart merged into DB cart for user {user.username}")
 
 
 @receiver(post_save, sender=Cart)
 def log_cart_saved(sender, instance, created, **kwargs):
     if created:
-        logger.info(f"[Cart] New cart created for user {instance.user} at {instance.created_at}")
+        logger.info(f"[Cart] New cart created for user {instance.user_id} at {instance.created_at}")
     else:
         logger.debug(f"[Cart] Cart {instance.id} updated at {instance.updated_at}")
 
@@ -60,5 +90,13 @@ def log_cart_saved(sender, instance, created, **kwargs):
 def log_cart_item_saved(sender, instance, created, **kwargs):
     action = "added to" if created else "updated in"
     logger.debug(
-        f"[CartItem] Product {instance.product.name} {action} Cart {instance.cart.id} (Qty: {instance.quantity})"
+        f"[CartItem] Product {instance.product_id} {action} Cart {instance.cart_id} (Qty: {instance.quantity})"
     )
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def bump_cart_version_on_item_change(sender, instance, raw=False, **kwargs):
+    # Admin edits and cascades from deleted products included
+    if not raw:
+        Cart.objects.filter(pk=instance.cart_id).update(version=F("version") + 1)
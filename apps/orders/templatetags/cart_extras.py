@@ -11,13 +11,14 @@ register = template.Library()
 @register.filter
 def item_key(item):
     """
-    Return the canonical key for a cart line, matching how we store it:
-      - Bundles (session cart):   "bundle_<id>"
+    Return the key update/remove URLs use for a cart line:
+      - Bundles (session cart):   "bundle_<id>", the key they are stored under
       - Products (session cart):  product.product_code (fallback to product.id)
       - CartItem (DB cart):       product.product_code (fallback to product.id)
 
-    This ensures update/remove URLs target the correct key for both guests and
-    authenticated users.
+    Session products are stored under their id, so the cart views map a
+    product_code back to the stored key with find_session_cart_key (one
+    product lookup); DB cart lines are looked up by product_code directly.
     """
     # Dict coming from calculate_cart_summary()
     if isinstance(item, dict):
@@ -0,0 +1,129 @@
+"""
+Add-to-cart tests for the Orders app.
+
+This module verifies that `add_to_cart`:
+- Writes DB cart lines with a single upsert statement that increments
+  existing lines in the database (no read-modify-write) and reports
+  whether the line was new; the whole add is three statements.
+- Rejects quantities below one (the view falls back to one).
+- Creates the user's cart on first use.
+- Keeps the session cart header in step with the cart without rebuilding it.
+
+Located at: apps/orders/tests/test_add_to_cart.py
+"""
+
+import types
+from decimal import Decimal
+
+import pytest
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.orders.models import Cart, CartItem
+from apps.orders.utils.cart import add_to_cart, build_cart_header, get_cart_header
+from apps.orders.utils.cart_storage import CART_HEADER_SESSION_KEY
+from apps.products.models import Category, Product, ProductType
+
+
+@pytest.fixture
+def products(db):
+    cat = Category.objects.create(name="Adds", slug="adds")
+    ptype = ProductType.objects.create(name="Standard")
+    return [
+        Product.objects.create(
+            name=f"Add {i}", variant="Base", description="x", type=ptype, tier="Standard",
+            category=cat, price=Decimal("7.49"), stock=10, sku=f"SKU-ADD-{i}", product_code=f"ADD-{i}",
+        )
+        for i in range(2)
+    ]
+
+
+def _request(rf, user):
+    req = rf.post("/")
+    req.user = user
+    req.session = SessionStore()
+    return req
+
+
+def _cart_item_statements(queries):
+    table = CartItem._meta.db_table
+    return [q["sql"] for q in queries if table in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_add_to_cart_writes_the_line_with_a_single_upsert(rf, user, products):
+    cart = Cart.objects.create(user=user)
+    session = _request(rf, user).session
+    get_cart_header(types.SimpleNamespace(user=user, session=session))
+
+    for quantity in (2, 3):
+        req = _request(rf, user)
+        req.session = session
+        with CaptureQueriesContext(connection) as ctx:
+            add_to_cart(req, products[0].id, quantity, product=products[0])
+        # Stamp check, upsert, Cart.version bump; the line is never read back
+        assert len(ctx.captured_queries) == 3
+        [statement] = _cart_item_statements(ctx.captured_queries)
+        assert statement.startswith("INSERT") and "ON CONFLICT" in statement
+
+    assert list(cart.items.values_list("product_id", "quantity")) == [(products[0].id, 5)]
+
+
+@pytest.mark.django_db
+def test_add_to_cart_increments_in_the_database(rf, user, products):
+    cart = Cart.objects.create(user=user)
+    stale = CartItem.objects.create(cart=cart, product=products[0], quantity=1)
+
+    # Another request bumps the line after this one loaded it
+    add_to_cart(_request(rf, user), products[0].id, 4)
+    add_to_cart(_request(rf, user), products[0].id, 1)
+
+    stale.refresh_from_db()
+    assert stale.quantity == 6
+
+
+@pytest.mark.django_db
+def test_add_to_cart_creates_the_cart_on_first_use(rf, user, products):
+    add_to_cart(_request(rf, user), products[1].id, 2)
+
+    cart = Cart.objects.get(user=user, is_active=True)
+    assert list(cart.items.values_list("product_id", "quantity")) == [(products[1].id, 2)]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("authenticated", [True, False])
+def test_add_to_cart_keeps_header_in_step(rf, user, products, authenticated):
+    req = _request(rf, user if authenticated else types.SimpleNamespace(is_authenticated=False, pk=None))
+    get_cart_header(req)
+
+    for product, quantity in [(products[0], 2), (products[1], 1), (products[0], 1)]:
+        add_to_cart(req, product.id, quantity, product=product)
+
+    assert req.session[CART_HEADER_SESSION_KEY] == build_cart_header(req)
+    assert req.session[CART_HEADER_SESSION_KEY]["lines"] == 2
+
+
+@pytest.mark.django_db
+def test_upsert_reports_inserted_lines(user, products):
+    from apps.orders.utils.cart import _upsert_cart_item
+
+    Cart.objects.create(user=user)
+    assert _upsert_cart_item(user, products[0].id, 2) is True
+    assert _upsert_cart_item(user, products[0].id, 2) is False
+    assert _upsert_cart_item(user, products[1].id, 1) is True
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("quantity", [0, -3])
+def test_non_positive_quantities_are_rejected(rf, user, products, client, quantity):
+    cart = Cart.objects.create(user=user)
+    with pytest.raises(ValueError):
+        add_to_cart(_request(rf, user), products[0].id, quantity, product=products[0])
+    assert not cart.items.exists()
+
+    # The view falls back to one
+    client.force_login(user)
+    client.post(reverse("orders:add_to_cart", args=[products[0].id]), {"quantity": quantity})
+    client.post(reverse("orders:add_to_cart", args=[products[0].id]), {"quantity": "lots"})
+    assert list(cart.items.values_list("quantity", flat=True)) == [2]
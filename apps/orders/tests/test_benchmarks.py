@@ -0,0 +1,255 @@
+"""
+Cart performance benchmarks for the Orders app.
+
+Not part of the default test run (see the `benchmark` marker in pytest.ini).
+Run them against the sqlite test database with:
+
+    pytest -m benchmark apps/orders/tests/test_benchmarks.py
+
+For guest and authenticated carts of 1/10/50/200 lines (a mix of products
+and bundles) this measures wall time and query counts for:
+- the navbar context processor (`cart_data`), count and preview,
+- `calculate_cart_summary` on its own,
+- `cart_view`, `checkout_view` and `payment.create_payment_intent`
+  (Stripe is stubbed).
+
+Results are written as JSON to BENCHMARK_JSON (default:
+.benchmarks/cart.json) so runs can be diffed between commits. Set
+BENCHMARK_ROUNDS to change the number of timed rounds (default 5).
+
+Located at: apps/orders/tests/test_benchmarks.py
+"""
+
+import itertools
+import json
+import os
+import platform
+import statistics
+import time
+import types
+from decimal import Decimal
+from pathlib import Path
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.orders.context_processors import cart_data
+from apps.orders.models import Cart, CartItem
+from apps.orders.utils.cart import calculate_cart_summary, get_active_cart
+from apps.orders.utils.cart_storage import pack_cart
+from apps.orders.views import checkout as checkout_view
+from apps.orders.views import payment as payment_view
+from apps.products.models import Bundle, Category, Product, ProductType
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+CART_SIZES = [1, 10, 50, 200]
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", 5))
+OUTPUT = Path(os.environ.get("BENCHMARK_JSON", Path(settings.BASE_DIR) / ".benchmarks" / "cart.json"))
+
+# One in five cart lines is a bundle
+BUNDLE_EVERY = 5
+
+_results = []
+
+
+@pytest.fixture(scope="module", autouse=True)
+def write_results():
+    yield
+    if not _results:
+        return
+    OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT.write_text(json.dumps({
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "rounds": ROUNDS,
+        "results": sorted(_results, key=lambda r: (r["target"], r["user"], r["lines"])),
+    }, indent=2))
+
+
+def _record(target, user_kind, lines, timings, queries):
+    _results.append({
+        "target": target,
+        "user": user_kind,
+        "lines": lines,
+        "queries": queries,
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    })
+
+
+def _measure(target, user_kind, lines, run, setup=None):
+    """Time `run` over ROUNDS rounds (after `setup`, untimed) and record it."""
+    timings = []
+    queries = 0
+    for _ in range(ROUNDS):
+        state = setup() if setup else None
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+        queries = len(ctx.captured_queries)
+    _record(target, user_kind, lines, timings, queries)
+    return queries
+
+
+@pytest.fixture
+def catalogue(db):
+    cat = Category.objects.create(name="Bench", slug="bench")
+    ptype = ProductType.objects.create(name="Standard")
+    Product.objects.bulk_create([
+        Product(
+            name=f"Bench Part {i}", slug=f"bench-part-{i}", variant="Base", description="x",
+            type=ptype, tier="Standard", category=cat, price=Decimal("4.99") + i, stock=100, sku=f"SKU-BEN-{i}",
+            product_code=f"BEN-{i}", image="products/bench.jpg",
+        )
+        for i in range(max(CART_SIZES))
+    ])
+    Bundle.objects.bulk_create([
+        Bundle(
+            name=f"Bench Kit {i}", slug=f"bench-kit-{i}", subtotal_price=Decimal("30.00"),
+            price=Decimal("27.00"), discount_percentage=Decimal("10.00"), sku=f"B-BEN-{i}", bundle_code=f"bundle-ben-{i}",
+            image="bundles/bench.jpg",
+        )
+        for i in range(max(CART_SIZES) // BUNDLE_EVERY)
+    ])
+    return list(Product.objects.order_by("id")), list(Bundle.objects.order_by("id"))
+
+
+def _cart_lines(catalogue, lines):
+    """Split a cart of `lines` lines into (products, bundles)."""
+    products, bundles = catalogue
+    n_bundles = lines // BUNDLE_EVERY
+    return products[:lines - n_bundles], bundles[:n_bundles]
+
+
+def _session_cart(products, bundles, include_products=True):
+    cart = {}
+    if include_products:
+        cart.update({str(p.id): {"product_id": p.id, "quantity": 2} for p in products})
+    cart.update({f"bundle_{b.id}": {"type": "bundle", "quantity": 1} for b in bundles})
+    return cart
+
+
+def _seed_db_cart(user, products):
+    cart, _ = Cart.objects.get_or_create(user=user, is_active=True)
+    cart.items.all().delete()
+    CartItem.objects.bulk_create([CartItem(cart=cart, product=p, quantity=2) for p in products])
+
+
+def _client(user, catalogue, lines):
+    """A client whose cart holds `lines` lines, seeded outside the timings."""
+    products, bundles = _cart_lines(catalogue, lines)
+    client = Client()
+    if user is not None:
+        client.force_login(user)
+        _seed_db_cart(user, products)
+    session = client.session
+    session["cart"] = pack_cart(_session_cart(products, bundles, include_products=user is None))
+    session.save()
+    return client
+
+
+def _request(rf, user, catalogue, lines):
+    products, bundles = _cart_lines(catalogue, lines)
+    req = rf.get("/")
+    req.session = SessionStore()
+    if user is None:
+        req.user = types.SimpleNamespace(is_authenticated=False, pk=None)
+        req.session["cart"] = pack_cart(_session_cart(products, bundles))
+    else:
+        req.user = user
+        _seed_db_cart(user, products)
+        req.session["cart"] = pack_cart(_session_cart(products, bundles, include_products=False))
+    return req
+
+
+@pytest.fixture
+def stub_stripe(monkeypatch):
+    # Orders store Stripe ids in unique columns, so every call gets a new one
+    ids = itertools.count()
+
+    def fake_session(**kwargs):
+        return types.SimpleNamespace(id=f"cs_bench_{next(ids)}", url="https://stripe.test/checkout")
+
+    def fake_intent(*args, **kwargs):
+        n = next(ids)
+        return types.SimpleNamespace(id=f"pi_bench_{n}", client_secret=f"pi_bench_{n}_secret",
+                                     status="requires_payment_method")
+
+    monkeypatch.setattr(checkout_view, "create_checkout_session", fake_session)
+    for name in ("create", "retrieve", "modify"):
+        monkeypatch.setattr(payment_view.stripe.PaymentIntent, name, staticmethod(fake_intent))
+
+
+@pytest.fixture(params=["guest", "user"])
+def user_kind(request):
+    return request.param
+
+
+@pytest.fixture
+def shopper(user_kind, user):
+    return None if user_kind == "guest" else user
+
+
+@pytest.mark.parametrize("lines", CART_SIZES)
+def test_bench_navbar_context_processor(rf, catalogue, shopper, user_kind, lines):
+    def setup():
+        return _request(rf, shopper, catalogue, lines)
+
+    def run(req):
+        ctx = cart_data(req)
+        str(ctx["cart_item_count"])
+        list(ctx["cart_items"])
+
+    _measure("cart_data", user_kind, lines, run, setup)
+
+
+@pytest.mark.parametrize("lines", CART_SIZES)
+def test_bench_calculate_cart_summary(rf, catalogue, shopper, user_kind, lines):
+    req = _request(rf, shopper, catalogue, lines)
+    cart, cart_type = get_active_cart(req)
+
+    def run(_):
+        summary = calculate_cart_summary(req, cart, cart_type)
+        assert len(summary["cart_items"]) == lines
+
+    _measure("calculate_cart_summary", user_kind, lines, run)
+
+
+@pytest.mark.parametrize("lines", CART_SIZES)
+def test_bench_cart_view(catalogue, shopper, user_kind, lines):
+    client = _client(shopper, catalogue, lines)
+    url = reverse("orders:cart")
+
+    def run(_):
+        assert client.get(url).status_code == 200
+
+    _measure("cart_view", user_kind, lines, run)
+
+
+@pytest.mark.parametrize("lines", CART_SIZES)
+def test_bench_checkout_view(catalogue, shopper, user_kind, lines, stub_stripe):
+    url = reverse("orders:checkout")
+
+    def run(client):
+        assert client.post(url).status_code == 302
+
+    _measure("checkout_view", user_kind, lines, run, setup=lambda: _client(shopper, catalogue, lines))
+
+
+@pytest.mark.parametrize("lines", CART_SIZES)
+def test_bench_create_payment_intent(catalogue, shopper, user_kind, lines, stub_stripe):
+    url = reverse("orders:create_payment_intent")
+    data = {"guest_email": "bench@example.com"}
+
+    def run(client):
+        assert client.post(url, data).status_code == 200
+
+    _measure("create_payment_intent", user_kind, lines, run, setup=lambda: _client(shopper, catalogue, lines))
@@ -0,0 +1,99 @@
+"""
+Login cart merge tests for the Orders app.
+
+This module verifies that merging the guest session cart on login:
+- Increments existing DB lines in the database and creates new ones in bulk.
+- Keeps the guest cart if the merge fails.
+- Drops lines for deleted products and leaves bundles out of the DB cart.
+- Runs a fixed number of queries regardless of the number of session lines.
+
+Located at: apps/orders/tests/test_cart_merge.py
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.orders.models import Cart, CartItem
+from apps.orders.signals import merge_session_cart
+from apps.orders.utils.cart_storage import SessionCartStorage
+from apps.products.models import Category, Product, ProductType
+
+
+@pytest.fixture
+def merge_products(db):
+    cat = Category.objects.create(name="Merge", slug="merge")
+    ptype = ProductType.objects.create(name="Standard")
+    return [
+        Product.objects.create(
+            name=f"Merge {i}", variant="Base", description="x", type=ptype, tier="Standard",
+            category=cat, price=Decimal("3.00"), stock=10, sku=f"SKU-MRG-{i}", product_code=f"MRG-{i}",
+        )
+        for i in range(8)
+    ]
+
+
+def _login_request(rf, products, quantity=1):
+    req = rf.get("/")
+    req.session = SessionStore()
+    req.session["cart"] = {
+        p.product_code: {"product_id": p.id, "name": p.name, "quantity": quantity, "price": 3.0}
+        for p in products
+    }
+    return req
+
+
+@pytest.mark.django_db
+def test_merge_increments_existing_and_adds_new_lines(rf, user, merge_products):
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.create(cart=cart, product=merge_products[0], quantity=2)
+    deleted = merge_products[3]
+    req = _login_request(rf, merge_products[:4], quantity=3)
+    req.session["cart"]["bundle_1"] = {"type": "bundle", "quantity": 1}
+    deleted.delete()
+
+    merge_session_cart(sender=None, request=req, user=user)
+
+    assert dict(cart.items.values_list("product_id", "quantity")) == {
+        merge_products[0].id: 5,
+        merge_products[1].id: 3,
+        merge_products[2].id: 3,
+    }
+    assert SessionCartStorage(req).load() == {}
+
+
+@pytest.mark.django_db
+def test_merge_query_count_does_not_grow_with_lines(rf, user, merge_products):
+    cart = Cart.objects.create(user=user)
+    other = Cart.objects.create(user=user, is_active=False)
+
+    def run(products):
+        cart.items.all().delete()
+        for p in products[:2]:
+            CartItem.objects.create(cart=cart, product=p, quantity=1)
+        with CaptureQueriesContext(connection) as ctx:
+            merge_session_cart(sender=None, request=_login_request(rf, products), user=user)
+        return len(ctx.captured_queries)
+
+    assert run(merge_products[:3]) == run(merge_products)
+    assert cart.items.count() == len(merge_products)
+    assert not other.items.exists()
+
+
+@pytest.mark.django_db
+def test_failed_merge_keeps_the_guest_cart(rf, user, merge_products, monkeypatch):
+    from apps.orders import signals
+
+    req = _login_request(rf, merge_products[:2])
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(signals, "upsert_cart_items", fail)
+    with pytest.raises(RuntimeError):
+        merge_session_cart(sender=None, request=req, user=user)
+
+    assert len(SessionCartStorage(req).load()) == 2
+    assert not CartItem.objects.filter(cart__user=user).exists()
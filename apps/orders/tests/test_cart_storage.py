@@ -0,0 +1,151 @@
+"""
+Cart storage tests for the Orders app.
+
+This module verifies the pluggable guest cart storage:
+- pack/unpack round-trips the session dict shape through the compact form.
+- With SignedCookieCartStorage, a guest can add, update, remove and view
+  cart lines without a session row being created.
+- Tampered cookies are ignored, and the cookie cart is merged on login.
+- Session carts are stored compactly, and legacy session carts are read
+  transparently and migrated on first load.
+
+Located at: apps/orders/tests/test_cart_storage.py
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.conf import settings
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.urls import reverse
+from apps.orders.models import CartItem
+from apps.orders.signals import merge_session_cart
+from apps.orders.utils.cart_storage import CART_FORMAT_VERSION, SessionCartStorage, pack_cart, unpack_cart
+from apps.products.models import Bundle, Category, Product, ProductType
+
+COOKIE_STORAGE = "apps.orders.utils.cart_storage.SignedCookieCartStorage"
+
+
+@pytest.fixture
+def stock(db):
+    cat = Category.objects.create(name="Stored", slug="stored")
+    ptype = ProductType.objects.create(name="Standard")
+    product = Product.objects.create(
+        name="Stored Widget", variant="Base", description="x", type=ptype, tier="Standard",
+        category=cat, price=Decimal("6.00"), stock=10, sku="SKU-STO-1", product_code="STO-1",
+        image="products/widget.jpg",
+    )
+    bundle = Bundle.objects.create(
+        name="Stored Kit", subtotal_price=Decimal("20.00"), price=Decimal("18.00"),
+        discount_percentage=Decimal("10.00"), sku="B-STO-1", bundle_code="bundle-sto-1",
+        image="bundles/kit.jpg",
+    )
+    return product, bundle
+
+
+@pytest.fixture
+def cookie_storage(settings):
+    settings.CART_STORAGE = COOKIE_STORAGE
+
+
+def test_pack_unpack_round_trip():
+    cart = {
+        "STO-1": {"product_id": 7, "name": "Widget", "quantity": 2, "price": 6.0},
+        "bundle_3": {"type": "bundle", "name": "Kit", "price": "18.00", "quantity": 1},
+        "junk": {"product_id": "x", "quantity": 1},
+    }
+
+    packed = pack_cart(cart)
+
+    assert packed == {"_v": CART_FORMAT_VERSION, "7": 2, "b:3": 1}
+    assert unpack_cart(packed) == {
+        "7": {"product_id": 7, "quantity": 2},
+        "bundle_3": {"type": "bundle", "quantity": 1},
+    }
+
+
+@pytest.mark.django_db
+def test_guest_cookie_cart_needs_no_session(client, stock, cookie_storage):
+    product, bundle = stock
+
+    client.post(reverse("orders:add_to_cart", args=[product.id]), {"quantity": 2})
+    client.post(reverse("orders:add_bundle_to_cart", args=[bundle.id]))
+    response = client.get(reverse("orders:cart"))
+
+    assert "View Cart (3)" in response.content.decode()
+    assert [ci["quantity"] for ci in response.context["cart_items"]] == [2, 1]
+
+    # The template posts product_code keys; the cookie stores ids
+    client.post(reverse("orders:update_quantity", args=[product.product_code]), {"quantity": 5})
+    client.post(reverse("orders:remove_item", args=[f"bundle_{bundle.id}"]))
+    response = client.get(reverse("orders:cart"))
+
+    assert [ci["quantity"] for ci in response.context["cart_items"]] == [5]
+    assert settings.SESSION_COOKIE_NAME not in client.cookies
+    assert not Session.objects.exists()
+
+
+@pytest.mark.django_db
+def test_tampered_cart_cookie_is_ignored(client, stock, cookie_storage):
+    product, _ = stock
+    client.post(reverse("orders:add_to_cart", args=[product.id]))
+    client.cookies["cart"] = client.cookies["cart"].value[:-2] + "xx"
+
+    response = client.get(reverse("orders:cart"))
+
+    assert response.context["cart_items"] == []
+    assert response.cookies["cart"]["max-age"] == 0
+
+
+@pytest.mark.django_db
+def test_cookie_cart_is_merged_on_login(client, rf, user, stock, cookie_storage):
+    product, _ = stock
+    client.post(reverse("orders:add_to_cart", args=[product.id]), {"quantity": 3})
+
+    req = rf.get("/")
+    req.COOKIES["cart"] = client.cookies["cart"].value
+    req.session = SessionStore()
+    req.user = user
+    merge_session_cart(sender=None, request=req, user=user)
+    response = req.cart_storage.update_response(HttpResponse())
+
+    assert CartItem.objects.get(cart__user=user, product=product).quantity == 3
+    assert response.cookies["cart"]["max-age"] == 0
+
+
+@pytest.mark.django_db
+def test_legacy_session_cart_is_migrated_on_first_load(rf, stock):
+    product, bundle = stock
+    legacy = {
+        product.product_code: {
+            "product_id": product.id, "name": product.name, "quantity": 2,
+            "price": 6.0, "image_type": "jpg",
+        },
+        f"bundle_{bundle.id}": {"type": "bundle", "name": bundle.name, "price": "18.00", "quantity": 1},
+    }
+    req = rf.get("/")
+    req.session = SessionStore()
+    req.session["cart"] = legacy
+    legacy_size = len(req.session.encode(dict(req.session)))
+
+    cart = SessionCartStorage(req).load()
+
+    assert cart == {
+        str(product.id): {"product_id": product.id, "quantity": 2},
+        f"bundle_{bundle.id}": {"type": "bundle", "quantity": 1},
+    }
+    assert req.session["cart"] == {"_v": CART_FORMAT_VERSION, str(product.id): 2, f"b:{bundle.id}": 1}
+    assert len(req.session.encode(dict(req.session))) < legacy_size
+
+
+@pytest.mark.django_db
+def test_guest_session_cart_is_stored_compactly(client, stock):
+    product, bundle = stock
+
+    client.post(reverse("orders:add_to_cart", args=[product.id]), {"quantity": 2})
+    client.post(reverse("orders:add_to_cart", args=[product.id]))
+    client.post(reverse("orders:add_bundle_to_cart", args=[bundle.id]))
+
+    assert client.session["cart"] == {"_v": CART_FORMAT_VERSION, str(product.id): 3, f"b:{bundle.id}": 1}
@@ -0,0 +1,291 @@
+"""
+Cart summary tests for the Orders app.
+
+This module exercises `calculate_cart_summary` directly and verifies that:
+- Session cart lines are resolved in bulk (one query per model), so the
+  query count does not grow with the number of cart lines.
+- Lines pointing at deleted products/bundles are dropped from the summary.
+- The request-scoped cart snapshot is lazy and computed once per request.
+- The session cart header answers the navbar count without recomputing
+  the cart and rebuilds itself when missing or stale, including after
+  changes made outside the session (other devices, the admin, prices).
+  Checking it costs at most one query.
+
+Located at: apps/orders/tests/test_cart_summary.py
+"""
+
+import types
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from apps.orders.utils.cart import (
+    CART_HEADER_VERSION, CartSnapshot, calculate_cart_summary, get_cart_header,
+    refresh_cart_header,
+)
+from apps.orders.utils.cart_storage import CART_HEADER_SESSION_KEY
+from apps.products.models import Bundle, Category, Product, ProductType
+
+
+@pytest.fixture
+def catalogue(db):
+    cat = Category.objects.create(name="Gadgets", slug="gadgets")
+    ptype = ProductType.objects.create(name="Standard")
+    products = [
+        Product.objects.create(
+            name=f"Widget {i}", variant="Base", description="x", type=ptype,
+            tier="Standard", category=cat, price=Decimal("5.00") + i, stock=10,
+            sku=f"SKU-SUM-{i}", product_code=f"SUM-{i}",
+        )
+        for i in range(5)
+    ]
+    bundles = [
+        Bundle.objects.create(
+            name=f"Kit {i}", subtotal_price=Decimal("20.00"), price=Decimal("18.00"),
+            discount_percentage=Decimal("10.00"), sku=f"B-SUM-{i}", bundle_code=f"bundle-sum-{i}",
+        )
+        for i in range(3)
+    ]
+    return products, bundles
+
+
+def _guest_request(rf, session_cart):
+    req = rf.get("/cart/")
+    req.user = types.SimpleNamespace(is_authenticated=False)
+    req.session = {"cart": session_cart}
+    return req
+
+
+def _session_cart(products, bundles):
+    cart = {
+        p.product_code: {"product_id": p.id, "name": p.name, "quantity": 1, "price": str(p.price)}
+        for p in products
+    }
+    cart.update({
+        f"bundle_{b.id}": {"type": "bundle", "name": b.name, "price": str(b.price), "quantity": 2}
+        for b in bundles
+    })
+    return cart
+
+
+@pytest.mark.django_db
+def test_guest_summary_uses_one_query_per_model(rf, catalogue, django_assert_num_queries):
+    products, bundles = catalogue
+    session_cart = _session_cart(products, bundles)
+    req = _guest_request(rf, session_cart)
+
+    with django_assert_num_queries(2):
+        summary = calculate_cart_summary(req, session_cart, "session")
+
+    assert len(summary["cart_items"]) == len(products) + len(bundles)
+    # 5 + 6 + 7 + 8 + 9 products, plus 3 bundles x 2 @ 20.00 base
+    assert summary["total_before_discount"] == Decimal("155.00")
+    assert summary["bundle_discount"] == Decimal("12.00")
+
+
+@pytest.mark.django_db
+def test_guest_summary_drops_deleted_lines(rf, catalogue):
+    products, bundles = catalogue
+    session_cart = _session_cart(products[:2], bundles[:2])
+    products[0].delete()
+    bundles[0].delete()
+
+    summary = calculate_cart_summary(_guest_request(rf, session_cart), session_cart, "session")
+
+    assert [ci["product"] for ci in summary["cart_items"] if not ci["is_bundle"]] == [products[1]]
+    assert [ci["bundle"] for ci in summary["cart_items"] if ci["is_bundle"]] == [bundles[1]]
+
+
+@pytest.mark.django_db
+def test_cart_context_processor_is_lazy(rf, catalogue, django_assert_num_queries):
+    from apps.orders.context_processors import cart_data
+
+    products, bundles = catalogue
+    req = _guest_request(rf, _session_cart(products, bundles))
+    # In a real session the header is written by the last cart mutation
+    refresh_cart_header(req)
+    req.cart = CartSnapshot(req)
+
+    with django_assert_num_queries(0):
+        ctx = cart_data(req)
+
+    # Count comes straight from the session cart header
+    with django_assert_num_queries(0):
+        assert ctx["cart_item_count"] == len(products) + 2 * len(bundles)
+
+    # Preview only loads the first three lines
+    with django_assert_num_queries(1):
+        assert [item.product for item in ctx["cart_items"]] == products[:3]
+
+
+@pytest.mark.django_db
+def test_cart_context_processor_db_cart_uses_bounded_queries(rf, catalogue, user, django_assert_num_queries):
+    from apps.orders.context_processors import cart_data
+    from apps.orders.models import Cart, CartItem
+
+    products, bundles = catalogue
+    cart = Cart.objects.create(user=user)
+    for p in products:
+        CartItem.objects.create(cart=cart, product=p, quantity=2)
+
+    req = rf.get("/")
+    req.user = user
+    req.session = {"cart": {f"bundle_{bundles[0].id}": {"quantity": 1}}}
+
+    # First request of the session builds the header from the cart...
+    assert cart_data(req)["cart_item_count"] == 2 * len(products) + 1
+    assert req.session[CART_HEADER_SESSION_KEY]["lines"] == len(products) + 1
+
+    # ...after which the count costs only the cart version check and the
+    # preview stays bounded
+    req.cart = CartSnapshot(req)
+    ctx = cart_data(req)
+    with django_assert_num_queries(1):
+        assert ctx["cart_item_count"] == 2 * len(products) + 1
+    with django_assert_num_queries(1):
+        assert len(ctx["cart_items"]) == 3
+
+
+@pytest.mark.django_db
+def test_cart_header_is_maintained_by_cart_views(client, catalogue):
+    products, bundles = catalogue
+
+    client.post(reverse("orders:add_to_cart", args=[products[0].id]), {"quantity": 2})
+    client.post(reverse("orders:add_bundle_to_cart", args=[bundles[0].id]))
+
+    header = client.session[CART_HEADER_SESSION_KEY]
+    assert header["v"] == CART_HEADER_VERSION
+    assert (header["lines"], header["qty"]) == (2, 3)
+    # 2 x 5.00 + 1 x 20.00 (bundle base price, before discounts)
+    assert header["subtotal_pence"] == 3000
+
+    client.post(reverse("orders:clear_cart"))
+    assert client.session[CART_HEADER_SESSION_KEY]["qty"] == 0
+
+
+@pytest.mark.django_db
+def test_cart_header_rebuilds_when_stale(rf, catalogue):
+    products, bundles = catalogue
+    req = _guest_request(rf, _session_cart(products, bundles))
+    req.session[CART_HEADER_SESSION_KEY] = {"v": CART_HEADER_VERSION - 1, "user": None, "qty": 99}
+
+    header = get_cart_header(req)
+
+    assert header["v"] == CART_HEADER_VERSION
+    assert header["qty"] == len(products) + 2 * len(bundles)
+    assert req.session[CART_HEADER_SESSION_KEY] == header
+
+
+def test_empty_guest_cart_header_does_not_touch_the_session(rf):
+    req = _guest_request(rf, {})
+    del req.session["cart"]
+
+    assert get_cart_header(req)["qty"] == 0
+    assert req.session == {}
+
+
+@pytest.mark.django_db
+def test_cart_snapshot_is_shared_within_a_request(rf, catalogue, monkeypatch):
+    from apps.orders.utils import cart as cart_utils
+
+    products, bundles = catalogue
+    req = _guest_request(rf, _session_cart(products, bundles))
+    calls = []
+    real = cart_utils.calculate_cart_summary
+    monkeypatch.setattr(
+        cart_utils, "calculate_cart_summary",
+        lambda *a, **k: calls.append(1) or real(*a, **k),
+    )
+
+    snapshot = cart_utils.get_cart_snapshot(req)
+    assert cart_utils.get_cart_snapshot(req) is snapshot
+    snapshot.summary
+    snapshot.item_count
+    assert len(calls) == 1
+
+    cart_utils.invalidate_cart_snapshot(req)
+    snapshot.summary
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db
+def test_cart_header_follows_changes_made_outside_the_session(rf, catalogue, user, django_capture_on_commit_callbacks):
+    from apps.orders.models import Cart, CartItem
+    from apps.orders.utils.cart import add_to_cart
+
+    products, _ = catalogue
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.create(cart=cart, product=products[0], quantity=1)
+
+    def header():
+        req = rf.get("/")
+        req.user = user
+        req.session = session
+        return get_cart_header(req)
+
+    session = {}
+    assert header()["qty"] == 1
+
+    # Another device adds a line
+    other = rf.post("/")
+    other.user, other.session = user, {}
+    add_to_cart(other, products[1].id, 2, product=products[1])
+    assert header()["qty"] == 3
+
+    # An admin edits a line
+    item = CartItem.objects.get(product=products[0])
+    item.quantity = 4
+    item.save()
+    assert header()["qty"] == 6
+
+    # A price change
+    with django_capture_on_commit_callbacks(execute=True):
+        products[1].price = Decimal("1.00")
+        products[1].save()
+    assert header()["subtotal_pence"] == 4 * 500 + 2 * 100
+
+    # A deleted product takes its line with it
+    products[1].delete()
+    assert (header()["lines"], header()["qty"]) == (1, 4)
+
+
+@pytest.mark.django_db
+def test_cart_header_check_costs_at_most_one_query(rf, catalogue, user, django_assert_num_queries):
+    from apps.orders.models import Cart, CartItem
+    from apps.products.page_cache import catalogue_version
+
+    products, bundles = catalogue
+    session = {"cart": _session_cart(products, bundles)}
+
+    def request(who):
+        req = rf.get("/")
+        req.user, req.session = who, session
+        return req
+
+    guest = types.SimpleNamespace(is_authenticated=False, pk=None)
+    get_cart_header(request(guest))
+
+    # The catalogue version, unless the page cache or ETag already read it
+    with django_assert_num_queries(1):
+        get_cart_header(request(guest))
+    req = request(guest)
+    catalogue_version(req)
+    with django_assert_num_queries(0):
+        get_cart_header(req)
+
+    # Signed in: the cart and catalogue versions in one query
+    CartItem.objects.create(cart=Cart.objects.create(user=user), product=products[0], quantity=1)
+    session = {}
+    get_cart_header(request(user))
+    with django_assert_num_queries(1):
+        assert get_cart_header(request(user))["qty"] == 1
+
+
+@pytest.mark.django_db
+def test_navbar_preview_skips_deleted_lines(rf, catalogue):
+    products, bundles = catalogue
+    req = _guest_request(rf, _session_cart(products, bundles))
+    products[0].delete()
+    products[1].delete()
+
+    assert [item.product for item in CartSnapshot(req).preview_items] == products[2:5]
@@ -0,0 +1,295 @@
+"""
+Pricing engine tests for the Orders app.
+
+This module proves that the integer-pence pricing engine produces exactly
+the same figures as the Decimal-based cart math it replaced:
+- Line-level parity for products and bundles over a grid of prices and
+  quantities, including half-penny rounding.
+- Summary-level parity for session and DB carts, compared on `str()` so
+  that both value and exponent must match.
+
+The `_legacy_*` helpers are a reference copy of the previous logic from
+`calculate_cart_summary` and must not be "fixed".
+
+Located at: apps/orders/tests/test_pricing.py
+"""
+
+import types
+from decimal import Decimal
+
+import pytest
+from apps.orders.utils.cart import calculate_cart_summary
+from apps.orders.utils.pricing import CartTotals, bundle_line, from_pence, product_line, to_pence
+from apps.products.models import Bundle, Category, Product, ProductType
+
+PRICES = ["0.00", "0.01", "4.99", "5.00", "19.99", "39.99", "129.50"]
+QUANTITIES = [1, 2, 3, 7]
+
+
+# ---------- Reference (previous) implementation ----------
+
+def _legacy_product_line(product, quantity, entry=None):
+    unit_price = Decimal(product.price)
+    if entry is None:
+        discounted_unit = unit_price
+    else:
+        try:
+            discounted_unit = Decimal(entry.get("price", unit_price))
+        except Exception:
+            discounted_unit = unit_price
+    discounted_unit = discounted_unit.quantize(Decimal("0.01"))
+    unit_price = unit_price.quantize(Decimal("0.01"))
+
+    line_unit_total = unit_price * quantity
+    line_disc_total = discounted_unit * quantity
+    return {
+        "unit_price": unit_price,
+        "discounted_price": discounted_unit,
+        "discount_percent": (
+            ((unit_price - discounted_unit) / unit_price * Decimal("100.00"))
+            if unit_price > 0 and discounted_unit < unit_price else Decimal("0.00")
+        ),
+        "subtotal": line_disc_total,
+        "line_subtotal_before_discount": line_unit_total,
+        "line_subtotal_after_discount": line_disc_total,
+        "line_discount_amount": (
+            (line_unit_total - line_disc_total) if line_disc_total < line_unit_total else Decimal("0.00")
+        ),
+    }
+
+
+def _legacy_bundle_line(bundle, quantity, entry):
+    raw_base = getattr(bundle, "subtotal_price", None)
+    raw_disc_pct = getattr(bundle, "discount_percentage", Decimal("10.00"))
+    try:
+        base_price = Decimal(raw_base) if raw_base is not None else Decimal(bundle.price)
+    except Exception:
+        base_price = Decimal(bundle.price)
+    try:
+        disc_pct = (Decimal(raw_disc_pct) / Decimal("100")).quantize(Decimal("0.0001"))
+    except Exception:
+        disc_pct = Decimal("0.10")
+    if entry.get("price") is not None:
+        try:
+            discounted_unit = Decimal(entry["price"])
+        except Exception:
+            discounted_unit = base_price * (Decimal("1.00") - disc_pct)
+    else:
+        try:
+            discounted_unit = Decimal(bundle.price)
+        except Exception:
+            discounted_unit = base_price * (Decimal("1.00") - disc_pct)
+    base_price = base_price.quantize(Decimal("0.01"))
+    discounted_unit = discounted_unit.quantize(Decimal("0.01"))
+
+    line_unit_total = base_price * quantity
+    line_disc_total = discounted_unit * quantity
+    return {
+        "unit_price": base_price,
+        "discounted_price": discounted_unit,
+        "discount_percent": (
+            ((base_price - discounted_unit) / base_price * Decimal("100.00"))
+            if base_price > 0 and discounted_unit < base_price else Decimal("0.00")
+        ),
+        "subtotal": line_disc_total,
+        "line_subtotal_before_discount": line_unit_total,
+        "line_subtotal_after_discount": line_disc_total,
+        "line_discount_amount": (
+            (line_unit_total - line_disc_total) if line_disc_total < line_unit_total else Decimal("0.00")
+        ),
+    }
+
+
+def _legacy_totals(lines, first_time_customer=False):
+    pre_total = post_total = bundle_discount_total = Decimal("0.00")
+    for line, quantity, is_bundle in lines:
+        pre_total += line["line_subtotal_before_discount"]
+        post_total += line["line_subtotal_after_discount"]
+        if is_bundle and line["discounted_price"] < line["unit_price"]:
+            bundle_discount_total += (line["unit_price"] - line["discounted_price"]) * quantity
+    delivery_fee = Decimal("0.00") if (
+        first_time_customer or pre_total >= Decimal("40.00")
+    ) else Decimal("4.99")
+    return {
+        "cart_total": post_total,
+        "total_before_discount": pre_total,
+        "bundle_discount": bundle_discount_total,
+        "delivery_fee": delivery_fee,
+        "grand_total": (post_total + delivery_fee).quantize(Decimal("0.01")),
+        "total_saved": (bundle_discount_total + Decimal("0.00")).quantize(Decimal("0.01")),
+    }
+
+
+def _exact(values):
+    """Compare Decimals on their exact representation, not just numerically."""
+    return {k: str(v) for k, v in values.items()}
+
+
+def _line_values(line_dict):
+    return {k: line_dict[k] for k in (
+        "unit_price", "discounted_price", "discount_percent", "subtotal",
+        "line_subtotal_before_discount", "line_subtotal_after_discount", "line_discount_amount",
+    )}
+
+
+# ---------- Line parity (no database) ----------
+
+@pytest.mark.parametrize("price", PRICES + ["2.675", "2.665"])
+@pytest.mark.parametrize("quantity", QUANTITIES)
+def test_product_line_parity(price, quantity):
+    product = types.SimpleNamespace(price=Decimal(price), tier="Standard")
+
+    line = product_line(product, quantity)
+
+    assert _exact(_line_values(line.as_dict())) == _exact(_legacy_product_line(product, quantity))
+
+
+@pytest.mark.parametrize("subtotal", [None, "0.00", "20.00", "33.33", "129.99"])
+@pytest.mark.parametrize("price", ["0.00", "18.00", "29.99", "116.99"])
+@pytest.mark.parametrize("discount", [None, "10.00", "12.50", "33.33"])
+def test_bundle_line_parity(subtotal, price, discount):
+    bundle = types.SimpleNamespace(
+        subtotal_price=None if subtotal is None else Decimal(subtotal),
+        price=Decimal(price),
+        discount_percentage=None if discount is None else Decimal(discount),
+        bundle_type="Pro",
+    )
+    for quantity in QUANTITIES:
+        line = bundle_line(bundle, quantity)
+        assert _exact(_line_values(line.as_dict())) == _exact(_legacy_bundle_line(bundle, quantity, {}))
+
+
+def test_bundle_line_falls_back_to_discounted_subtotal():
+    bundle = types.SimpleNamespace(
+        subtotal_price=Decimal("33.33"), price=None, discount_percentage=Decimal("12.50"), bundle_type=None,
+    )
+    line = bundle_line(bundle, 2)
+
+    assert line.discounted_pence == 2916
+    assert _exact(_line_values(line.as_dict())) == _exact(_legacy_bundle_line(bundle, 2, {}))
+
+
+@pytest.mark.parametrize("first_time", [False, True])
+def test_totals_parity(first_time):
+    product = types.SimpleNamespace(price=Decimal("12.49"), tier="Standard")
+    bundle = types.SimpleNamespace(
+        subtotal_price=Decimal("20.00"), price=Decimal("18.00"),
+        discount_percentage=Decimal("10.00"), bundle_type=None,
+    )
+    for quantities in [(1, 0), (1, 1), (3, 0), (2, 1), (0, 3)]:
+        lines = []
+        legacy = []
+        if quantities[0]:
+            lines.append(product_line(product, quantities[0]))
+            legacy.append((_legacy_product_line(product, quantities[0]), quantities[0], False))
+        if quantities[1]:
+            lines.append(bundle_line(bundle, quantities[1]))
+            legacy.append((_legacy_bundle_line(bundle, quantities[1], {}), quantities[1], True))
+
+        totals = CartTotals(lines, free_delivery=first_time)
+        engine = {
+            "cart_total": from_pence(totals.after_pence),
+            "total_before_discount": from_pence(totals.before_pence),
+            "bundle_discount": from_pence(totals.bundle_discount_pence),
+            "delivery_fee": from_pence(totals.delivery_pence),
+            "grand_total": from_pence(totals.grand_total_pence),
+            "total_saved": from_pence(totals.bundle_discount_pence).quantize(Decimal("0.01")),
+        }
+        assert _exact(engine) == _exact(_legacy_totals(legacy, first_time))
+
+
+def test_to_pence_rounds_half_even_like_quantize():
+    assert to_pence("2.675") == 268
+    assert to_pence("2.665") == 266
+    assert to_pence(0.1 + 0.2) == 30
+    assert str(from_pence(0)) == "0.00"
+    assert str(from_pence(1999)) == "19.99"
+
+
+# ---------- Summary parity (database) ----------
+
+@pytest.fixture
+def priced_catalogue(db):
+    cat = Category.objects.create(name="Pricing", slug="pricing")
+    ptype = ProductType.objects.create(name="Standard")
+    products = [
+        Product.objects.create(
+            name=f"Part {i}", variant="Base", description="x", type=ptype, tier="Standard",
+            category=cat, price=Decimal(price), stock=10, sku=f"SKU-PRC-{i}", product_code=f"PRC-{i}",
+        )
+        for i, price in enumerate(["4.99", "12.49", "0.01"])
+    ]
+    bundles = [
+        Bundle.objects.create(
+            name=f"Pack {i}", subtotal_price=Decimal(sub), price=Decimal(price),
+            discount_percentage=Decimal("10.00"), sku=f"B-PRC-{i}", bundle_code=f"bundle-prc-{i}",
+        )
+        for i, (sub, price) in enumerate([("20.00", "18.00"), ("33.33", "29.99")])
+    ]
+    return products, bundles
+
+
+def _expected_summary(product_lines, bundle_lines):
+    """`*_lines` are (legacy line dict, quantity) pairs."""
+    lines = [(line, q, False) for line, q in product_lines] + [(line, q, True) for line, q in bundle_lines]
+    return _legacy_totals(lines)
+
+
+def _session_qty(session_cart, key):
+    return session_cart[key]["quantity"]
+
+
+@pytest.mark.django_db
+def test_session_summary_parity(rf, priced_catalogue):
+    products, bundles = priced_catalogue
+    session_cart = {
+        products[0].product_code: {"product_id": products[0].id, "quantity": 3},
+        products[1].product_code: {"product_id": products[1].id, "quantity": 1},
+        products[2].product_code: {"product_id": products[2].id, "quantity": 2},
+        f"bundle_{bundles[0].id}": {"type": "bundle", "quantity": 2},
+        f"bundle_{bundles[1].id}": {"type": "bundle", "quantity": 1},
+    }
+    req = rf.get("/cart/")
+    req.user = types.SimpleNamespace(is_authenticated=False)
+    req.session = {"cart": session_cart}
+
+    summary = calculate_cart_summary(req, session_cart, "session")
+
+    product_lines = [
+        (_legacy_product_line(p, _session_qty(session_cart, key), session_cart[key]), _session_qty(session_cart, key))
+        for p, key in ((p, p.product_code) for p in products)
+    ]
+    bundle_lines = [
+        (_legacy_bundle_line(b, _session_qty(session_cart, key), session_cart[key]), _session_qty(session_cart, key))
+        for b, key in ((b, f"bundle_{b.id}") for b in bundles)
+    ]
+    assert [_exact(_line_values(ci)) for ci in summary["cart_items"]] == [
+        _exact(line) for line, _ in product_lines + bundle_lines
+    ]
+    expected = _expected_summary(product_lines, bundle_lines)
+    assert _exact({k: summary[k] for k in expected}) == _exact(expected)
+
+
+@pytest.mark.django_db
+def test_db_summary_parity(rf, priced_catalogue, user):
+    from apps.orders.models import Cart, CartItem
+
+    products, bundles = priced_catalogue
+    cart = Cart.objects.create(user=user)
+    for quantity, product in enumerate(products, start=1):
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+    bundle_entry = {"type": "bundle", "quantity": 2}
+
+    req = rf.get("/cart/")
+    req.user = user
+    req.session = {"cart": {f"bundle_{bundles[1].id}": bundle_entry}}
+
+    summary = calculate_cart_summary(req, cart, "db")
+
+    product_lines = [(_legacy_product_line(p, q), q) for q, p in enumerate(products, start=1)]
+    bundle_lines = [(_legacy_bundle_line(bundles[1], 2, bundle_entry), 2)]
+    assert [_exact(_line_values(ci)) for ci in summary["cart_items"]] == [
+        _exact(line) for line, _ in product_lines + bundle_lines
+    ]
+    expected = _expected_summary(product_lines, bundle_lines)
+    assert _exact({k: summary[k] for k in expected}) == _exact(expected)
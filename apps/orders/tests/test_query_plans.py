@@ -0,0 +1,20 @@
+"""
+Query-plan test for the order history index (Order.Meta.indexes).
+Located at apps/orders/tests/test_query_plans.py
+"""
+
+import pytest
+from django.db import connection, transaction
+from apps.orders.models import Order
+
+
+@pytest.mark.django_db
+def test_user_orders_by_date_use_index(user):
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = Order.objects.filter(user=user).order_by("-created_at").explain()
+
+    assert "order_user_created" in plan
+    assert "TEMP B-TREE" not in plan.upper()
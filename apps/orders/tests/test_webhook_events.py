@@ -0,0 +1,142 @@
+"""
+Tests for the Stripe webhook event ledger (StripeEvent).
+Covers duplicate deliveries being acknowledged without order work, failed
+and abandoned events being retried, ignored event types staying out of
+the ledger, and replaying events from the admin.
+Located at apps/orders/tests/test_webhook_events.py
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from apps.orders.models import Order, StripeEvent
+from apps.orders.utils import webhook_events
+from apps.orders.views import webhook
+
+
+@pytest.fixture
+def order_pending(db):
+    return Order.objects.create(
+        total_amount=Decimal("10.00"), total_price=Decimal("14.99"),
+        stripe_payment_intent="pi_77", is_paid=False,
+    )
+
+
+@pytest.fixture
+def event(order_pending):
+    return {
+        "id": "evt_77",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {
+            "object": "payment_intent",
+            "id": "pi_77",
+            "status": "succeeded",
+            "metadata": {"order_id": str(order_pending.id)},
+        }},
+    }
+
+
+@pytest.fixture
+def deliver(client, monkeypatch):
+    def _deliver(event):
+        monkeypatch.setattr(webhook, "verify_webhook_signature", lambda request: event)
+        return client.post(reverse("orders:webhook"), data=b"{}", content_type="application/json")
+    return _deliver
+
+
+@pytest.fixture
+def order_updates(monkeypatch):
+    """Count calls into the order update, optionally failing them."""
+    calls = {"count": 0, "fail": False}
+    real = webhook_events.update_order_from_stripe_session
+
+    def _update(payload):
+        calls["count"] += 1
+        if calls["fail"]:
+            raise RuntimeError("database unavailable")
+        return real(payload)
+    monkeypatch.setattr(webhook_events, "update_order_from_stripe_session", _update)
+    return calls
+
+
+@pytest.mark.django_db
+def test_duplicate_deliveries_update_the_order_once(deliver, event, order_pending, order_updates):
+    for _ in range(3):
+        assert deliver(event).status_code == 200
+
+    assert order_updates["count"] == 1
+    ledger = StripeEvent.objects.get()
+    assert (ledger.event_id, ledger.status, ledger.attempts) == ("evt_77", "processed", 1)
+    assert ledger.processed_at is not None and ledger.payload["data"]["object"]["id"] == "pi_77"
+    order_pending.refresh_from_db()
+    assert order_pending.is_paid is True
+
+
+@pytest.mark.django_db
+def test_failed_event_is_retried_by_the_next_delivery(deliver, event, order_pending, order_updates):
+    order_updates["fail"] = True
+    assert deliver(event).status_code == 500
+    ledger = StripeEvent.objects.get()
+    assert ledger.status == "failed" and "database unavailable" in ledger.last_error
+
+    order_updates["fail"] = False
+    assert deliver(event).status_code == 200
+    ledger.refresh_from_db()
+    assert (ledger.status, ledger.attempts, ledger.last_error) == ("processed", 2, "")
+    order_pending.refresh_from_db()
+    assert order_pending.is_paid is True
+
+
+@pytest.mark.django_db
+def test_only_abandoned_claims_are_taken_over(event):
+    StripeEvent.objects.create(event_id="evt_77", type=event["type"])
+    # Another worker is on it
+    assert webhook_events.claim_event(event) is False
+
+    StripeEvent.objects.filter(event_id="evt_77").update(
+        updated_at=timezone.now() - webhook_events.STALE_CLAIM - timedelta(seconds=1)
+    )
+    assert webhook_events.claim_event(event) is True
+    assert StripeEvent.objects.get().attempts == 2
+
+
+@pytest.mark.django_db
+def test_ignored_event_types_are_not_recorded(deliver, order_updates):
+    assert deliver({"id": "evt_charge", "type": "charge.succeeded", "data": {"object": {}}}).status_code == 200
+    assert not StripeEvent.objects.exists()
+    assert order_updates["count"] == 0
+
+
+@pytest.mark.django_db
+def test_admin_reprocesses_stored_events(client, event, order_pending):
+    StripeEvent.objects.create(event_id="evt_77", type=event["type"], status="failed", payload=event)
+    admin = User.objects.create_superuser("root", "root@example.com", "pw")
+    client.force_login(admin)
+
+    resp = client.post(
+        reverse("admin:orders_stripeevent_changelist"),
+        {"action": "reprocess_events", "_selected_action": [StripeEvent.objects.get().pk]},
+    )
+    assert resp.status_code == 302
+    assert StripeEvent.objects.get().status == "processed"
+    order_pending.refresh_from_db()
+    assert order_pending.is_paid is True
+
+
+@pytest.mark.django_db
+def test_admin_does_not_replay_events_still_processing(client, event, order_pending):
+    StripeEvent.objects.create(event_id="evt_77", type=event["type"], status="processing", payload=event)
+    client.force_login(User.objects.create_superuser("root", "root@example.com", "pw"))
+
+    client.post(
+        reverse("admin:orders_stripeevent_changelist"),
+        {"action": "reprocess_events", "_selected_action": [StripeEvent.objects.get().pk]},
+    )
+    stored = StripeEvent.objects.get()
+    assert (stored.status, stored.attempts) == ("processing", 1)
+    order_pending.refresh_from_db()
+    assert order_pending.is_paid is False
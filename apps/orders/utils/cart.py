@@ -5,44 +5,138 @@ Located at apps/orders/utils/cart.py
 """
 
 from apps.orders.models import Cart, CartItem
+from apps.orders.utils.cart_storage import get_cart_storage
+from apps.orders.utils.pricing import CartTotals, bundle_line, from_pence, product_line, to_pence
 from apps.products.models import Product, Bundle
+from apps.products.page_cache import (
+    catalogue_version, catalogue_version_subquery, known_catalogue_version, remember_catalogue_version,
+)
 from decimal import Decimal
 from datetime import date, timedelta
+from itertools import islice
+from types import SimpleNamespace
+from django.db import connection
+from django.db.models import F
+from django.utils.functional import cached_property
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of cart lines previewed in the navbar dropdown
+NAVBAR_PREVIEW_LINES = 3
+
+# Denormalized cart header kept next to the cart (bump the version whenever
+# the header shape or the way it is computed changes). The data it was
+# computed from is tracked separately by its stamp (see CartSnapshot.stamp).
+CART_HEADER_VERSION = 2
+
 
 def is_first_time_user(user):
     return hasattr(user, 'profile') and user.profile.is_first_time_buyer
 
 
-def add_to_cart(request, product_id, quantity=1):
+def add_to_cart(request, product_id, quantity=1, product=None):
     """
     Add a product to the active user's cart or session cart.
     If the product is already present, increase its quantity.
+
+    `quantity` must be at least 1. Pass `product` when the caller has
+    already loaded it to skip the lookup.
+
+    DB cart lines are written with a single upsert (see _upsert_cart_item),
+    so concurrent adds of the same product never lose an increment. A
+    signed-in add with an existing cart is three statements: the header
+    stamp check, the upsert and the Cart.version bump. The first and last
+    keep the session header in step with edits made elsewhere without
+    recomputing the cart.
     """
-    product = Product.objects.get(id=product_id)
+    if quantity < 1:
+        raise ValueError(f"Cannot add a quantity of {quantity} to the cart")
+    if product is None:
+        product = Product.objects.get(id=product_id)
+    header = _current_cart_header(request)
 
     if request.user.is_authenticated:
-        cart = get_or_create_cart(request.user)
-        item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-        item.quantity = item.quantity + quantity if not created else quantity
-        item.save()
+        new_line = _upsert_cart_item(request.user, product.id, quantity)
+        if new_line is None:
+            # First add for this user: create the cart, then retry once
+            get_or_create_cart(request.user)
+            new_line = _upsert_cart_item(request.user, product.id, quantity)
+        bump_cart_version(request.user)
     else:
-        cart = request.session.get('cart', {})
-        product_code = product.product_code
-        if product_code in cart:
-            cart[product_code]['quantity'] += quantity
+        storage = get_cart_storage(request)
+        cart = storage.load()
+        key = _session_product_key(cart, product)
+        new_line = key is None
+        if not new_line:
+            cart[key]['quantity'] += quantity
         else:
-            cart[product_code] = {
-                'product_id': product.id,
-                'name': product.name,
-                'quantity': quantity,
-                'price': float(product.price),
-                'image_type': product.image_type,
-            }
-        save_cart(request, cart)
+            cart[str(product.id)] = {'product_id': product.id, 'quantity': quantity}
+        storage.save(cart)
+
+    invalidate_cart_snapshot(request)
+    bump_cart_header(request, header, product.price, quantity, new_line)
+
+
+def _upsert_cart_item(user, product_id, quantity):
+    """
+    Add `quantity` of a product to the user's active cart in one statement:
+    INSERT ... ON CONFLICT (cart, product) DO UPDATE, backed by the
+    `unique_cart_product` constraint. Supported by PostgreSQL and SQLite.
+
+    Returns True if the line was inserted, False if an existing line was
+    incremented, or None if the user has no active cart.
+    """
+    qn = connection.ops.quote_name
+    item_table = qn(CartItem._meta.db_table)
+    if connection.vendor == "postgresql":
+        # xmax is only set on the row version an UPDATE wrote
+        inserted, inserted_params = "(xmax = 0)", []
+    else:
+        # SQLite has no xmax, but added quantities are at least 1, so the
+        # line is new exactly when it holds only what was just added
+        inserted, inserted_params = "quantity = %s", [quantity]
+    sql = (
+        f"INSERT INTO {item_table} (cart_id, product_id, quantity) "
+        f"SELECT id, %s, %s FROM {qn(Cart._meta.db_table)} "
+        f"WHERE user_id = %s AND is_active = %s ORDER BY id LIMIT 1 "
+        f"ON CONFLICT (cart_id, product_id) "
+        f"DO UPDATE SET quantity = {item_table}.quantity + excluded.quantity "
+        f"RETURNING {inserted}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [product_id, quantity, user.pk, True, *inserted_params])
+        row = cursor.fetchone()
+    return bool(row[0]) if row else None
+
+
+def upsert_cart_items(cart, quantities, batch_size=300):
+    """
+    Add {product_id: quantity} to `cart` with multi-row versions of the
+    _upsert_cart_item statement: existing lines are incremented in the
+    database, so lines added concurrently keep both quantities.
+    """
+    qn = connection.ops.quote_name
+    item_table = qn(CartItem._meta.db_table)
+    lines = list(quantities.items())
+    for start in range(0, len(lines), batch_size):
+        batch = lines[start:start + batch_size]
+        sql = (
+            f"INSERT INTO {item_table} (cart_id, product_id, quantity) "
+            f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+            f"ON CONFLICT (cart_id, product_id) "
+            f"DO UPDATE SET quantity = {item_table}.quantity + excluded.quantity"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [value for product_id, quantity in batch for value in (cart.pk, product_id, quantity)])
+
+
+def bump_cart_version(user):
+    """
+    Record a change to the user's DB cart items. CartItem saves and deletes
+    bump it through apps.orders.signals; queryset and raw writes call this.
+    """
+    Cart.objects.filter(user=user, is_active=True).update(version=F("version") + 1)
 
 
 def get_or_create_cart(user):
@@ -52,17 +146,22 @@ def get_or_create_cart(user):
 def get_active_cart(request):
     return (
         get_or_create_cart(request.user), 'db'
-    ) if request.user.is_authenticated else (request.session.get('cart', {}), 'session')
+    ) if request.user.is_authenticated else (get_session_cart(request), 'session')
+
+
+def get_session_cart(request):
+    """Return the guest/session cart dict from the configured cart storage."""
+    return get_cart_storage(request).load()
 
 
 def save_cart(request, cart_data):
-    request.session['cart'] = cart_data
-    request.session.modified = True
+    get_cart_storage(request).save(cart_data)
+    refresh_cart_header(request)
 
 
 def clear_session_cart(request):
-    request.session['cart'] = {}
-    request.session.modified = True
+    get_cart_storage(request).save({})
+    discard_cart_header(request)
 
 
 def clear_db_cart(user):
@@ -76,6 +175,103 @@ def clear_db_cart(user):
         cart.items.all().delete()
 
 
+def _bundle_id_from_key(key):
+    """Return the bundle pk encoded in a "bundle_<id>" session key, else None."""
+    if not (isinstance(key, str) and key.startswith("bundle_")):
+        return None
+    try:
+        return int(key.split("_", 1)[1])
+    except ValueError:
+        return None
+
+
+def _product_id_from_entry(entry):
+    """Return the product pk stored on a session cart entry, else None."""
+    try:
+        return int(entry.get("product_id"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _entry_quantity(entry):
+    try:
+        return int(entry.get("quantity", 0) or 0)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _session_product_key(cart, product):
+    """Return the key a product's line is stored under, or None."""
+    for key, entry in cart.items():
+        if _bundle_id_from_key(key) is None and _product_id_from_entry(entry) == product.id:
+            return key
+    return None
+
+
+def find_session_cart_key(cart, item_key):
+    """
+    Map the key from an update/remove URL (see the `item_key` filter: a
+    bundle key, product_code or product id) to the key the line is stored
+    under. Costs at most one query, when a product_code is not a stored key.
+    """
+    if item_key in cart:
+        return item_key
+    if item_key.startswith("bundle_"):
+        return None
+
+    if item_key.isdigit():
+        product_id = int(item_key)
+    else:
+        product_id = Product.objects.filter(product_code=item_key).values_list("pk", flat=True).first()
+        if product_id is None:
+            return None
+
+    for key, entry in cart.items():
+        if _bundle_id_from_key(key) is None and _product_id_from_entry(entry) == product_id:
+            return key
+    return None
+
+
+def session_cart_lines(session_cart, include_products=True):
+    """
+    Yield (bundle_id, product_id, quantity) for every usable session
+    cart line, without touching the database. Exactly one of bundle_id and
+    product_id is set; lines with a non-positive quantity are skipped.
+    """
+    for key, entry in (session_cart or {}).items():
+        quantity = _entry_quantity(entry)
+        if quantity <= 0:
+            continue
+        bundle_id = _bundle_id_from_key(key)
+        if bundle_id is not None:
+            yield bundle_id, None, quantity
+        elif include_products and not (isinstance(key, str) and key.startswith("bundle_")):
+            product_id = _product_id_from_entry(entry)
+            if product_id:
+                yield None, product_id, quantity
+
+
+def resolve_session_cart(session_cart, include_products=True):
+    """
+    Load every Bundle (and optionally Product) referenced by a session cart
+    up front, using one `in_bulk` query per model instead of one query per line.
+
+    Returns a (products_by_id, bundles_by_id) tuple. Ids pointing at deleted
+    rows are simply absent from the dicts, so callers can skip those lines.
+    """
+    product_ids = set()
+    bundle_ids = set()
+    for bundle_id, product_id, _ in session_cart_lines(session_cart, include_products):
+        if bundle_id is not None:
+            bundle_ids.add(bundle_id)
+        else:
+            product_ids.add(product_id)
+
+    products = Product.objects.in_bulk(product_ids) if product_ids else {}
+    bundles = Bundle.objects.in_bulk(bundle_ids) if bundle_ids else {}
+    return products, bundles
+
+
 def calculate_cart_summary(request, cart_data, cart_type):
     """
     Calculate full cart breakdown including:
@@ -83,293 +279,55 @@ def calculate_cart_summary(request, cart_data, cart_type):
     - Delivery fee logic
     - Grand total and estimated delivery date
 
+    Line and cart arithmetic is done in integer pence by the pricing engine
+    (apps/orders/utils/pricing.py); Decimals are only built for the result.
+
     Returns a structured summary dict for use in views.
     """
 
-    items = []
-    pre_total = Decimal("0.00")
-    post_total = Decimal("0.00")
-
-    bundle_discount_total = Decimal("0.00")  # only for display
-    cart_discount_total = Decimal("0.00")
+    lines = []
 
-    # 1) DB-backed cart
+    # 1) DB-backed cart: products from CartItem, bundles merged from the session
     if cart_type == "db":
         for ci in cart_data.items.select_related("product"):
-            product = ci.product
             quantity = int(ci.quantity or 0)
-            if quantity <= 0:
-                continue
-
-            unit_price = Decimal(product.price).quantize(Decimal("0.01"))
-            discounted_unit = unit_price  # no implicit product discounts in DB cart
-
-            line_unit_total = unit_price * quantity
-            line_disc_total = discounted_unit * quantity
-            line_discount_amount = (
-               (line_unit_total - line_disc_total) if line_disc_total < line_unit_total else Decimal("0.00")
-            )
-
-            discount_percent = Decimal("0.00")
-            is_bundle = False  # DB cart contains Products, not Bundles
-
-            items.append({
-                "product": product,
-                "bundle":  None,
-                "quantity": quantity,
-                "unit_price": unit_price,
-                "discounted_price": discounted_unit,
-                "discount_percent": discount_percent,
-                "subtotal": line_disc_total,
-                "line_subtotal_before_discount": line_unit_total,
-                "line_subtotal_after_discount": line_disc_total,
-                "line_discount_amount": line_discount_amount,
-                "tier": product.tier,
-                "is_bundle": is_bundle,
-            })
-
-            pre_total += line_unit_total
-            post_total += line_disc_total
-
-        # Check for any bundle entries in session cart to merge
-        session_cart = getattr(request, "session", {}).get("cart", {}) or {}
-        for key, entry in session_cart.items():
-            if not (isinstance(key, str) and key.startswith("bundle_")):
-                continue
-
-            try:
-                bundle_id = int(key.split("_", 1)[1])
-                bundle = Bundle.objects.get(pk=bundle_id)
-            except (ValueError, Bundle.DoesNotExist):
-                continue
-
-            try:
-                quantity = int(entry.get("quantity", 0) or 0)
-            except (TypeError, ValueError):
-                quantity = 0
-            if quantity <= 0:
-                continue
-
-            # base & discount
-            raw_base = getattr(bundle, "subtotal_price", None)
-            raw_disc_pct = getattr(bundle, "discount_percentage", Decimal("10.00"))
-
-            try:
-                base_price = Decimal(raw_base) if raw_base is not None else Decimal(bundle.price)
-            except Exception:
-                base_price = Decimal(bundle.price)
-
-            try:
-                disc_pct = (Decimal(raw_disc_pct) / Decimal("100")).quantize(Decimal("0.0001"))
-            except Exception:
-                disc_pct = Decimal("0.10")
-
-            # discounted unit: prefer session value,
-            # else model, else base*(1-disc)
-            if entry.get("price") is not None:
-                try:
-                    discounted_unit = Decimal(entry["price"])
-                except Exception:
-                    discounted_unit = base_price * (Decimal("1.00") - disc_pct)
-            else:
-                try:
-                    discounted_unit = Decimal(bundle.price)
-                except Exception:
-                    discounted_unit = base_price * (Decimal("1.00") - disc_pct)
-
-            base_price = base_price.quantize(Decimal("0.01"))
-            discounted_unit = discounted_unit.quantize(Decimal("0.01"))
-
-            line_unit_total = base_price * quantity
-            line_disc_total = discounted_unit * quantity
-            line_discount_amount = (
-                (line_unit_total - line_disc_total) if line_disc_total < line_unit_total else Decimal("0.00")
-            )
-
-            if discounted_unit < base_price:
-                bundle_discount_total += (base_price - discounted_unit) * quantity
-
-            discount_percent = (
-                ((base_price - discounted_unit) / base_price * Decimal("100.00"))
-                if base_price > 0 and discounted_unit < base_price
-                else Decimal("0.00")
-            )
-
-            items.append({
-                "product": None,
-                "bundle":  bundle,
-                "quantity": quantity,
-                "unit_price": base_price,
-                "discounted_price": discounted_unit,
-                "discount_percent": discount_percent,
-                "subtotal": line_disc_total,
-                "line_subtotal_before_discount": line_unit_total,
-                "line_subtotal_after_discount": line_disc_total,
-                "line_discount_amount": line_discount_amount,
-                "tier": getattr(bundle, "bundle_type", None),
-                "is_bundle": True,
-            })
-
-            pre_total += line_unit_total
-            post_total += line_disc_total
+            if quantity > 0:
+                lines.append(product_line(ci.product, quantity))
+        session_cart = get_session_cart(request)
+        products, bundles = resolve_session_cart(session_cart, include_products=False)
 
     # 2) Session-backed cart
     else:
-        for key, entry in (cart_data or {}).items():
-            # --- bundle entry if key starts with "bundle_"
-            if isinstance(key, str) and key.startswith("bundle_"):
-                try:
-                    bundle_id = int(key.split("_", 1)[1])
-                    bundle = Bundle.objects.get(pk=bundle_id)
-                except (ValueError, Bundle.DoesNotExist):
-                    continue
-
-                try:
-                    quantity = int(entry.get("quantity", 0) or 0)
-                except (TypeError, ValueError):
-                    quantity = 0
-                if quantity <= 0:
-                    continue
-
-                # Prefer model fields
-                raw_base = getattr(bundle, "subtotal_price", None)
-                raw_disc_pct = getattr(bundle, "discount_percentage", Decimal("10.00"))
-
-                try:
-                    base_price = Decimal(raw_base) if raw_base is not None else Decimal(bundle.price)
-                except Exception:
-                    base_price = Decimal(bundle.price)
-
-                # derive discount percent (e.g. 10.00 -> 0.10)
-                try:
-                    disc_pct = (Decimal(raw_disc_pct) / Decimal("100")).quantize(Decimal("0.0001"))
-                except Exception:
-                    disc_pct = Decimal("0.10")
-
-                # discounted unit: prefer session-provided price, else model price, else base*(1-disc)
-                if entry.get("price") is not None:
-                    try:
-                        discounted_unit = Decimal(entry["price"])
-                    except Exception:
-                        discounted_unit = base_price * (Decimal("1.00") - disc_pct)
-                else:
-                    try:
-                        discounted_unit = Decimal(bundle.price)
-                    except Exception:
-                        discounted_unit = base_price * (Decimal("1.00") - disc_pct)
-
-                # normalise
-                base_price = base_price.quantize(Decimal("0.01"))
-                discounted_unit = discounted_unit.quantize(Decimal("0.01"))
-
-                line_unit_total = base_price * quantity
-                line_disc_total = discounted_unit * quantity
-                line_discount_amount = (
-                   (line_unit_total - line_disc_total) if line_disc_total < line_unit_total else Decimal("0.00")
-                )
-
-                # track discount for display/evidence
-                if discounted_unit < base_price:
-                    bundle_discount_total += (base_price - discounted_unit) * quantity
-
-                discount_percent = (
-                    ((base_price - discounted_unit) / base_price * Decimal("100.00"))
-                    if base_price > 0 and discounted_unit < base_price
-                    else Decimal("0.00")
-                )
-
-                items.append({
-                    "product": None,
-                    "bundle":  bundle,
-                    "quantity": quantity,
-                    "unit_price": base_price,
-                    "discounted_price": discounted_unit,
-                    "discount_percent": discount_percent,
-                    "subtotal": line_disc_total,
-                    "line_subtotal_before_discount": line_unit_total,
-                    "line_subtotal_after_discount": line_disc_total,
-                    "line_discount_amount": line_discount_amount,
-                    "tier": getattr(bundle, "bundle_type", None),
-                    "is_bundle": True,
-                })
-
-                pre_total += line_unit_total
-                post_total += line_disc_total
-                continue
-
-            prod_id = entry.get("product_id")
-            try:
-                quantity = int(entry.get("quantity", 0) or 0)
-            except (TypeError, ValueError):
-                quantity = 0
-            if not prod_id or quantity <= 0:
-                continue
-
-            try:
-                product = Product.objects.get(pk=prod_id)
-            except Product.DoesNotExist:
-                continue
-
-            unit_price = Decimal(product.price)
-
-            try:
-                discounted_unit = Decimal(entry.get("price", unit_price))
-            except Exception:
-                discounted_unit = unit_price
-
-            discounted_unit = discounted_unit.quantize(Decimal("0.01"))
-            unit_price = unit_price.quantize(Decimal("0.01"))
-
-            line_unit_total = unit_price * quantity
-            line_disc_total = discounted_unit * quantity
-            line_discount_amount = (
-                (line_unit_total - line_disc_total) if line_disc_total < line_unit_total else Decimal("0.00")
-            )
-
-            discount_percent = (
-                ((unit_price - discounted_unit) / unit_price * Decimal("100.00"))
-                if unit_price > 0 and discounted_unit < unit_price
-                else Decimal("0.00")
-            )
-
-            items.append({
-                "product": product,
-                "bundle": None,
-                "quantity": quantity,
-                "unit_price": unit_price,
-                "discounted_price": discounted_unit,
-                "discount_percent": discount_percent,
-                "subtotal": line_disc_total,
-                "line_subtotal_before_discount": line_unit_total,
-                "line_subtotal_after_discount": line_disc_total,
-                "line_discount_amount": line_discount_amount,
-                "tier": product.tier,
-                "is_bundle": False,
-            })
-
-            pre_total += line_unit_total
-            post_total += line_disc_total
-
-    # 3) Totals
-    total_before_discount = pre_total
-    total = post_total
+        session_cart = cart_data
+        products, bundles = resolve_session_cart(session_cart)
+
+    for bundle_id, product_id, quantity in session_cart_lines(session_cart, cart_type != "db"):
+        if bundle_id is not None:
+            bundle = bundles.get(bundle_id)
+            if bundle is not None:
+                lines.append(bundle_line(bundle, quantity))
+        else:
+            product = products.get(product_id)
+            if product is not None:
+                lines.append(product_line(product, quantity))
 
+    # 3) Totals, delivery fee & grand total
     first_time_customer = (
         request.user.is_authenticated and is_first_time_user(request.user)
     )
-    cart_discount_total = Decimal("0.00")
+    totals = CartTotals(lines, free_delivery=first_time_customer)
 
-    # 4) Delivery fee & grand total
-    delivery_fee = Decimal("0.00") if (
-        first_time_customer or total_before_discount >= Decimal("40.00")
-    ) else Decimal("4.99")
-
-    grand_total = (total + delivery_fee).quantize(Decimal("0.01"))
+    total_before_discount = from_pence(totals.before_pence)
+    total = from_pence(totals.after_pence)
+    bundle_discount_total = from_pence(totals.bundle_discount_pence)
+    cart_discount_total = Decimal("0.00")
+    delivery_fee = from_pence(totals.delivery_pence)
+    grand_total = from_pence(totals.grand_total_pence)
     estimated_delivery = date.today() + timedelta(days=2)
     total_saved = (bundle_discount_total + cart_discount_total).quantize(Decimal("0.01"))
 
     logger.debug(
-        f"[CART] Items:{len(items)} Sub:{total_before_discount:.2f} "
+        f"[CART] Items:{len(lines)} Sub:{total_before_discount:.2f} "
         f"BundleDisc:{bundle_discount_total:.2f} "
         f"FirstTimeDisc:{cart_discount_total:.2f} "
         f"Final:{total:.2f} Delivery:{delivery_fee:.2f} "
@@ -377,7 +335,7 @@ def calculate_cart_summary(request, cart_data, cart_type):
     )
 
     return {
-        "cart_items": items,
+        "cart_items": [line.as_dict() for line in lines],
         "cart_type": cart_type,
         "cart_total": total,
         "total_before_discount": total_before_discount,
@@ -390,3 +348,251 @@ def calculate_cart_summary(request, cart_data, cart_type):
         "estimated_delivery": estimated_delivery,
         "total_saved": total_saved,
     }
+
+
+class CartSnapshot:
+    """
+    Request-scoped, lazily computed view of the active cart.
+
+    Nothing is queried until a consumer reads `summary` (or one of the
+    shortcuts below), and the result is then memoized for the rest of the
+    request, so the context processor and the cart/checkout/payment views
+    share a single cart lookup.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def active(self):
+        return get_active_cart(self.request)
+
+    @cached_property
+    def summary(self):
+        cart_data, cart_type = self.active
+        return calculate_cart_summary(self.request, cart_data, cart_type)
+
+    @property
+    def items(self):
+        return self.summary["cart_items"]
+
+    @cached_property
+    def stamp(self):
+        """
+        What the cart header is computed from: the catalogue version (prices,
+        deleted products) and, for signed-in users, their DB cart's version,
+        which moves with edits from other sessions and the admin too.
+
+        Checking it is the price of a header that follows those changes: at
+        most one single-row query. The catalogue version is memoized on the
+        request, so guests pay nothing extra on pages that already read it
+        (the page cache and ETags do), and signed-in users read both
+        versions together.
+        """
+        request = self.request
+        user = request.user
+        if not user.is_authenticated:
+            return [catalogue_version(request), None]
+
+        carts = Cart.objects.filter(user=user, is_active=True)
+        known = known_catalogue_version(request)
+        if known is not None:
+            return [known, carts.values_list("version", flat=True).first()]
+        row = carts.values_list("version", catalogue_version_subquery()).first()
+        if row is None:
+            return [catalogue_version(request), None]
+        remember_catalogue_version(request, row[1])
+        return [catalogue_version(request), row[0]]
+
+    @property
+    def is_summarized(self):
+        return "summary" in self.__dict__
+
+    @cached_property
+    def session_cart(self):
+        return get_session_cart(self.request)
+
+    @cached_property
+    def item_count(self):
+        """
+        Total quantity in the cart. Reuses the summary when a view already
+        built it; otherwise it is answered from the session cart header
+        after checking its stamp (see get_cart_header).
+        """
+        if self.is_summarized:
+            return sum(ci["quantity"] for ci in self.items)
+        return get_cart_header(self.request)["qty"]
+
+    @cached_property
+    def preview_items(self):
+        """
+        The first NAVBAR_PREVIEW_LINES cart lines for the navbar dropdown.
+        Only those lines are loaded: a sliced CartItem query for the DB cart
+        plus one in_bulk per model for the previewed session lines. Session
+        lines whose product or bundle has been deleted are skipped, and the
+        next ones loaded in their place.
+        """
+        limit = NAVBAR_PREVIEW_LINES
+        if self.is_summarized:
+            return self.items[:limit]
+
+        user = self.request.user
+        items = []
+        if user.is_authenticated:
+            items.extend(
+                CartItem.objects
+                .filter(cart__user=user, cart__is_active=True)
+                .select_related("product")
+                .order_by("id")[:limit]
+            )
+
+        remaining = session_cart_lines(self.session_cart, include_products=not user.is_authenticated)
+        while len(items) < limit:
+            lines = list(islice(remaining, limit - len(items)))
+            if not lines:
+                break
+            bundle_ids = {b for b, _, _ in lines if b is not None}
+            product_ids = {p for _, p, _ in lines if p is not None}
+            bundles = Bundle.objects.in_bulk(bundle_ids) if bundle_ids else {}
+            products = Product.objects.in_bulk(product_ids) if product_ids else {}
+
+            for bundle_id, product_id, quantity in lines:
+                obj = bundles.get(bundle_id) if bundle_id else products.get(product_id)
+                if obj is None:
+                    continue
+                unit = Decimal(obj.price)
+                items.append(SimpleNamespace(
+                    product=obj if product_id else None,
+                    bundle=obj if bundle_id else None,
+                    quantity=quantity,
+                    get_total_price=unit * quantity,
+                ))
+        return items
+
+    def invalidate(self):
+        """Drop memoized data after the cart has been modified."""
+        for attr in ("active", "summary", "session_cart", "item_count", "preview_items", "stamp"):
+            self.__dict__.pop(attr, None)
+
+
+def get_cart_snapshot(request):
+    """
+    Return the request's CartSnapshot, attaching one if CartMiddleware
+    has not already done so (e.g. requests built with RequestFactory).
+    """
+    snapshot = getattr(request, "cart", None)
+    if not isinstance(snapshot, CartSnapshot):
+        snapshot = CartSnapshot(request)
+        request.cart = snapshot
+    return snapshot
+
+
+def invalidate_cart_snapshot(request):
+    snapshot = getattr(request, "cart", None)
+    if isinstance(snapshot, CartSnapshot):
+        snapshot.invalidate()
+
+
+def _cart_header_owner(request):
+    user = getattr(request, "user", None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def build_cart_header(request):
+    """
+    Compute the compact cart header (line count, quantity total,
+    pre-discount subtotal in pence) from the request's cart snapshot.
+    """
+    snapshot = get_cart_snapshot(request)
+    items = snapshot.items
+    subtotal = snapshot.summary["total_before_discount"]
+    return {
+        "v": CART_HEADER_VERSION,
+        "stamp": snapshot.stamp,
+        "user": _cart_header_owner(request),
+        "lines": len(items),
+        "qty": sum(ci["quantity"] for ci in items),
+        "subtotal_pence": int((subtotal * 100).to_integral_value()),
+    }
+
+
+def refresh_cart_header(request):
+    """
+    Rebuild the session cart header after a cart mutation.
+    Called by every code path that changes the cart contents.
+    """
+    invalidate_cart_snapshot(request)
+    header = build_cart_header(request)
+    get_cart_storage(request).set_header(header)
+    return header
+
+
+def discard_cart_header(request):
+    """
+    Drop the session cart header so the next read rebuilds it. Used where
+    the request's user may not be settled yet (login) or the cart was
+    emptied wholesale.
+    """
+    get_cart_storage(request).discard_header()
+    invalidate_cart_snapshot(request)
+
+
+def _current_cart_header(request):
+    """
+    Return the session cart header if it is still valid for this request,
+    the empty header for a guest with no cart, or None when it needs a rebuild.
+    A stored header is valid while its stamp matches the cart's.
+    """
+    storage = get_cart_storage(request)
+    owner = _cart_header_owner(request)
+    header = storage.get_header()
+    if (
+        isinstance(header, dict) and header.get("v") == CART_HEADER_VERSION and header.get("user") == owner
+        and header.get("stamp") == get_cart_snapshot(request).stamp
+    ):
+        return header
+
+    if header is None and owner is None and not storage.load():
+        return {"v": CART_HEADER_VERSION, "user": None, "lines": 0, "qty": 0, "subtotal_pence": 0}
+    return None
+
+
+def bump_cart_header(request, header, unit_price, quantity, new_line):
+    """
+    Apply a single-line add to `header` (as read before the mutation)
+    without recomputing the cart. Discards the session header instead
+    when there was no valid one to update.
+    """
+    if header is not None and _cart_header_owner(request) is not None:
+        # The header matched the cart until this add, the cart's next change
+        cart_version = header["stamp"][1]
+        stamp = [header["stamp"][0], cart_version + 1] if cart_version is not None else None
+    else:
+        stamp = [catalogue_version(request), None]
+    if header is None or stamp is None:
+        discard_cart_header(request)
+        return None
+
+    header = dict(
+        header,
+        stamp=stamp,
+        lines=header["lines"] + int(new_line),
+        qty=header["qty"] + quantity,
+        subtotal_pence=header["subtotal_pence"] + to_pence(unit_price) * quantity,
+    )
+    get_cart_storage(request).set_header(header)
+    return header
+
+
+def get_cart_header(request):
+    """
+    Return the session cart header, rebuilding it from the cart when it is
+    missing, written by an older header version, or belongs to a different
+    user. Guests without a cart get an empty header without creating
+    a session.
+    """
+    if getattr(request, "session", None) is None:
+        return build_cart_header(request)
+
+    header = _current_cart_header(request)
+    return header if header is not None else refresh_cart_header(request)
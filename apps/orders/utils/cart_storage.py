@@ -0,0 +1,226 @@
+"""
+Pluggable storage for the guest/session cart and its header.
+
+The backend is chosen with the CART_STORAGE setting (a dotted path, like
+Django's MESSAGE_STORAGE):
+- SessionCartStorage (default) keeps everything in request.session, so it
+  follows SESSION_ENGINE (db, cache or cached_db).
+- SignedCookieCartStorage keeps guest carts in a compact signed cookie
+  (product/bundle ids and quantities only), so guest browsing does no
+  session table I/O. Authenticated users still use the session.
+
+Carts are stored in a compact, versioned form, {"_v": 2, "<product_id>": qty,
+"b:<bundle_id>": qty}, and expanded on load into the dict shape that
+calculate_cart_summary consumes. Session carts in the older format (full
+line snapshots keyed by product_code) are read transparently and rewritten
+in the compact form the first time they are loaded.
+Located at apps/orders/utils/cart_storage.py
+"""
+
+import logging
+
+from django.conf import settings
+from django.core import signing
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CART_STORAGE = "apps.orders.utils.cart_storage.SessionCartStorage"
+
+CART_SESSION_KEY = "cart"
+CART_FORMAT_VERSION = 2
+CART_HEADER_SESSION_KEY = "cart_header"
+
+CART_COOKIE_SALT = "apps.orders.cart"
+CART_COOKIE_MAX_AGE = 60 * 60 * 24 * 30
+# Browsers drop cookies above ~4KB; warn well before a cart gets there
+CART_COOKIE_WARN_BYTES = 3500
+
+
+class SessionCartStorage:
+    """Cart lines and header stored in request.session."""
+
+    def __init__(self, request):
+        self.request = request
+
+    @property
+    def session(self):
+        return getattr(self.request, "session", None)
+
+    def load(self):
+        stored = (self.session or {}).get(CART_SESSION_KEY) or {}
+        if stored.get("_v") == CART_FORMAT_VERSION:
+            return unpack_cart(stored)
+
+        # Legacy format: migrate in place on first touch
+        cart = unpack_cart(pack_cart(stored))
+        if stored:
+            self.save(cart)
+        return cart
+
+    def save(self, cart):
+        self.session[CART_SESSION_KEY] = pack_cart(cart)
+
+    def get_header(self):
+        return (self.session or {}).get(CART_HEADER_SESSION_KEY)
+
+    def set_header(self, header):
+        self.session[CART_HEADER_SESSION_KEY] = header
+
+    def discard_header(self):
+        if self.session is not None:
+            self.session.pop(CART_HEADER_SESSION_KEY, None)
+
+    def guest_cart(self):
+        """Return the cart collected before login."""
+        return self.load()
+
+    def take_guest_cart(self):
+        """Return the cart collected before login and empty it."""
+        cart = self.guest_cart()
+        if cart:
+            self.save({})
+        return cart
+
+    def update_response(self, response):
+        """Persist pending changes on the response (nothing to do for sessions)."""
+        return response
+
+
+def pack_cart(cart):
+    """
+    Reduce a cart dict (either shape) to the compact stored form.
+    Names and captured prices are dropped; lines are priced from the
+    database when the cart is summarized.
+    """
+    packed = {"_v": CART_FORMAT_VERSION}
+    for key, entry in cart.items():
+        try:
+            quantity = int(entry.get("quantity", 0) or 0)
+            if isinstance(key, str) and key.startswith("bundle_"):
+                ref = f"b:{int(key.split('_', 1)[1])}"
+            else:
+                ref = str(int(entry.get("product_id")))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if quantity > 0:
+            packed[ref] = packed.get(ref, 0) + quantity
+    return packed
+
+
+def unpack_cart(packed):
+    """
+    Expand a packed cart back into the session dict shape. Product lines are
+    keyed by product id, bundles by "bundle_<id>".
+    """
+    cart = {}
+    for ref, quantity in (packed or {}).items():
+        if ref == "_v":
+            continue
+        if ref.startswith("b:"):
+            cart[f"bundle_{ref[2:]}"] = {"type": "bundle", "quantity": quantity}
+        elif ref.isdigit():
+            cart[ref] = {"product_id": int(ref), "quantity": quantity}
+    return cart
+
+
+class SignedCookieCartStorage(SessionCartStorage):
+    """
+    Guest carts in a signed cookie written by CartMiddleware; falls back to
+    the session for authenticated users, whose products live in the DB.
+    """
+
+    cookie_name = "cart"
+    _dirty = False
+
+    def _is_guest(self):
+        user = getattr(self.request, "user", None)
+        return not (user is not None and user.is_authenticated)
+
+    @cached_property
+    def _payload(self):
+        raw = self.request.COOKIES.get(self.cookie_name)
+        if not raw:
+            return {}
+        try:
+            payload = signing.loads(raw, salt=CART_COOKIE_SALT, max_age=CART_COOKIE_MAX_AGE)
+        except signing.BadSignature:
+            logger.warning("[Cart] Ignoring cart cookie with a bad signature")
+            self._dirty = True
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+    def _write(self, key, value):
+        if value:
+            self._payload[key] = value
+        else:
+            self._payload.pop(key, None)
+        self._dirty = True
+
+    def load(self):
+        if not self._is_guest():
+            return super().load()
+        return unpack_cart(self._payload.get("c"))
+
+    def save(self, cart):
+        if not self._is_guest():
+            return super().save(cart)
+        packed = pack_cart(cart)
+        self._write("c", packed if len(packed) > 1 else None)
+
+    def get_header(self):
+        if not self._is_guest():
+            return super().get_header()
+        return self._payload.get("h")
+
+    def set_header(self, header):
+        if not self._is_guest():
+            return super().set_header(header)
+        self._write("h", header)
+
+    def discard_header(self):
+        if not self._is_guest():
+            return super().discard_header()
+        if "h" in self._payload:
+            self._write("h", None)
+
+    def guest_cart(self):
+        return unpack_cart(self._payload.get("c"))
+
+    def take_guest_cart(self):
+        cart = self.guest_cart()
+        if self._payload:
+            self._payload.clear()
+            self._dirty = True
+        return cart
+
+    def update_response(self, response):
+        if not self._dirty:
+            return response
+        if not self._payload:
+            response.delete_cookie(self.cookie_name)
+            return response
+
+        value = signing.dumps(self._payload, salt=CART_COOKIE_SALT, compress=True)
+        if len(value) > CART_COOKIE_WARN_BYTES:
+            logger.warning(f"[Cart] Cart cookie is {len(value)} bytes ({len(self._payload.get('c', {}))} lines)")
+        response.set_cookie(
+            self.cookie_name,
+            value,
+            max_age=CART_COOKIE_MAX_AGE,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
+
+
+def get_cart_storage(request):
+    """Return the request's cart storage, creating it on first use."""
+    storage = getattr(request, "cart_storage", None)
+    if storage is None:
+        storage_class = import_string(getattr(settings, "CART_STORAGE", DEFAULT_CART_STORAGE))
+        storage = storage_class(request)
+        request.cart_storage = storage
+    return storage
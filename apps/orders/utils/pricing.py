@@ -0,0 +1,153 @@
+"""
+Integer-pence pricing engine for the cart.
+
+All per-line and cart-level arithmetic happens on ints (minor units);
+`Decimal` is only used to parse incoming prices and to build the values
+handed to templates and Stripe, so the totals match the previous
+Decimal-based cart logic exactly.
+Located at apps/orders/utils/pricing.py
+"""
+
+from decimal import Decimal
+
+CENT = Decimal("0.01")
+HUNDRED = Decimal("100.00")
+DEFAULT_BUNDLE_DISCOUNT = Decimal("10.00")
+
+FREE_DELIVERY_THRESHOLD_PENCE = 4000
+DELIVERY_FEE_PENCE = 499
+
+
+def to_pence(value):
+    """
+    Convert a price (Decimal, str, int or float) to integer pence,
+    rounding half-even to the nearest penny like `Decimal.quantize`.
+    Raises on values that are not finite numbers.
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(value)
+    return int(value.quantize(CENT).scaleb(2))
+
+
+def from_pence(pence):
+    """Convert integer pence back to a 2dp Decimal."""
+    return Decimal(pence).scaleb(-2)
+
+
+def _parse_pence(value):
+    """Like `to_pence`, but returns None for missing or unparseable prices."""
+    if value is None:
+        return None
+    try:
+        return to_pence(value)
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+
+
+class PricedLine:
+    """
+    One priced cart line. Products and bundles share this type: `unit_pence`
+    is the list price and `discounted_pence` what the customer pays per unit.
+    """
+
+    __slots__ = ("product", "bundle", "quantity", "unit_pence", "discounted_pence")
+
+    def __init__(self, product, bundle, quantity, unit_pence, discounted_pence):
+        self.product = product
+        self.bundle = bundle
+        self.quantity = quantity
+        self.unit_pence = unit_pence
+        self.discounted_pence = discounted_pence
+
+    @property
+    def is_bundle(self):
+        return self.bundle is not None
+
+    @property
+    def before_pence(self):
+        return self.unit_pence * self.quantity
+
+    @property
+    def after_pence(self):
+        return self.discounted_pence * self.quantity
+
+    @property
+    def discount_pence(self):
+        return max(self.before_pence - self.after_pence, 0)
+
+    def discount_percent(self):
+        if self.unit_pence > 0 and self.discounted_pence < self.unit_pence:
+            unit = from_pence(self.unit_pence)
+            return (unit - from_pence(self.discounted_pence)) / unit * HUNDRED
+        return Decimal("0.00")
+
+    def as_dict(self):
+        """Template/checkout representation of the line, in Decimals."""
+        after = from_pence(self.after_pence)
+        return {
+            "product": self.product,
+            "bundle": self.bundle,
+            "quantity": self.quantity,
+            "unit_price": from_pence(self.unit_pence),
+            "discounted_price": from_pence(self.discounted_pence),
+            "discount_percent": self.discount_percent(),
+            "subtotal": after,
+            "line_subtotal_before_discount": from_pence(self.before_pence),
+            "line_subtotal_after_discount": after,
+            "line_discount_amount": from_pence(self.discount_pence),
+            "tier": getattr(self.bundle, "bundle_type", None) if self.is_bundle else self.product.tier,
+            "is_bundle": self.is_bundle,
+        }
+
+
+def product_line(product, quantity):
+    """Price a product line at the product's current price."""
+    unit = to_pence(product.price)
+    return PricedLine(product, None, quantity, unit, unit)
+
+
+def bundle_line(bundle, quantity):
+    """
+    Price a bundle line against its pre-discount subtotal. The customer pays
+    `bundle.price`, else the subtotal less the bundle's discount percentage.
+    """
+    raw_base = bundle.subtotal_price if bundle.subtotal_price is not None else bundle.price
+    try:
+        base = Decimal(raw_base)
+    except (ArithmeticError, TypeError, ValueError):
+        base = Decimal(bundle.price)
+
+    discounted = _parse_pence(bundle.price)
+    if discounted is None:
+        try:
+            rate = (Decimal(bundle.discount_percentage) / Decimal("100")).quantize(Decimal("0.0001"))
+        except (ArithmeticError, TypeError, ValueError):
+            rate = DEFAULT_BUNDLE_DISCOUNT / Decimal("100")
+        discounted = to_pence(base * (Decimal("1.00") - rate))
+
+    return PricedLine(None, bundle, quantity, to_pence(base), discounted)
+
+
+class CartTotals:
+    """Cart-level totals over a list of PricedLine objects, in pence."""
+
+    __slots__ = ("lines", "before_pence", "after_pence", "bundle_discount_pence", "delivery_pence")
+
+    def __init__(self, lines, free_delivery=False):
+        self.lines = lines
+        before = after = bundle_discount = 0
+        for line in lines:
+            before += line.before_pence
+            after += line.after_pence
+            if line.bundle is not None:
+                bundle_discount += line.discount_pence
+        self.before_pence = before
+        self.after_pence = after
+        self.bundle_discount_pence = bundle_discount
+        self.delivery_pence = (
+            0 if free_delivery or before >= FREE_DELIVERY_THRESHOLD_PENCE else DELIVERY_FEE_PENCE
+        )
+
+    @property
+    def grand_total_pence(self):
+        return self.after_pence + self.delivery_pence
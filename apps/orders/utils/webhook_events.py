@@ -0,0 +1,102 @@
+"""
+Utilities for ingesting Stripe webhook events exactly once.
+
+Every handled event is claimed in the StripeEvent ledger before any order
+work: the claim is a single insert against the unique event_id, so a
+retried or duplicated delivery of an event that was already processed
+(or is being processed) is acknowledged without touching orders.
+Failed events, and claims left in "processing" by a crashed worker, are
+taken over by the next delivery, which is how Stripe's retries recover.
+Admin replays claim the event the same way (claim_for_replay).
+Located at apps/orders/utils/webhook_events.py
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.orders.models import StripeEvent
+from apps.orders.utils.order import update_order_from_stripe_session
+
+logger = logging.getLogger(__name__)
+
+# Event types that should update Order state in the DB
+HANDLED_TYPES = {
+    # Payment Element / PI lifecycle
+    "payment_intent.succeeded",
+    "payment_intent.canceled",
+    "payment_intent.payment_failed",
+    "payment_intent.processing",
+
+    # Hosted checkout lifecycle
+    "checkout.session.completed",
+    "checkout.session.async_payment_succeeded",
+    "checkout.session.async_payment_failed",
+    "checkout.session.expired",
+}
+
+# A claim still "processing" after this long is assumed abandoned
+STALE_CLAIM = timedelta(minutes=10)
+
+
+def claim_event(event) -> bool:
+    """
+    Record `event` in the ledger. Returns True if the caller should process
+    it, False if it is a duplicate of one processed or in progress.
+    """
+    event_id = event["id"]
+    try:
+        with transaction.atomic():
+            StripeEvent.objects.create(event_id=event_id, type=event.get("type") or "", payload=dict(event))
+        return True
+    except IntegrityError:
+        pass
+
+    return _reclaim(event_id, Q(status="failed"))
+
+
+def claim_for_replay(event_id) -> bool:
+    """
+    Claim a stored event for a manual replay. Processed and failed events
+    can be replayed; one still being processed by a delivery cannot.
+    """
+    return _reclaim(event_id, Q(status__in=("processed", "failed")))
+
+
+def _reclaim(event_id, claimable):
+    # Abandoned claims are always up for grabs
+    now = timezone.now()
+    retry = claimable | Q(status="processing", updated_at__lt=now - STALE_CLAIM)
+    return bool(
+        StripeEvent.objects.filter(retry, event_id=event_id)
+        .update(status="processing", attempts=F("attempts") + 1, updated_at=now)
+    )
+
+
+def finish_event(event_id, error=None):
+    """Mark a claimed event processed, or failed with `error`."""
+    now = timezone.now()
+    if error is None:
+        fields = {"status": "processed", "processed_at": now, "last_error": ""}
+    else:
+        fields = {"status": "failed", "last_error": str(error)[:2000]}
+    StripeEvent.objects.filter(event_id=event_id).update(updated_at=now, **fields)
+
+
+def process_event(event):
+    """Apply a handled event to its Order. Returns the Order or None."""
+    event_type = event.get("type")
+    obj = (event.get("data") or {}).get("object") or {}
+    order = update_order_from_stripe_session(obj)
+    if order:
+        logger.info(
+            "[WEBHOOK] %s -> Order #%s payment_status=%s",
+            event_type, order.id, order.payment_status
+        )
+    else:
+        logger.warning(
+            "[WEBHOOK] %s did not match any Order", event_type
+        )
+    return order
@@ -12,15 +12,21 @@ from django.http import HttpResponseRedirect
 from apps.products.models import Product, Bundle
 from apps.orders.models import CartItem
 from apps.orders.utils.cart import (
-    add_to_cart, get_active_cart, save_cart, calculate_cart_summary
+    add_to_cart, get_active_cart, save_cart, get_cart_snapshot, refresh_cart_header,
+    get_session_cart, find_session_cart_key,
 )
 
 
 def add_to_cart_view(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     if request.method == 'POST':
-        quantity = int(request.POST.get('quantity', 1))
-        add_to_cart(request, product_id, quantity)
+        try:
+            quantity = int(request.POST.get('quantity', 1))
+        except (TypeError, ValueError):
+            quantity = 1
+        if quantity < 1:
+            quantity = 1
+        add_to_cart(request, product_id, quantity, product=product)
         messages.success(request, f"Added {product.name} to your cart.")
     return redirect(request.META.get('HTTP_REFERER', 'products:product_list'))
 
@@ -28,7 +34,7 @@ def add_to_cart_view(request, product_id):
 @require_POST
 def add_bundle_to_cart_view(request, bundle_id):
     bundle = get_object_or_404(Bundle, id=bundle_id)
-    cart = request.session.get('cart', {})
+    cart = get_session_cart(request)
 
     try:
         quantity = int(request.POST.get('quantity', 1))
@@ -42,12 +48,7 @@ def add_bundle_to_cart_view(request, bundle_id):
     if item_key in cart:
         cart[item_key]['quantity'] += quantity
     else:
-        cart[item_key] = {
-            'type': 'bundle',
-            'name': bundle.name,
-            'price': str(bundle.price),
-            'quantity': quantity,
-        }
+        cart[item_key] = {'type': 'bundle', 'quantity': quantity}
 
     save_cart(request, cart)
 
@@ -56,8 +57,7 @@ def add_bundle_to_cart_view(request, bundle_id):
 
 
 def cart_view(request):
-    cart_data, cart_type = get_active_cart(request)
-    context = calculate_cart_summary(request, cart_data, cart_type)
+    context = get_cart_snapshot(request).summary
     return render(request, 'orders/cart.html', context)
 
 
@@ -79,7 +79,7 @@ def update_quantity(request, item_key):
 
     # If this is a session bundle key, always update the session cart
     if isinstance(item_key, str) and item_key.startswith("bundle_"):
-        cart = request.session.get('cart', {}) or {}
+        cart = get_session_cart(request)
         if item_key in cart:
             cart[item_key]['quantity'] = quantity
             save_cart(request, cart)
@@ -103,26 +103,19 @@ def update_quantity(request, item_key):
         if cart_item:
             cart_item.quantity = quantity
             cart_item.save(update_fields=["quantity"])
+            refresh_cart_header(request)
             messages.success(request, "Quantity updated.")
         else:
             messages.warning(request, "Could not find that item in your cart.")
         return redirect('orders:cart')
 
     # Guests: update session cart product line
-    cart = request.session.get('cart', {}) or {}
-
-    # If the template passed a numeric id,
-    # map it to the session cart key (product_code)
-    if item_key.isdigit():
-        pid = int(item_key)
-        for k, v in cart.items():
-            if k.startswith("bundle_"):
-                continue
-            if str(v.get("product_id")) == str(pid):
-                item_key = k
-                break
+    cart = get_session_cart(request)
 
-    if item_key in cart:
+    # Map a numeric id / product_code to the key the line is stored under
+    item_key = find_session_cart_key(cart, item_key)
+
+    if item_key is not None:
         cart[item_key]['quantity'] = quantity
         save_cart(request, cart)
         messages.success(request, "Quantity updated.")
@@ -140,7 +133,7 @@ def remove_item(request, item_key):
     """
     # Session bundle? Always remove from session.
     if isinstance(item_key, str) and item_key.startswith("bundle_"):
-        cart = request.session.get('cart', {}) or {}
+        cart = get_session_cart(request)
         if cart.pop(item_key, None) is not None:
             save_cart(request, cart)
             messages.success(request, "Item removed from cart.")
@@ -161,25 +154,20 @@ def remove_item(request, item_key):
             ).delete()[0]
 
         if deleted:
+            refresh_cart_header(request)
             messages.success(request, "Item removed from cart.")
         else:
             messages.warning(request, "Could not find that item in your cart.")
         return redirect('orders:cart')
 
     # Guests: remove session product
-    cart = request.session.get('cart', {}) or {}
-
-    # If numeric id, map to session key (product_code)
-    if item_key.isdigit():
-        pid = int(item_key)
-        for k, v in list(cart.items()):
-            if k.startswith("bundle_"):
-                continue
-            if str(v.get("product_id")) == str(pid):
-                item_key = k
-                break
-
-    if cart.pop(item_key, None) is not None:
+    cart = get_session_cart(request)
+
+    # Map a numeric id / product_code to the key the line is stored under
+    item_key = find_session_cart_key(cart, item_key)
+
+    if item_key is not None:
+        del cart[item_key]
         save_cart(request, cart)
         messages.success(request, "Item removed from cart.")
     else:
@@ -197,12 +185,8 @@ def clear_cart(request):
     if request.user.is_authenticated:
         db_cart, _ = get_active_cart(request)  # DB cart
         db_cart.items.all().delete()
-        # also nuke any session leftovers (e.g., bundles)
-        request.session['cart'] = {}
-        request.session.modified = True
-    else:
-        request.session['cart'] = {}
-        request.session.modified = True
+    # Guest lines and bundles (session/cookie storage) are always emptied
+    save_cart(request, {})
 
     messages.success(request, "Cart has been cleared.")
     return redirect('orders:cart')
@@ -11,7 +11,7 @@ from django.shortcuts import redirect
 from django.urls import reverse
 
 from apps.orders.models import Order, OrderItem
-from apps.orders.utils.cart import get_active_cart, calculate_cart_summary, clear_session_cart
+from apps.orders.utils.cart import get_cart_snapshot, clear_session_cart
 from apps.orders.utils.stripe_helpers import create_checkout_session
 from apps.orders.views.cart_views import clear_cart
 
@@ -19,17 +19,13 @@ logger = logging.getLogger(__name__)
 
 
 def checkout_view(request):
-    # 1) fetch & validate cart
-    cart_data, cart_type = get_active_cart(request)
-    if cart_type == "db" and not cart_data.items.exists():
-        messages.error(request, "Your cart is empty. Add items before checking out.")
-        return redirect("orders:cart")
-    if cart_type == "session" and not cart_data:
+    # 1) fetch & validate cart (summary is memoized on the request)
+    summary = get_cart_snapshot(request).summary
+    if not summary["cart_items"]:
         messages.error(request, "Your cart is empty. Add items before checking out.")
         return redirect("orders:cart")
 
-    # 2) build summary & Stripe line_items
-    summary = calculate_cart_summary(request, cart_data, cart_type)
+    # 2) build Stripe line_items
 
     def to_minor_units(dec):
         # quantize to 2dp then to whole pennies to avoid float-ish rounding quirks
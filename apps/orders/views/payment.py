@@ -14,7 +14,7 @@ from django.conf import settings
 
 import stripe
 from apps.orders.models import Order, OrderItem
-from apps.orders.utils.cart import get_active_cart, calculate_cart_summary
+from apps.orders.utils.cart import get_cart_snapshot
 from apps.users.models import ShippingAddress
 
 logger = logging.getLogger(__name__)
@@ -53,8 +53,7 @@ def create_payment_intent(request):
             guest_email = (source.get("guest_email") or "").strip() or None
 
         # ---- cart summary ----
-        cart_data, cart_type = get_active_cart(request)
-        summary = calculate_cart_summary(request, cart_data, cart_type)
+        summary = get_cart_snapshot(request).summary
         if not summary["cart_items"]:
             return HttpResponseBadRequest("Cart empty")
 
@@ -10,7 +10,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
 from apps.orders.utils.stripe_helpers import verify_webhook_signature
-from apps.orders.utils.order import update_order_from_stripe_session
+from apps.orders.utils.webhook_events import HANDLED_TYPES, claim_event, finish_event, process_event
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +21,7 @@ def stripe_webhook_view(request):
     """
     Stripe webhook endpoint.
     Handles both hosted Checkout and inline Payment Element flows.
+    Each event is processed once; see apps/orders/utils/webhook_events.py.
     """
     logger.info("[WEBHOOK] Stripe webhook endpoint hit")
 
@@ -31,44 +32,30 @@ def stripe_webhook_view(request):
         return HttpResponseBadRequest("Invalid signature or payload")
 
     event_type = event.get("type")
-    obj = (event.get("data") or {}).get("object") or {}
+    event_id = event.get("id")
 
-    # Event types that should update Order state in the DB
-    HANDLED_TYPES = {
-        # Payment Element / PI lifecycle
-        "payment_intent.succeeded",
-        "payment_intent.canceled",
-        "payment_intent.payment_failed",
-        "payment_intent.processing",
+    if event_type not in HANDLED_TYPES:
+        # Ignore duplicative events like charge.* or payment_intent.created
+        logger.debug("[WEBHOOK] Ignoring event type: %s", event_type)
+        return HttpResponse(status=200)
 
-        # Hosted checkout lifecycle
-        "checkout.session.completed",
-        "checkout.session.async_payment_succeeded",
-        "checkout.session.async_payment_failed",
-        "checkout.session.expired",
-    }
+    # 2) Claim the event; redeliveries stop here
+    if event_id and not claim_event(event):
+        logger.info("[WEBHOOK] Duplicate delivery of %s (%s)", event_id, event_type)
+        return HttpResponse(status=200)
 
+    # 3) Update the order
     try:
-        if event_type in HANDLED_TYPES:
-            order = update_order_from_stripe_session(obj)
-            if order:
-                logger.info(
-                    "[WEBHOOK] %s -> Order #%s payment_status=%s",
-                    event_type, order.id, order.payment_status
-                )
-            else:
-                logger.warning(
-                    "[WEBHOOK] %s did not match any Order", event_type
-                )
-
-        else:
-            # Ignore duplicative events like charge.* or payment_intent.created
-            logger.debug("[WEBHOOK] Ignoring event type: %s", event_type)
-
+        process_event(event)
     except Exception as e:
         # Return 500 so Stripe retries
         logger.exception("[WEBHOOK] Error processing %s: %s", event_type, e)
+        if event_id:
+            finish_event(event_id, error=e)
         return HttpResponse(status=500)
 
+    if event_id:
+        finish_event(event_id)
+
     # 4) Acknowledge
     return HttpResponse(status=200)
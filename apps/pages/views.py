@@ -4,6 +4,7 @@ from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from apps.products.models import Product, Bundle
+from apps.products.page_cache import cache_anonymous_page
 from django.views.decorators.http import require_POST
 from django.core.mail import send_mail
 from django.utils.html import strip_tags
@@ -11,6 +12,7 @@ from .models import NewsletterSubscriber, ContactMessage
 from .forms import NewsletterForm, ContactForm
 
 
+@cache_anonymous_page()
 def home(request):
     featured_products = Product.objects.filter(featured=True, is_draft=False)[:4]
     featured_bundles = Bundle.objects.filter(featured=True)[:4]
@@ -0,0 +1,147 @@
+"""
+Navbar search suggestions.
+
+Suggestions come from an in-process prefix index: a sorted list of
+normalized keys (product name, variant and code, bundle name and every
+word-start inside those names) searched with bisect, so matching itself does
+no database or network I/O.
+
+Each process keeps its own index as a CatalogueSnapshot (see
+apps.products.snapshots): it is rebuilt on the next lookup after the
+catalogue version in the database moves on, so a write reaches every
+process, and after AUTOCOMPLETE_INDEX_TTL seconds for writes that send no
+signals. A warm lookup costs that one version read.
+
+With AUTOCOMPLETE_FUZZY enabled on PostgreSQL, prefixes with no index hits
+fall back to pg_trgm word similarity, so typos still get suggestions.
+Located at apps/products/autocomplete.py
+"""
+
+import logging
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.urls import reverse
+from apps.products.models import Bundle, Product
+from apps.products.snapshots import CatalogueSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Upper bound on keys scanned per lookup, so one-letter prefixes stay cheap
+MAX_SCAN = 500
+
+
+def normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def _word_starts(text):
+    """Yield `text` and every suffix of it that starts at a word boundary."""
+    words = normalize(text).split(" ")
+    for i in range(len(words)):
+        yield " ".join(words[i:])
+
+
+class PrefixIndex:
+    """
+    Sorted (key, rank, suggestion id) entries searched by prefix with bisect.
+    Built from (suggestion, texts) pairs; earlier texts rank higher.
+    """
+
+    def __init__(self, items):
+        self.suggestions = [suggestion for suggestion, _ in items]
+        entries = set()
+        for sid, (_, texts) in enumerate(items):
+            for rank, text in enumerate(texts):
+                for position, key in enumerate(_word_starts(text)):
+                    # Matches at the start of the name rank above word matches
+                    entries.add((key, (rank, position > 0), sid))
+        entries = sorted(entries)
+        self.keys = [key for key, _, _ in entries]
+        self.entries = [(rank, sid) for _, rank, sid in entries]
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def lookup(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        best = {}
+        start = bisect_left(self.keys, prefix)
+        for i in range(start, min(start + MAX_SCAN, len(self.keys))):
+            if not self.keys[i].startswith(prefix):
+                break
+            rank, sid = self.entries[i]
+            if sid not in best or rank < best[sid]:
+                best[sid] = rank
+        ordered = sorted(best, key=lambda sid: (best[sid], self.suggestions[sid]["name"].lower()))
+        return [self.suggestions[sid] for sid in ordered[:limit]]
+
+
+def _product_item(product):
+    suggestion = {
+        "type": "product",
+        "id": product.id,
+        "name": product.name,
+        "variant": product.variant,
+        "url": reverse("products:product_detail", args=[product.id]),
+    }
+    return suggestion, [product.name, product.product_code, product.variant]
+
+
+def _bundle_item(bundle):
+    suggestion = {
+        "type": "bundle",
+        "id": bundle.id,
+        "name": bundle.name,
+        "variant": "",
+        "url": reverse("products:bundle_detail", args=[bundle.id]),
+    }
+    return suggestion, [bundle.name, bundle.bundle_code]
+
+
+def build_index():
+    products = Product.objects.filter(is_draft=False).only("id", "name", "variant", "product_code")
+    bundles = Bundle.objects.only("id", "name", "bundle_code")
+    items = [_product_item(p) for p in products] + [_bundle_item(b) for b in bundles]
+    index = PrefixIndex(items)
+    logger.debug(f"[Autocomplete] Built prefix index: {len(index)} suggestions, {len(index.keys)} keys")
+    return index
+
+
+_index = CatalogueSnapshot(build_index, "AUTOCOMPLETE_INDEX_TTL", 900)
+
+
+def get_index():
+    return _index.get()
+
+
+def fuzzy_suggestions(prefix, limit=DEFAULT_LIMIT):
+    """pg_trgm word-similarity matches on product and bundle names (PostgreSQL only)."""
+    term = normalize(prefix)
+    products = (
+        Product.objects.filter(is_draft=False, name__trigram_word_similar=term)
+        .annotate(similarity=TrigramWordSimilarity(term, "name"))
+        .order_by("-similarity")
+        .only("id", "name", "variant", "product_code")[:limit]
+    )
+    bundles = (
+        Bundle.objects.filter(name__trigram_word_similar=term)
+        .annotate(similarity=TrigramWordSimilarity(term, "name"))
+        .order_by("-similarity")
+        .only("id", "name", "bundle_code")[:limit]
+    )
+    matches = sorted([*products, *bundles], key=lambda obj: -obj.similarity)[:limit]
+    return [(_product_item(obj) if isinstance(obj, Product) else _bundle_item(obj))[0] for obj in matches]
+
+
+def suggest(prefix, limit=DEFAULT_LIMIT):
+    results = get_index().lookup(prefix, limit)
+    if not results and getattr(settings, "AUTOCOMPLETE_FUZZY", False) and connection.vendor == "postgresql":
+        results = fuzzy_suggestions(prefix, limit)
+    return results
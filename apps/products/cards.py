@@ -0,0 +1,90 @@
+"""
+Fragment cache for product and bundle cards.
+
+Cards are cached per (template, object, card_version). card_version is a
+column on Product and Bundle, bumped by apps.products.signals whenever
+something shown on the card changes: the object itself, its reviews
+(rating summary), or, for bundles, their products. Cache keys therefore
+come straight from rows the page has already loaded, and a listing fetches
+all of its cards with a single get_many. Misses are rendered and stored
+together with set_many.
+
+Cards are rendered without a request, with a placeholder where the CSRF
+token goes, and the viewer's token is swapped in when they are served.
+Keys also include a fingerprint of the card template source, so editing a
+card template invalidates its fragments on the next deploy.
+Located at apps/products/cards.py
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+from django.middleware.csrf import get_token
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from apps.products.models import Product
+
+logger = logging.getLogger(__name__)
+
+CSRF_PLACEHOLDER = "__card_csrf_token__"
+
+# Product thumbnails shown on each bundle list card
+BUNDLE_PREVIEW_PRODUCTS = 3
+
+# Extra data a card template needs, loaded for cache misses only
+CARD_PREFETCHES = {
+    "include/bundle_list_card.html": lambda: [Prefetch(
+        "products",
+        queryset=Product.objects.order_by("id")[:BUNDLE_PREVIEW_PRODUCTS],
+        to_attr="preview_products",
+    )],
+}
+
+_fingerprints = {}
+
+
+def _fingerprint(template_name):
+    if template_name not in _fingerprints:
+        source = get_template(template_name).template.source
+        _fingerprints[template_name] = hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()[:8]
+    return _fingerprints[template_name]
+
+
+def card_key(template_name, obj):
+    return f"card:{template_name}:{_fingerprint(template_name)}:{obj._meta.label_lower}:{obj.pk}:{obj.card_version}"
+
+
+def render_cards(request, objects, template_name):
+    """
+    Return the rendered card HTML for each object, in order. The objects'
+    context variable is their model name ("product" or "bundle").
+    """
+    objects = list(objects)
+    if not objects:
+        return []
+
+    keys = [card_key(template_name, obj) for obj in objects]
+    cached = cache.get_many(keys)
+
+    missing = [(key, obj) for key, obj in zip(keys, objects) if key not in cached]
+    if missing:
+        prefetches = CARD_PREFETCHES.get(template_name)
+        if prefetches:
+            prefetch_related_objects([obj for _, obj in missing], *prefetches())
+        template = get_template(template_name)
+        rendered = {
+            key: template.render({obj._meta.model_name: obj, "csrf_token": CSRF_PLACEHOLDER})
+            for key, obj in missing
+        }
+        cache.set_many(rendered, getattr(settings, "CARD_CACHE_TIMEOUT", 60 * 60 * 24))
+        cached.update(rendered)
+        logger.debug(f"[Cards] {template_name}: {len(objects) - len(missing)} hits, {len(missing)} misses")
+
+    cards = [cached[key] for key in keys]
+    if any(CSRF_PLACEHOLDER in card for card in cards):
+        token = get_token(request) if request is not None else ""
+        cards = [card.replace(CSRF_PLACEHOLDER, token) for card in cards]
+    return [mark_safe(card) for card in cards]
@@ -0,0 +1,82 @@
+"""
+Conditional GET (ETag / Last-Modified) for catalogue pages.
+
+A page can be answered with 304 Not Modified when neither the catalogue
+nor the viewer's own state has changed since the copy the client holds:
+- the catalogue is represented by the page cache's catalogue version
+  (apps.products.page_cache), a counter row in the database bumped on
+  every catalogue write and so the same in every worker, plus for detail pages the object's updated_at (review
+  writes and bundle contents changes bump it too; see
+  apps.products.signals).
+- the viewer's state is who they are and their session cart header
+  (count, lines and subtotal behind the navbar cart).
+
+Last-Modified is only sent to guests with an empty cart, since a date
+cannot describe anyone else's navbar; crawlers revisiting sitemap URLs
+are exactly those guests. Pages with pending flash messages get no
+validators at all. Responses are marked private and no-cache, so browsers
+revalidate instead of guessing a freshness lifetime from Last-Modified.
+Located at apps/products/conditional.py
+"""
+
+import hashlib
+from functools import wraps
+
+from django.contrib import messages
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from apps.orders.utils.cart import get_cart_header
+from apps.products.page_cache import catalogue_version, is_guest
+
+NEUTRAL = "guest:0:0:0"
+
+
+def viewer_state(request):
+    """A short description of what the page shows for this viewer, or None if it must be rendered."""
+    if not hasattr(request, "_viewer_state"):
+        state = None
+        if not len(messages.get_messages(request)):
+            user = "guest" if is_guest(request) else f"user{request.user.pk}"
+            header = get_cart_header(request)
+            state = f"{user}:{header['lines']}:{header['qty']}:{header['subtotal_pence']}"
+        request._viewer_state = state
+    return request._viewer_state
+
+
+def conditional_page(last_modified=None):
+    """
+    condition() for a catalogue view. `last_modified(request, *args, **kwargs)`
+    returns when the page's object last changed (detail views), or None.
+    """
+    def _last_modified(request, *args, **kwargs):
+        if last_modified is None or viewer_state(request) is None:
+            return None
+        if not hasattr(request, "_page_last_modified"):
+            request._page_last_modified = last_modified(request, *args, **kwargs)
+        return request._page_last_modified
+
+    def _etag(request, *args, **kwargs):
+        state = viewer_state(request)
+        if state is None:
+            return None
+        changed = _last_modified(request, *args, **kwargs)
+        source = f"{catalogue_version(request)}:{changed.isoformat() if changed else ''}:{state}"
+        return hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()
+
+    def _public_last_modified(request, *args, **kwargs):
+        if viewer_state(request) != NEUTRAL:
+            return None
+        return _last_modified(request, *args, **kwargs)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=_etag, last_modified_func=_public_last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
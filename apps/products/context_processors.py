@@ -1,9 +1,15 @@
 # apps/products/context_processors.py
 
-from .models import Category
+from django.utils.functional import SimpleLazyObject
+
+from .navigation import get_category_tree
 
 
 def all_categories(request):
+    """
+    `categories`: the cached category tree (see apps/products/navigation.py),
+    read only when a template uses it.
+    """
     return {
-        'categories': Category.objects.all()
+        'categories': SimpleLazyObject(lambda: get_category_tree(request))
     }
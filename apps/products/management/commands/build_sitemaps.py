@@ -0,0 +1,28 @@
+# products/management/commands/build_sitemaps.py
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+from apps.products.sitemap_files import build_sitemaps, is_stale
+from apps.products.sitemaps import SITEMAPS
+
+
+class Command(BaseCommand):
+    help = "Write the gzipped sitemap index and shards served when SITEMAP_PRECOMPUTED is on"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-stale", action="store_true",
+            help="Only rebuild if the catalogue changed since the last build (for schedulers).",
+        )
+        parser.add_argument("--base-url", help="Site root for <loc> entries; defaults to the current Site.")
+        parser.add_argument("--shard-size", type=int, help="URLs per shard; defaults to SITEMAP_SHARD_SIZE.")
+
+    def handle(self, *args, **options):
+        if options["if_stale"] and not is_stale():
+            self.stdout.write("Sitemaps are up to date.")
+            return
+
+        base_url = options["base_url"] or f"{settings.SITEMAP_PROTOCOL}://{Site.objects.get_current().domain}"
+        build = build_sitemaps(SITEMAPS, base_url, shard_size=options["shard_size"])
+        self.stdout.write(self.style.SUCCESS(f"Built sitemaps {build} for {base_url}."))
@@ -0,0 +1,58 @@
+# products/management/commands/rebuild_rating_summaries.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, Now
+from apps.products.models import Bundle, Product
+from apps.products.page_cache import bump_catalogue_version
+
+
+class Command(BaseCommand):
+    help = "Rebuild the rating summary columns on products and bundles from their reviews"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only report drifted rows; exit with status 1 if any are found.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, check=False, batch_size=500, **options):
+        drifted = 0
+        for model in (Product, Bundle):
+            rows = model.objects.annotate(
+                review_total=Count("reviews"),
+                review_stars=Coalesce(Sum("reviews__rating"), 0),
+            ).only("id", "rating_count", "rating_sum", "card_version")
+
+            stale = []
+            for obj in rows.iterator(chunk_size=2000):
+                if (obj.rating_count, obj.rating_sum) == (obj.review_total, obj.review_stars):
+                    continue
+                self.stdout.write(
+                    f"{model.__name__} {obj.pk}: {obj.rating_count}/{obj.rating_sum} "
+                    f"-> {obj.review_total}/{obj.review_stars}",
+                    style_func=self.style.WARNING,
+                )
+                obj.rating_count = obj.review_total
+                obj.rating_sum = obj.review_stars
+                # Cached cards and pages show the rating, as after a review write
+                obj.card_version = F("card_version") + 1
+                obj.updated_at = Now()
+                stale.append(obj)
+
+            if stale and not check:
+                model.objects.bulk_update(
+                    stale, ["rating_count", "rating_sum", "card_version", "updated_at"], batch_size=batch_size,
+                )
+            drifted += len(stale)
+
+        if check:
+            if drifted:
+                raise CommandError(f"{drifted} rating summaries out of step.", returncode=1)
+            self.stdout.write(self.style.SUCCESS("Rating summaries are up to date."))
+            return
+
+        if drifted:
+            bump_catalogue_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {drifted} rating summaries."))
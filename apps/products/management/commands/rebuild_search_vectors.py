@@ -0,0 +1,26 @@
+# products/management/commands/rebuild_search_vectors.py
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.products.models import Bundle, ProductType
+from apps.products.search import reindex_product_type, search_enabled, update_bundle_search_vector
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search vectors for all products and bundles (PostgreSQL only)"
+
+    def handle(self, *args, **kwargs):
+        if not search_enabled():
+            raise CommandError("Full-text search vectors need PostgreSQL.")
+
+        # Products are re-indexed one UPDATE per product type
+        for product_type in ProductType.objects.all():
+            reindex_product_type(product_type)
+
+        bundles = 0
+        for bundle in Bundle.objects.only('id', 'name', 'bundle_code', 'description').iterator():
+            update_bundle_search_vector(bundle)
+            bundles += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt search vectors for {ProductType.objects.count()} product types and {bundles} bundles."
+        ))
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:28
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_summary(apps, schema_editor):
+    for model_name in ("Product", "Bundle"):
+        model = apps.get_model("products", model_name)
+        rated = model.objects.annotate(
+            review_total=Count("reviews"), review_stars=Sum("reviews__rating"),
+        ).filter(review_total__gt=0)
+        stale = []
+        for obj in rated.only("id").iterator(chunk_size=2000):
+            obj.rating_count = obj.review_total
+            obj.rating_sum = obj.review_stars
+            stale.append(obj)
+        model.objects.bulk_update(stale, ["rating_count", "rating_sum"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0019_review_uniq_user_product_review_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bundle',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='bundle',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='bundle',
+            name='rating_average',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(rating_count__gt=0, then=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('rating_sum', models.FloatField()), '/', models.F('rating_count'))), default=models.Value(0.0)), output_field=models.FloatField()),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(rating_count__gt=0, then=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('rating_sum', models.FloatField()), '/', models.F('rating_count'))), default=models.Value(0.0)), output_field=models.FloatField()),
+        ),
+        migrations.RunPython(backfill_rating_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:33
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.utils.html import strip_tags
+
+# Created outside Meta.indexes: SQLite (local tests) can't build GIN indexes,
+# and would fail on any later table rebuild that replayed them.
+GIN_INDEXES = [
+    ('product_search_vector_gin', 'products_product'),
+    ('bundle_search_vector_gin', 'products_bundle'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in GIN_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("search_vector")')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+def _vector(*parts):
+    # Frozen copy of the weighting in apps/products/search.py at the time
+    vector = None
+    for expression, weight in parts:
+        part = SearchVector(expression, weight=weight, config='english')
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def backfill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    ProductType = apps.get_model('products', 'ProductType')
+    Bundle = apps.get_model('products', 'Bundle')
+    type_name = Subquery(ProductType.objects.filter(pk=OuterRef('type_id')).values('name')[:1])
+    Product.objects.update(search_vector=_vector(('name', 'A'), ('product_code', 'A'), ('variant', 'B'), (type_name, 'C')))
+    for bundle in Bundle.objects.only('id', 'description'):
+        description = Value(strip_tags(bundle.description or ''))
+        Bundle.objects.filter(pk=bundle.pk).update(
+            search_vector=_vector(('name', 'A'), ('bundle_code', 'A'), (description, 'C'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0020_rating_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bundle',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
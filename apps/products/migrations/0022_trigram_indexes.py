@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# pg_trgm GIN indexes backing the fuzzy autocomplete fallback
+# (AUTOCOMPLETE_FUZZY). PostgreSQL only, like the search indexes in 0021.
+TRIGRAM_INDEXES = [
+    ('product_name_trgm', 'products_product'),
+    ('bundle_name_trgm', 'products_bundle'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("name" gin_trgm_ops)')
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0021_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0022_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bundle',
+            index=models.Index(fields=['bundle_type', 'price', 'id'], name='bundle_type_price'),
+        ),
+        migrations.AddIndex(
+            model_name='bundle',
+            index=models.Index(fields=['price', 'id'], name='bundle_price'),
+        ),
+        migrations.AddIndex(
+            model_name='bundle',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['id'], name='bundle_featured'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_draft', False)), fields=['category', 'tier', 'price', 'id'], name='product_public_cat_tier_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_draft', False)), fields=['category', 'price', 'id'], name='product_public_cat_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_draft', False)), fields=['price', 'id'], name='product_public_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_draft', False)), fields=['-rating_average', '-rating_count', 'id'], name='product_public_rating'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('featured', True), ('is_draft', False)), fields=['id'], name='product_public_featured'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-created_at', '-id'], name='review_product_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['bundle', '-created_at', '-id'], name='review_bundle_created_id'),
+        ),
+    ]
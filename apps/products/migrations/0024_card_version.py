@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0023_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bundle',
+            name='card_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='card_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -4,7 +4,9 @@ and reviews in the e-commerce application.
 Located at apps/products/models.py
 """
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Cast
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.urls import reverse
@@ -52,7 +54,36 @@ class Tag(models.Model):
         return self.name
 
 
-class Product(models.Model):
+def rating_average_field():
+    """Average rating derived from the stored summary columns (0 when unrated)."""
+    return models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                rating_count__gt=0,
+                then=Cast('rating_sum', models.FloatField()) / models.F('rating_count'),
+            ),
+            default=models.Value(0.0),
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
+
+
+class ReviewStatsMixin:
+    """
+    Review summary helpers shared by Product and Bundle.
+    `rating_count`/`rating_sum` are kept in step with Review writes by
+    apps.products.signals, so these don't touch the Review table.
+    """
+
+    def review_count(self):
+        return self.rating_count
+
+    def average_rating(self):
+        return self.rating_average or 0
+
+
+class Product(ReviewStatsMixin, models.Model):
     TIER_CHOICES = [
         ('Standard', 'Standard'),
         ('Pro', 'Pro'),
@@ -96,9 +127,37 @@ class Product(models.Model):
     image_ready = models.BooleanField(default=False, help_text="Image has been generated and approved.")
     is_draft = models.BooleanField(default=False, help_text="Hide product from public view (draft mode).")
 
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_average = rating_average_field()
+
+    # Maintained by apps.products.search; GIN indexed on PostgreSQL (migration 0021)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Bumped whenever the object's rendered cards change (see apps.products.cards)
+    card_version = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
+        # Listing filters/sorts; all partial on public (non-draft) products
+        indexes = [
+            models.Index(
+                fields=['category', 'tier', 'price', 'id'],
+                condition=models.Q(is_draft=False), name='product_public_cat_tier_price',
+            ),
+            models.Index(
+                fields=['category', 'price', 'id'],
+                condition=models.Q(is_draft=False), name='product_public_cat_price',
+            ),
+            models.Index(fields=['price', 'id'], condition=models.Q(is_draft=False), name='product_public_price'),
+            models.Index(
+                fields=['-rating_average', '-rating_count', 'id'],
+                condition=models.Q(is_draft=False), name='product_public_rating',
+            ),
+            models.Index(
+                fields=['id'], condition=models.Q(featured=True, is_draft=False), name='product_public_featured',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -120,14 +179,8 @@ class Product(models.Model):
 
     image_tag.short_description = "Image"
 
-    def review_count(self):
-        return self.reviews.count()
 
-    def average_rating(self):
-        return self.reviews.aggregate(avg=models.Avg('rating'))['avg'] or 0
-
-
-class Bundle(models.Model):
+class Bundle(ReviewStatsMixin, models.Model):
     BUNDLE_TYPE_CHOICES = [
         ('Standard', 'Standard'),
         ('Pro', 'Pro'),
@@ -183,6 +236,22 @@ class Bundle(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_average = rating_average_field()
+
+    # Maintained by apps.products.search; GIN indexed on PostgreSQL (migration 0021)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Bumped whenever the object's rendered cards change (see apps.products.cards)
+    card_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bundle_type', 'price', 'id'], name='bundle_type_price'),
+            models.Index(fields=['price', 'id'], name='bundle_price'),
+            models.Index(fields=['id'], condition=models.Q(featured=True), name='bundle_featured'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
@@ -215,12 +284,6 @@ class Bundle(models.Model):
         final = total * (Decimal('1.00') - discount / Decimal('100.00'))
         return round(final, 2)
 
-    def review_count(self):
-        return self.reviews.count()
-
-    def average_rating(self):
-        return self.reviews.aggregate(avg=models.Avg('rating'))['avg'] or 0
-
 
 class ProductBundle(models.Model):
     product = models.ForeignKey(
@@ -272,3 +335,21 @@ class Review(models.Model):
                 fields=["user", "bundle"],  name="uniq_user_bundle_review"
             ),
         ]
+        indexes = [
+            # Match the reviews cursor (-created_at, -id) so each page is one index seek
+            models.Index(fields=["product", "-created_at", "-id"], name="review_product_created_id"),
+            models.Index(fields=["bundle", "-created_at", "-id"], name="review_bundle_created_id"),
+        ]
+
+
+class CatalogueVersion(models.Model):
+    """
+    Single-row counter bumped after every catalogue write (see
+    apps.products.signals). It keys the page cache and catalogue ETags, and
+    lives in the database so every web worker reads the same value whatever
+    the cache backend.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalogue version {self.version}"
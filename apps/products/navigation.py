@@ -0,0 +1,86 @@
+"""
+Category navigation tree shared by the navbar and the product list filters.
+
+Each process keeps the tree (categories, their subcategories, and public
+product counts for both) in memory as a CatalogueSnapshot (see
+apps.products.snapshots), so rendering navigation costs the request's
+catalogue version read instead of category queries. The tree is rebuilt
+once category, subcategory or product writes move that version on, and
+after CATEGORY_TREE_TTL seconds.
+Located at apps/products/navigation.py
+"""
+
+import logging
+
+from django.db.models import Count, Q
+from apps.products.models import Category, Subcategory
+from apps.products.snapshots import CatalogueSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SubcategoryNode:
+    __slots__ = ("id", "name", "slug", "product_count")
+
+    def __init__(self, id, name, slug, product_count):
+        self.id = id
+        self.name = name
+        self.slug = slug
+        self.product_count = product_count
+
+    def __str__(self):
+        return self.name
+
+
+class CategoryNode:
+    __slots__ = ("id", "name", "slug", "product_count", "subcategories")
+
+    def __init__(self, id, name, slug, product_count, subcategories=()):
+        self.id = id
+        self.name = name
+        self.slug = slug
+        self.product_count = product_count
+        self.subcategories = list(subcategories)
+
+    def __str__(self):
+        return self.name
+
+
+class CategoryTree:
+    """Iterable of CategoryNode, in id order."""
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+
+def _public_products():
+    return Count("products", filter=Q(products__is_draft=False))
+
+
+def build_tree():
+    subcategories = {}
+    for sub in Subcategory.objects.annotate(public_count=_public_products()).order_by("name", "id"):
+        subcategories.setdefault(sub.category_id, []).append(
+            SubcategoryNode(sub.id, sub.name, sub.slug, sub.public_count)
+        )
+    tree = CategoryTree(
+        [
+            CategoryNode(cat.id, cat.name, cat.slug, cat.public_count, subcategories.get(cat.id, ()))
+            for cat in Category.objects.annotate(public_count=_public_products()).order_by("id")
+        ]
+    )
+    logger.debug(f"[Navigation] Built category tree: {len(tree)} categories")
+    return tree
+
+
+_tree = CatalogueSnapshot(build_tree, "CATEGORY_TREE_TTL", 300)
+
+
+def get_category_tree(request=None):
+    return _tree.get(request)
@@ -0,0 +1,162 @@
+"""
+Full-page cache for anonymous catalogue pages (home, product and bundle
+lists and details).
+
+Guests all see the same page apart from the navbar cart and flash
+messages, so pages are cached once per path and normalized querystring
+and only those parts are rendered per request:
+- templates mark them with {% page_hole "include/..." %}. While a page is
+  being rendered for the cache the tag leaves a marker; when it is served
+  each marker is replaced with the template rendered for the viewer.
+- CSRF tokens in the cached HTML are replaced with a placeholder and the
+  viewer's token is swapped in on the way out.
+
+Keys include the catalogue version (a counter row in the database,
+CatalogueVersion), bumped by apps.products.signals after product, bundle,
+review and category writes. Every worker reads the same counter, so a
+write invalidates every cached page at once even where the pages
+themselves sit in per-process LocMem caches (queryset.update() sends no
+signals; such writes show up once PAGE_CACHE_TIMEOUT expires). Requests
+with querystring parameters a view does not use are not cached, as they
+would only fill the cache with duplicates.
+
+A warm hit costs one cache read and one single-row query for guests with
+an empty cart; a non-empty cart costs whatever the navbar preview costs.
+Located at apps/products/page_cache.py
+"""
+
+import hashlib
+import logging
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Subquery
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.http import urlencode
+from apps.products.models import CatalogueVersion
+
+logger = logging.getLogger(__name__)
+
+CSRF_PLACEHOLDER = "__page_csrf_token__"
+
+_CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+_HOLE_RE = re.compile(r"<!--page-hole:([\w./-]+)-->")
+
+# Campaign tags never change the page, so they share its cache entry
+IGNORED_PARAMS = ("utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "gclid", "fbclid")
+
+
+def hole_marker(template_name):
+    return f"<!--page-hole:{template_name}-->"
+
+
+def catalogue_version(request=None):
+    """The current catalogue version, read once per `request` if given."""
+    if request is not None and hasattr(request, "_catalogue_version"):
+        return request._catalogue_version
+    version = CatalogueVersion.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+    if request is not None:
+        request._catalogue_version = version
+    return version
+
+
+def catalogue_version_subquery():
+    """The catalogue version as an expression, to read it alongside another query."""
+    return Subquery(CatalogueVersion.objects.filter(pk=1).values("version")[:1])
+
+
+def known_catalogue_version(request):
+    """The catalogue version already read for `request`, or None."""
+    return getattr(request, "_catalogue_version", None)
+
+
+def remember_catalogue_version(request, version):
+    """Memoize a catalogue version read through catalogue_version_subquery() on `request`."""
+    request._catalogue_version = version or 0
+
+
+def bump_catalogue_version():
+    if not CatalogueVersion.objects.filter(pk=1).update(version=F("version") + 1):
+        CatalogueVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+def normalized_query(query_dict, params):
+    """
+    The querystring as sorted (key, value) pairs, or None if it carries a
+    parameter outside `params` (and the request should not be cached).
+    """
+    pairs = []
+    for key in sorted(query_dict):
+        if key in IGNORED_PARAMS:
+            continue
+        if key not in params:
+            return None
+        pairs.extend((key, value) for value in query_dict.getlist(key))
+    return urlencode(pairs)
+
+
+def page_key(request, query):
+    digest = hashlib.md5(f"{request.path}?{query}".encode(), usedforsecurity=False).hexdigest()
+    return f"page:{catalogue_version(request)}:{digest}"
+
+
+def is_guest(request):
+    # No session cookie means no login, without loading the session
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def _fill(request, content):
+    """Render the holes and CSRF token of a cached page for this request."""
+    content = _HOLE_RE.sub(lambda m: render_to_string(m.group(1), request=request), content)
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    return content
+
+
+def cache_anonymous_page(params=()):
+    """
+    Serve the view from the page cache for guests' GET/HEAD requests.
+    `params` are the querystring parameters the view reads.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.PAGE_CACHE_TIMEOUT
+            if not timeout or request.method not in ("GET", "HEAD") or not is_guest(request):
+                return view(request, *args, **kwargs)
+            query = normalized_query(request.GET, params)
+            if query is None:
+                return view(request, *args, **kwargs)
+
+            key = page_key(request, query)
+            cached = cache.get(key)
+            if cached is not None:
+                response = HttpResponse(_fill(request, cached["content"]), content_type=cached["content_type"])
+                response["X-Page-Cache"] = "hit"
+                return response
+
+            request._page_cache_render = True
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                request._page_cache_render = False
+            if response.streaming:
+                return response
+
+            content = response.content.decode(response.charset)
+            if response.status_code == 200 and not response.cookies:
+                content = _CSRF_INPUT_RE.sub(rf"\g<1>{CSRF_PLACEHOLDER}\g<2>", content)
+                cache.set(key, {"content": content, "content_type": response["Content-Type"]}, timeout)
+                logger.debug(f"[PageCache] Stored {request.get_full_path()}")
+                response["X-Page-Cache"] = "miss"
+
+            response.content = _fill(request, content)
+            return response
+        return wrapper
+    return decorator
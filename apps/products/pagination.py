@@ -0,0 +1,136 @@
+"""
+Keyset (cursor) pagination for catalogue listings.
+
+Paginator runs a COUNT(*) over the filtered queryset and an OFFSET scan
+that grows with the page number. CursorPaginator instead continues from
+the sort key of the last (or first) row shown, using a WHERE clause on
+the queryset's own ordering. Every page therefore costs the same as the
+first, and no count query is run.
+
+Cursors are opaque signed tokens carrying the ordering they were made for;
+a cursor that has been tampered with or was made for another sort starts
+again from the first page. They carry no timestamp, so a position always
+gets the same URL (for crawlers and the page cache alike).
+Located at apps/products/pagination.py
+"""
+
+import logging
+import operator
+from datetime import datetime
+from decimal import Decimal
+from functools import reduce
+
+from django.core import signing
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+CURSOR_SALT = "apps.products.cursor"
+
+
+class CursorPage:
+    """One page of results plus the cursors of its neighbours (None at either end)."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate an ordered queryset by keyset. The ordering must be plain field
+    (or annotation) names and end with a unique field, e.g. ("-price", "id").
+    """
+
+    def __init__(self, queryset, per_page):
+        self.ordering = tuple(queryset.query.order_by)
+        if not self.ordering or not all(isinstance(f, str) for f in self.ordering):
+            raise ValueError("CursorPaginator needs a queryset ordered by field names.")
+        if self.ordering[-1].lstrip("-") not in ("id", "pk"):
+            raise ValueError("CursorPaginator needs an ordering that ends with the primary key.")
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        position = self._decode(cursor)
+        if position is None:
+            return self._forward_page(self.queryset, has_previous=False)
+
+        values, direction = position
+        if direction == "next":
+            return self._forward_page(self.queryset.filter(self._seek(values, forward=True)), has_previous=True)
+
+        # Walk backwards from the cursor, then restore display order
+        reverse = [f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering]
+        rows = list(self.queryset.filter(self._seek(values, forward=False)).order_by(*reverse)[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        if not rows:
+            return self._forward_page(self.queryset, has_previous=False)
+        return CursorPage(
+            rows,
+            next_cursor=self._encode(rows[-1], "next"),
+            previous_cursor=self._encode(rows[0], "prev") if has_previous else None,
+        )
+
+    def _forward_page(self, queryset, has_previous):
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            next_cursor=self._encode(rows[-1], "next") if has_next else None,
+            previous_cursor=self._encode(rows[0], "prev") if has_previous and rows else None,
+        )
+
+    def _seek(self, values, forward):
+        """Rows strictly after (forward) or before the given sort key."""
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") == forward else "gt"
+            clause = Q(**{f"{name}__{lookup}": values[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], values[:i]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+            clauses.append(clause)
+        return reduce(operator.or_, clauses)
+
+    def _encode(self, obj, direction):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip("-"))
+            if isinstance(value, Decimal):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()  # parsed back by the field's lookups
+            values.append(value)
+        data = {"o": self.ordering, "v": values, "d": direction}
+        return signing.Signer(salt=CURSOR_SALT).sign_object(data, compress=True)
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            data = signing.Signer(salt=CURSOR_SALT).unsign_object(cursor)
+        except signing.BadSignature:
+            logger.info("[Pagination] Ignoring invalid cursor")
+            return None
+        if tuple(data.get("o", ())) != self.ordering or len(data.get("v", ())) != len(self.ordering):
+            return None
+        return data["v"], "prev" if data.get("d") == "prev" else "next"
@@ -0,0 +1,34 @@
+"""
+Review listings for the product and bundle detail pages.
+
+Reviews are shown newest first, REVIEWS_PER_PAGE at a time, using keyset
+cursors (see apps.products.pagination) so a product with hundreds of
+reviews renders the same as one with a handful. Further pages are loaded
+from a JSON endpoint by the "Load more" button, which falls back to a
+plain ?reviews=<cursor> link without JavaScript.
+Located at apps/products/reviews.py
+"""
+
+from apps.products.pagination import CursorPaginator
+
+REVIEWS_PER_PAGE = 10
+
+
+def review_page(reviews, cursor=None):
+    """One page of `reviews` (a Review queryset), newest first, with their authors."""
+    return CursorPaginator(reviews.select_related("user").order_by("-created_at", "-id"), REVIEWS_PER_PAGE).page(cursor)
+
+
+def find_user_review(reviews, page, user):
+    """
+    The user's review among `reviews`, taken from the page already loaded
+    when it is there (or when the page holds every review).
+    """
+    if not user.is_authenticated:
+        return None
+    for review in page:
+        if review.user_id == user.pk:
+            return review
+    if not page.has_other_pages():
+        return None
+    return reviews.filter(user=user).first()
@@ -0,0 +1,130 @@
+"""
+Catalogue search for products and bundles.
+
+On PostgreSQL, Product and Bundle carry a stored `search_vector` (GIN
+indexed), refreshed by the post_save signals in apps.products.signals and
+rebuilt in bulk by the rebuild_search_vectors command. Queries are matched
+as prefixes (so "pho mou" finds "Phone Mount") and ranked with ts_rank.
+
+Other databases (sqlite in local tests) fall back to the previous
+icontains search over the same fields.
+Located at apps/products/search.py
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.utils.html import strip_tags
+
+SEARCH_CONFIG = "english"
+
+_TERM_RE = re.compile(r"[^\W_]+")
+
+
+def search_enabled(using="default"):
+    """Full-text search needs PostgreSQL; elsewhere the icontains fallback is used."""
+    return connections[using].vendor == "postgresql"
+
+
+def _vector(*parts):
+    """Combine (expression, weight) pairs into one weighted SearchVector."""
+    vector = None
+    for expression, weight in parts:
+        part = SearchVector(expression, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def product_search_vector(type_name):
+    """
+    Search vector for products. UPDATE can't join, so the type name is
+    passed in: a string when a whole type is re-indexed with one statement,
+    or an expression such as product_type_name() for a single product.
+    """
+    if type_name is None or isinstance(type_name, str):
+        type_name = Value(type_name or "")
+    return _vector(
+        (F("name"), "A"),
+        (F("product_code"), "A"),
+        (F("variant"), "B"),
+        (type_name, "C"),
+    )
+
+
+def product_type_name(product_model):
+    """The updated product's type name, as a subquery on type_id."""
+    product_type_model = product_model._meta.get_field("type").related_model
+    return Subquery(product_type_model.objects.filter(pk=OuterRef("type_id")).values("name")[:1])
+
+
+def bundle_search_vector(bundle):
+    """Search vector for one bundle; the RichText description is indexed without its HTML."""
+    return _vector(
+        (F("name"), "A"),
+        (F("bundle_code"), "A"),
+        (Value(strip_tags(bundle.description or "")), "C"),
+    )
+
+
+def update_product_search_vector(product):
+    # One UPDATE, without loading product.type
+    if search_enabled():
+        model = type(product)
+        model.objects.filter(pk=product.pk).update(search_vector=product_search_vector(product_type_name(model)))
+
+
+def update_bundle_search_vector(bundle):
+    if search_enabled():
+        type(bundle).objects.filter(pk=bundle.pk).update(search_vector=bundle_search_vector(bundle))
+
+
+def reindex_product_type(product_type):
+    """Refresh every product of a (renamed) product type in one UPDATE."""
+    if search_enabled():
+        product_type.products.update(search_vector=product_search_vector(product_type.name))
+
+
+def prefix_tsquery(text):
+    """
+    Turn free text into raw tsquery syntax where every word must match the
+    start of an indexed word: "Pho mount" -> "pho:* & mount:*".
+    """
+    return " & ".join(f"{term}:*" for term in _TERM_RE.findall(text.lower()))
+
+
+def parse_query(text):
+    """Build the prefix SearchQuery for `text`, or None when there is nothing to search for."""
+    raw = prefix_tsquery(text)
+    if not raw:
+        return None
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def _ranked(qs, text, fallback):
+    if not search_enabled(qs.db):
+        return qs.filter(fallback).order_by("id")
+
+    query = parse_query(text)
+    if query is None:
+        return qs.order_by("id")
+    return (
+        qs.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F("search_vector"), query))
+        .order_by("-search_rank", "id")
+    )
+
+
+def search_products(qs, text):
+    """Filter a Product queryset to `text` matches, best first."""
+    return _ranked(
+        qs,
+        text,
+        Q(name__icontains=text) | Q(variant__icontains=text) | Q(type__name__icontains=text),
+    )
+
+
+def search_bundles(qs, text):
+    """Filter a Bundle queryset to `text` matches, best first."""
+    return _ranked(qs, text, Q(name__icontains=text) | Q(description__icontains=text))
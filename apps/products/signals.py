@@ -0,0 +1,185 @@
+"""
+Signals for keeping denormalized catalogue data in step with writes:
+- the rating summary columns on Product and Bundle (rating_count,
+  rating_sum), updated on Review writes. Each change is a single UPDATE
+  with F() expressions, so concurrent reviews never overwrite each other's
+  counts; rebuild_rating_summaries repairs any drift (e.g. from raw fixture
+  loads or queryset.update()).
+- updated_at on the reviewed product or bundle, and on a bundle when
+  products are added or removed; detail pages' Last-Modified uses it.
+- the full-text search vectors (see apps.products.search), refreshed when
+  a product, bundle or product type is saved.
+- card_version on Product and Bundle, which keys the card fragment cache
+  (see apps.products.cards). It is bumped whenever something shown on a
+  card changes: the object, its reviews, or a bundle's products.
+- the catalogue version keying the anonymous page cache (see
+  apps.products.page_cache), bumped on any catalogue write. It also
+  tells the per-process autocomplete index and category tree to rebuild,
+  and
+  `build_sitemaps --if-stale` whether the sitemaps need rebuilding.
+Located at apps/products/signals.py
+"""
+
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.products.models import Bundle, Category, Product, ProductBundle, ProductType, Review, Subcategory
+from apps.products.page_cache import bump_catalogue_version
+from apps.products.search import reindex_product_type, update_bundle_search_vector, update_product_search_vector
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ["rating_count", "rating_sum", "rating_average", "card_version", "updated_at"]
+
+
+def _review_target(product_id, bundle_id):
+    if product_id:
+        return Product, product_id
+    if bundle_id:
+        return Bundle, bundle_id
+    return None
+
+
+def _apply_rating_deltas(deltas):
+    """
+    Apply {(model, pk): [count_delta, sum_delta]} to the summary columns.
+    Every target is also marked modified, as its detail page lists the
+    review (see apps.products.conditional).
+    """
+    for (model, pk), (count, total) in deltas.items():
+        changes = {"updated_at": Now()}
+        if count or total:
+            changes.update(
+                rating_count=F("rating_count") + count,
+                rating_sum=F("rating_sum") + total,
+                card_version=F("card_version") + 1,
+            )
+        model.objects.filter(pk=pk).update(**changes)
+        logger.debug(f"[Reviews] {model.__name__} {pk} rating summary {count:+d} reviews, {total:+d} stars")
+
+
+def _refresh_cached_targets(review):
+    """Keep a product/bundle instance already loaded on the review current."""
+    for name in ("product", "bundle"):
+        field = Review._meta.get_field(name)
+        target = field.get_cached_value(review, default=None) if field.is_cached(review) else None
+        if target is not None and target.pk:
+            try:
+                target.refresh_from_db(fields=SUMMARY_FIELDS)
+            except target.DoesNotExist:
+                pass
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    """Record what the review counted towards before this save."""
+    instance._rating_before = None
+    if instance.pk and not raw:
+        instance._rating_before = (
+            Review.objects.filter(pk=instance.pk).values("product_id", "bundle_id", "rating").first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_summary_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    deltas = defaultdict(lambda: [0, 0])
+    before = getattr(instance, "_rating_before", None)
+    if before:
+        target = _review_target(before["product_id"], before["bundle_id"])
+        if target:
+            deltas[target][0] -= 1
+            deltas[target][1] -= before["rating"]
+
+    target = _review_target(instance.product_id, instance.bundle_id)
+    if target:
+        deltas[target][0] += 1
+        deltas[target][1] += instance.rating
+
+    _apply_rating_deltas(deltas)
+    _refresh_cached_targets(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_summary_on_delete(sender, instance, **kwargs):
+    target = _review_target(instance.product_id, instance.bundle_id)
+    if target:
+        _apply_rating_deltas({target: [-1, -instance.rating]})
+        _refresh_cached_targets(instance)
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_search_vector(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_product_search_vector(instance)
+
+
+@receiver(post_save, sender=Bundle)
+def refresh_bundle_search_vector(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_bundle_search_vector(instance)
+
+
+@receiver(post_save, sender=ProductType)
+def refresh_product_type_search_vectors(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        reindex_product_type(instance)
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Bundle)
+def bump_card_version(sender, instance, raw=False, **kwargs):
+    """
+    Write card_version as F() + 1 with the save itself, so an instance loaded
+    before an earlier bump cannot save its stale version back.
+    """
+    if not (raw or instance._state.adding):
+        instance.card_version = F("card_version") + 1
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Bundle)
+def refresh_card_version(sender, instance, raw=False, **kwargs):
+    # Replace the F() expression left by bump_card_version with the stored value
+    if not isinstance(instance.card_version, int):
+        instance.refresh_from_db(fields=["card_version"])
+
+
+@receiver(post_save, sender=Product)
+def bump_bundles_showing_product(sender, instance, created, raw=False, **kwargs):
+    # Bundle cards show their products' names and images
+    if not (raw or created):
+        Bundle.objects.filter(products=instance.pk).update(card_version=F("card_version") + 1)
+
+
+@receiver(post_save, sender=ProductBundle)
+@receiver(post_delete, sender=ProductBundle)
+def bump_bundle_card_version_on_contents(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Bundle.objects.filter(pk=instance.bundle_id).update(card_version=F("card_version") + 1, updated_at=Now())
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Bundle)
+@receiver(post_delete, sender=Bundle)
+@receiver(post_save, sender=ProductBundle)
+@receiver(post_delete, sender=ProductBundle)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Subcategory)
+@receiver(post_delete, sender=Subcategory)
+@receiver(post_save, sender=ProductType)
+@receiver(post_delete, sender=ProductType)
+def invalidate_cached_pages(sender, raw=False, **kwargs):
+    # After commit, so no guest can cache the old rows under the new version
+    if not raw:
+        transaction.on_commit(bump_catalogue_version)
@@ -0,0 +1,194 @@
+"""
+Precomputed sitemap files.
+
+`manage.py build_sitemaps` writes the sitemap index and every section,
+split into shards of SITEMAP_SHARD_SIZE URLs, as gzipped XML into
+default storage under sitemaps/<build>/. Every section has at least
+its first shard. The new build is then made current by replacing
+sitemaps/current.txt in one step, which also records the catalogue
+version (apps.products.page_cache) it was built from, and all but the
+previous build are removed, so a crawler part-way through the old index
+still finds its shards.
+
+With SITEMAP_PRECOMPUTED enabled, the sitemap views (config/views_sitemap.py)
+stream these files: gzipped as stored when the client accepts it,
+decompressed on the fly otherwise. Serving them does no database work.
+URLs from before sharding still resolve: /sitemap-<section>.xml?p=N is
+shard N (1 without ?p).
+
+Web workers cache the pointer for POINTER_TTL seconds and re-read it when
+a file has gone, so they follow builds made by other processes. Since
+every catalogue write bumps the catalogue version, `build_sitemaps
+--if-stale`, run from a scheduler (see README), rebuilds only when the
+catalogue has changed since the current build.
+Located at apps/products/sitemap_files.py
+"""
+
+import gzip
+import io
+import logging
+import os
+import tempfile
+import uuid
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import Http404, FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from apps.products.page_cache import catalogue_version
+from apps.products.sitemaps import XMLNS, lastmod_xml, urlset_xml
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_DIR = "sitemaps"
+POINTER_FILE = f"{SITEMAP_DIR}/current.txt"
+CURRENT_BUILD_KEY = "sitemaps:current_build"
+# How long a worker may keep serving a build after a newer one is written
+POINTER_TTL = 60
+
+_CHUNK = 64 * 1024
+
+
+def _read_pointer():
+    """(build id, catalogue version) from the pointer file, or (None, None)."""
+    if not default_storage.exists(POINTER_FILE):
+        return None, None
+    with default_storage.open(POINTER_FILE, "rb") as fh:
+        build, _, version = fh.read().decode().strip().partition(" ")
+    return build or None, int(version) if version.isdigit() else None
+
+
+def current_build(refresh=False):
+    """The id of the build being served, or None before the first build."""
+    build = None if refresh else cache.get(CURRENT_BUILD_KEY)
+    if build is None:
+        build, _ = _read_pointer()
+        if build:
+            cache.set(CURRENT_BUILD_KEY, build, POINTER_TTL)
+    return build
+
+
+def is_stale():
+    """True if there is no build or the catalogue changed since the current one."""
+    build, version = _read_pointer()
+    return build is None or version != catalogue_version()
+
+
+def _sitemapindex(shards, base_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n'
+    for name, lastmod in shards:
+        yield f"<sitemap><loc>{escape(f'{base_url}/{name}')}</loc>{lastmod_xml(lastmod)}</sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def _write_pointer(content):
+    """
+    Replace the pointer in one step, so readers never find it missing: a
+    rename over the old file on local storage, an overwrite (atomic for an
+    S3 object) elsewhere.
+    """
+    try:
+        path = default_storage.path(POINTER_FILE)
+    except NotImplementedError:
+        with default_storage.open(POINTER_FILE, "wb") as fh:
+            fh.write(content)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".current-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _write(build, name, chunks):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename=name, mode="wb", fileobj=buffer, mtime=0) as gz:
+        for chunk in chunks:
+            gz.write(chunk.encode())
+    default_storage.save(f"{SITEMAP_DIR}/{build}/{name}.gz", ContentFile(buffer.getvalue()))
+
+
+def build_sitemaps(sitemaps, base_url, shard_size=None):
+    """
+    Write every section of `sitemaps` ({section: Sitemap class}) and the
+    index for a site at `base_url` (e.g. "https://example.com"), make the
+    build current and return its id.
+    """
+    shard_size = shard_size or settings.SITEMAP_SHARD_SIZE
+    base_url = base_url.rstrip("/")
+    build = f"{timezone.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+    # Read first: writes made during the build leave it stale
+    version = catalogue_version()
+
+    shards = []
+    for section, sitemap_class in sitemaps.items():
+        sitemap = sitemap_class()
+        rows = sitemap.rows()
+        number = 0
+        # Always write shard 1, which also answers /sitemap-<section>.xml
+        while (shard := list(islice(rows, shard_size))) or not number:
+            number += 1
+            name = f"sitemap-{section}-{number}.xml"
+            _write(build, name, urlset_xml(shard, base_url, sitemap))
+            shards.append((name, max((lastmod for _, lastmod in shard if lastmod), default=None)))
+
+    _write(build, "sitemap.xml", _sitemapindex(shards, base_url))
+    previous, _ = _read_pointer()
+    _write_pointer(f"{build} {version}".encode())
+    cache.set(CURRENT_BUILD_KEY, build, POINTER_TTL)
+    _remove_old_builds(keep={build, previous})
+    logger.info(f"[Sitemaps] Built {build}: {len(shards)} shards")
+    return build
+
+
+def _remove_old_builds(keep):
+    builds, _ = default_storage.listdir(SITEMAP_DIR)
+    for old in set(builds) - keep:
+        _, files = default_storage.listdir(f"{SITEMAP_DIR}/{old}")
+        for name in files:
+            default_storage.delete(f"{SITEMAP_DIR}/{old}/{name}")
+        logger.debug(f"[Sitemaps] Removed build {old}")
+
+
+def _open(build, name):
+    try:
+        return default_storage.open(f"{SITEMAP_DIR}/{build}/{name}.gz", "rb")
+    except OSError:
+        return None
+
+
+def _decompressed(fh):
+    with fh, gzip.GzipFile(fileobj=fh) as gz:
+        while chunk := gz.read(_CHUNK):
+            yield chunk
+
+
+def serve_sitemap_file(request, name):
+    """
+    Stream `name` (e.g. "sitemap.xml") from the current build. Returns None
+    when nothing has been built yet, so callers can render on demand.
+    """
+    build = current_build()
+    if build is None:
+        return None
+    fh = _open(build, name)
+    if fh is None:
+        # The cached build may have been replaced and removed since
+        fresh = current_build(refresh=True)
+        fh = _open(fresh, name) if fresh not in (None, build) else None
+    if fh is None:
+        raise Http404(f"No sitemap named {name}")
+
+    if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+        response = FileResponse(fh, content_type="application/xml")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = StreamingHttpResponse(_decompressed(fh), content_type="application/xml")
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
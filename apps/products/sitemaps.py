@@ -1,13 +1,51 @@
 """
 Sitemaps for products, categories, product types, and bundles.
 These sitemaps help search engines index the product-related pages effectively.
+
+Each sitemap also has rows(), yielding (path, lastmod) pairs from a single
+bulk query with URLs built without a reverse() per item, and urlset_xml()
+turns them into <urlset> XML chunk by chunk. Sections are streamed from
+these (config/views_sitemap.py), and the precomputed sitemap files
+(apps/products/sitemap_files.py) are written from them.
 Located at apps/products/sitemaps.py
 """
 
+from xml.sax.saxutils import escape
+
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Max, Q
 from django.urls import reverse
 from .models import Product, Category, ProductType, Bundle
 
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# Stands in for the pk while reversing a detail URL once per sitemap
+_PK_PLACEHOLDER = 987654321
+
+
+def _detail_path(url_name, kwarg):
+    """A str.format() template for a pk-based detail URL."""
+    return reverse(url_name, kwargs={kwarg: _PK_PLACEHOLDER}).replace(str(_PK_PLACEHOLDER), "{}")
+
+
+def lastmod_xml(value):
+    return f"<lastmod>{value.isoformat()}</lastmod>" if value else ""
+
+
+def urlset_xml(rows, base_url, sitemap):
+    """Yield a <urlset> for (path, lastmod) `rows` a line at a time."""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+    for path, lastmod in rows:
+        yield (
+            f"<url><loc>{escape(base_url + path)}</loc>{lastmod_xml(lastmod)}"
+            f"<changefreq>{sitemap.changefreq}</changefreq><priority>{sitemap.priority}</priority></url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def _public_products_lastmod():
+    return Max("products__updated_at", filter=Q(products__is_draft=False))
+
 
 class ProductSitemap(Sitemap):
     changefreq = "weekly"
@@ -24,6 +62,11 @@ class ProductSitemap(Sitemap):
     def lastmod(self, item):
         return item.updated_at
 
+    def rows(self):
+        path = _detail_path("products:product_detail", "pk")
+        for pk, updated_at in self.items().values_list("pk", "updated_at").iterator(chunk_size=2000):
+            yield path.format(pk), updated_at
+
 
 class CategorySitemap(Sitemap):
     changefreq = "monthly"
@@ -37,6 +80,17 @@ class CategorySitemap(Sitemap):
         # Filter categories via a query param in product_list
         return f"{reverse('products:product_list')}?category={item.slug}"
 
+    def rows(self):
+        list_path = reverse('products:product_list')
+        categories = (
+            Category.objects.annotate(lastmod=_public_products_lastmod())
+            .filter(lastmod__isnull=False)
+            .order_by("pk")
+            .values_list("slug", "lastmod")
+        )
+        for slug, lastmod in categories:
+            yield f"{list_path}?category={slug}", lastmod
+
 
 class ProductTypeSitemap(Sitemap):
     changefreq = "monthly"
@@ -48,6 +102,12 @@ class ProductTypeSitemap(Sitemap):
     def location(self, item):
         return f"{reverse('products:product_list')}?q={item.name}"
 
+    def rows(self):
+        list_path = reverse('products:product_list')
+        types = ProductType.objects.annotate(lastmod=_public_products_lastmod()).order_by("pk")
+        for name, lastmod in types.values_list("name", "lastmod"):
+            yield f"{list_path}?q={name}", lastmod
+
 
 class BundleSitemap(Sitemap):
     changefreq = "monthly"
@@ -62,3 +122,16 @@ class BundleSitemap(Sitemap):
 
     def lastmod(self, item):
         return item.updated_at
+
+    def rows(self):
+        path = _detail_path("products:bundle_detail", "bundle_id")
+        for pk, updated_at in self.items().values_list("pk", "updated_at").iterator(chunk_size=2000):
+            yield path.format(pk), updated_at
+
+
+SITEMAPS = {
+    'products': ProductSitemap,
+    'categories': CategorySitemap,
+    'product_types': ProductTypeSitemap,
+    'bundles': BundleSitemap,
+}
@@ -0,0 +1,52 @@
+"""
+Per-process snapshots of catalogue data (the autocomplete prefix index,
+the category navigation tree).
+
+Each process builds a snapshot once and reuses it until the catalogue
+version (apps.products.page_cache.catalogue_version, a counter row in the
+database bumped after every catalogue write) moves on, or until its TTL
+passes. Every worker reads the same counter, so a committed write reaches
+all of them on their next read whatever the cache backend; the TTL picks
+up writes that send no signals (bulk_create, queryset.update()).
+
+Checking the version is one single-row query, shared with the page cache
+and ETags when the request is passed in.
+Located at apps/products/snapshots.py
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from apps.products.page_cache import catalogue_version
+
+
+class CatalogueSnapshot:
+    """The result of `build()`, rebuilt when the catalogue version changes or `ttl_setting` seconds pass."""
+
+    def __init__(self, build, ttl_setting, default_ttl):
+        self.build = build
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.value = None
+        self.version = None
+        self.built_at = 0.0
+
+    def get(self, request=None):
+        # Read the version first: anything built after it is at least as new
+        version = catalogue_version(request)
+        if self._is_stale(version):
+            with self._lock:
+                if self._is_stale(version):
+                    self.value = self.build()
+                    self.version = version
+                    self.built_at = time.monotonic()
+        return self.value
+
+    def _is_stale(self, version):
+        ttl = getattr(settings, self.ttl_setting, self.default_ttl)
+        return self.value is None or self.version != version or time.monotonic() - self.built_at > ttl
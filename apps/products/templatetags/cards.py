@@ -0,0 +1,15 @@
+# apps/products/templatetags/cards.py
+
+from django import template
+from apps.products.cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cached_cards(context, objects, template_name):
+    """
+    {% cached_cards page_obj "include/product_list_card.html" as cards %}
+    Renders (or fetches from the fragment cache) one card per object.
+    """
+    return render_cards(context.get("request"), objects, template_name)
@@ -0,0 +1,19 @@
+# apps/products/templatetags/page_cache.py
+
+from django import template
+from django.utils.safestring import mark_safe
+from apps.products.page_cache import hole_marker
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def page_hole(context, template_name):
+    """
+    {% page_hole "include/messages.html" %}
+    Includes a per-viewer template. Pages rendered for the page cache get a
+    marker instead, filled in for each request the page is served to.
+    """
+    if getattr(context.get("request"), "_page_cache_render", False):
+        return mark_safe(hole_marker(template_name))
+    return context.template.engine.get_template(template_name).render(context)
@@ -0,0 +1,110 @@
+"""
+Tests for navbar search suggestions (apps.products.autocomplete).
+Covers prefix matching and ranking in the in-process index, the JSON
+endpoint, warm lookups costing only the catalogue version read, and
+invalidation on product/bundle writes in any process.
+Located at apps/products/tests/test_autocomplete.py
+"""
+
+import pytest
+from django.urls import reverse
+from apps.products import autocomplete
+from apps.products.autocomplete import PrefixIndex
+from apps.products.models import Bundle, Category, Product, ProductType
+from apps.products.page_cache import bump_catalogue_version
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    autocomplete._index.clear()
+    yield
+    autocomplete._index.clear()
+
+
+@pytest.fixture
+def catalogue(db):
+    cat = Category.objects.create(name="Accessories", slug="accessories")
+    ptype = ProductType.objects.create(name="Mount")
+
+    def make(name, code, **extra):
+        return Product.objects.create(name=name, variant="Vent", description="x", type=ptype, tier="Standard",
+                                      category=cat, price=5, stock=1, sku=f"S-{code}", product_code=code, **extra)
+
+    products = [make("Phone Mount", "ACC-001"), make("Dash Phone Holder", "ACC-002"),
+                make("Secret Prototype", "ACC-003", is_draft=True)]
+    bundle = Bundle.objects.create(name="Phone Essentials Kit", description="", bundle_type="Standard",
+                                   price=0, subtotal_price=0, sku="B-1", bundle_code="bundle-phone-kit")
+    return products, bundle
+
+
+def _names(results):
+    return [r["name"] for r in results]
+
+
+def test_prefix_index_ranks_name_starts_above_word_matches():
+    index = PrefixIndex([
+        ({"name": "Dash Phone Holder"}, ["Dash Phone Holder", "ACC-2"]),
+        ({"name": "Phone Mount"}, ["Phone Mount", "ACC-1"]),
+        ({"name": "Tyre Gauge"}, ["Tyre Gauge", "phone-free"]),
+    ])
+
+    assert _names(index.lookup("pho")) == ["Phone Mount", "Dash Phone Holder", "Tyre Gauge"]
+    assert _names(index.lookup("  PHONE   mo")) == ["Phone Mount"]
+    assert _names(index.lookup("acc")) == ["Dash Phone Holder", "Phone Mount"]
+    assert _names(index.lookup("pho", limit=1)) == ["Phone Mount"]
+    assert index.lookup("zz") == [] and index.lookup(" ") == []
+
+
+@pytest.mark.django_db
+def test_endpoint_suggests_products_and_bundles(client, catalogue):
+    products, bundle = catalogue
+
+    data = client.get(reverse("products:autocomplete"), {"q": "phone"}).json()
+
+    assert data["q"] == "phone"
+    assert _names(data["results"]) == ["Phone Essentials Kit", "Phone Mount", "Dash Phone Holder"]
+    assert data["results"][0] == {
+        "type": "bundle", "id": bundle.id, "name": bundle.name, "variant": "",
+        "url": reverse("products:bundle_detail", args=[bundle.id]),
+    }
+    # Drafts are never suggested
+    assert client.get(reverse("products:autocomplete"), {"q": "secret"}).json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_warm_lookups_only_read_the_catalogue_version(client, catalogue, django_assert_num_queries):
+    url = reverse("products:autocomplete")
+    client.get(url, {"q": "ph"})
+
+    with django_assert_num_queries(1):
+        resp = client.get(url, {"q": "phone m", "limit": "1"})
+
+    assert _names(resp.json()["results"]) == ["Phone Mount"]
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_the_index(client, catalogue, django_capture_on_commit_callbacks):
+    products, bundle = catalogue
+    url = reverse("products:autocomplete")
+    client.get(url, {"q": "phone"})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        products[0].name = "Windscreen Mount"
+        products[0].save()
+        bundle.delete()
+
+    assert _names(client.get(url, {"q": "phone"}).json()["results"]) == ["Dash Phone Holder"]
+    assert _names(client.get(url, {"q": "winds"}).json()["results"]) == ["Windscreen Mount"]
+
+
+@pytest.mark.django_db
+def test_writes_from_other_workers_invalidate_the_index(client, catalogue):
+    products, _ = catalogue
+    url = reverse("products:autocomplete")
+    client.get(url, {"q": "phone"})
+
+    # Another worker's write: only the shared catalogue version tells this process
+    Product.objects.filter(pk=products[1].pk).update(name="Dash Cradle")
+    bump_catalogue_version()
+
+    assert _names(client.get(url, {"q": "dash"}).json()["results"]) == ["Dash Cradle"]
@@ -1,11 +1,17 @@
 """
-Tests for the Bundle list view with filtering, sorting, and searching.
+Tests for the Bundle list view with filtering, sorting, searching and
+pagination, with review stats and product thumbnails read without
+per-card queries.
 Located at apps/products/tests/test_bundle_list_view.py
 """
 
 import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from apps.products.models import Bundle
+from apps.products.models import Bundle, Category, Product, ProductBundle, ProductType, Review
+from apps.products.navigation import get_category_tree
 
 
 @pytest.fixture
@@ -53,3 +59,66 @@ def test_context_banner_and_search_cleared(client, bundles):
     resp = client.get(reverse("products:bundle_list"))
     assert "promo_banner" in resp.context
     assert resp.context["search_q"] == ""   # the view intentionally clears the input
+
+
+@pytest.mark.django_db
+def test_review_stats_do_not_query_per_card(client, bundles):
+    reviewer = User.objects.create_user("reviewer")
+    for i, bundle in enumerate(bundles):
+        Review.objects.create(user=reviewer, bundle=bundle, rating=i + 3, comment="")
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("products:bundle_list") + "?sort=price_asc")
+
+    assert not [q for q in ctx.captured_queries if "products_review" in q["sql"]]
+    assert [(b.review_count(), b.average_rating()) for b in resp.context["bundles"]] == [(1, 3), (1, 4), (1, 5)]
+
+
+@pytest.mark.django_db
+def test_bundle_cards_prefetch_a_few_products_in_flat_queries(client, bundles, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    cat = Category.objects.create(name="Kits", slug="kits")
+    ptype = ProductType.objects.create(name="Part")
+    parts = [
+        Product.objects.create(name=f"Part {i}", variant="V", description="x", type=ptype, tier="Standard",
+                               category=cat, price=2, stock=1, sku=f"SKU-P{i}", product_code=f"PC-P{i}")
+        for i in range(5)
+    ]
+
+    def page_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(reverse("products:bundle_list"))
+        return resp, len(ctx.captured_queries)
+
+    for part in parts:
+        ProductBundle.objects.create(bundle=bundles[0], product=part)
+    get_category_tree()  # built once per process, not per page
+    _, few = page_queries()
+    for bundle in bundles[1:]:
+        for part in parts:
+            ProductBundle.objects.create(bundle=bundle, product=part)
+    resp, many = page_queries()
+
+    assert few == many
+    html = resp.content.decode()
+    assert html.count('class="img-thumbnail"') == 9
+    assert 'title="Part 2"' in html and 'title="Part 3"' not in html
+
+
+@pytest.mark.django_db
+def test_bundle_list_is_paginated(client):
+    Bundle.objects.bulk_create([
+        Bundle(name=f"Kit {i}", slug=f"kit-{i}", description="", bundle_type="Pro", discount_percentage=10,
+               price=i, subtotal_price=i, sku=f"BK{i}", bundle_code=f"bundle-kit-{i}")
+        for i in range(25)
+    ])
+    url = reverse("products:bundle_list")
+
+    first = client.get(url + "?type=Pro")
+    second = client.get(url + "?type=Pro&page=2")
+    fallback = client.get(url + "?page=99")
+
+    assert len(first.context["bundles"]) == 20
+    assert len(second.context["bundles"]) == 5
+    assert 'href="?type=Pro&amp;page=2"' in first.content.decode()
+    assert fallback.context["page_obj"].number == 1
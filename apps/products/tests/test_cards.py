@@ -0,0 +1,92 @@
+"""
+Tests for the card fragment cache (apps.products.cards).
+Covers batched cache reads/writes per listing, per-viewer CSRF tokens in
+cached cards, and invalidation through card_version on product, bundle
+and review writes.
+Located at apps/products/tests/test_cards.py
+"""
+
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from apps.products import cards
+from apps.products.models import Bundle, Category, Product, ProductBundle, ProductType, Review
+
+
+@pytest.fixture
+def listed(db):
+    cat = Category.objects.create(name="Accessories", slug="accessories")
+    ptype = ProductType.objects.create(name="Mount")
+    products = [
+        Product.objects.create(name=f"Card {i}", variant="V", description="x", type=ptype, tier="Standard",
+                               category=cat, price=5, stock=1, sku=f"S-C{i}", product_code=f"PC-C{i}")
+        for i in range(3)
+    ]
+    bundle = Bundle.objects.create(name="Card Kit", description="", bundle_type="Standard", price=0,
+                                   subtotal_price=0, sku="B-C", bundle_code="bundle-card-kit")
+    return products, bundle
+
+
+def _spy_cache():
+    return (
+        mock.patch.object(cards.cache, "get_many", wraps=cache.get_many),
+        mock.patch.object(cards.cache, "set_many", wraps=cache.set_many),
+    )
+
+
+@pytest.mark.django_db
+def test_listing_reads_cards_in_one_round_trip(client, listed, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0  # render the listing both times
+    url = reverse("products:product_list")
+    spy_get, spy_set = _spy_cache()
+
+    with spy_get as get_many, spy_set as set_many:
+        client.get(url)
+        client.get(url)
+
+    assert get_many.call_count == 2
+    assert len(get_many.call_args.args[0]) == 3
+    # Rendered once on the first request, served from the cache after
+    assert set_many.call_count == 1
+
+
+@pytest.mark.django_db
+def test_cached_cards_carry_each_viewers_csrf_token(client, listed):
+    from django.test import Client
+
+    url = reverse("products:product_list")
+    other = Client()
+    first = client.get(url).content.decode()
+    second = other.get(url).content.decode()
+
+    assert cards.CSRF_PLACEHOLDER not in first + second
+    assert client.cookies["csrftoken"].value != other.cookies["csrftoken"].value
+    assert 'name="csrfmiddlewaretoken"' in second
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_the_affected_cards(client, listed, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    products, bundle = listed
+    client.get(reverse("products:product_list"))
+    client.get(reverse("products:bundle_list"))
+
+    products[0].name = "Renamed Card"
+    products[0].save()
+    Review.objects.create(user=User.objects.create_user("rev"), product=products[1], rating=4)
+    ProductBundle.objects.create(bundle=bundle, product=products[2])
+
+    product_html = client.get(reverse("products:product_list")).content.decode()
+    bundle_html = client.get(reverse("products:bundle_list")).content.decode()
+
+    assert "Renamed Card" in product_html
+    assert "4.0 (1)" in product_html
+    assert 'title="Card 2"' in bundle_html
+
+    # A product change also refreshes the bundles that show it
+    products[2].name = "Card Two"
+    products[2].save()
+    assert 'title="Card Two"' in client.get(reverse("products:bundle_list")).content.decode()
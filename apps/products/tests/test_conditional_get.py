@@ -0,0 +1,125 @@
+"""
+Tests for conditional GET on catalogue pages (apps.products.conditional).
+Covers 304 responses without rendering, validators changing with catalogue
+writes, reviews and bundle contents, validators agreeing across workers, and viewer state (cart, messages)
+keeping personal pages from being revalidated as unchanged.
+Located at apps/products/tests/test_conditional_get.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from apps.products.models import Bundle, Category, Product, ProductBundle, ProductType, Review
+from apps.products.page_cache import bump_catalogue_version
+
+
+@pytest.fixture
+def product(db):
+    cat = Category.objects.create(name="Accessories", slug="accessories")
+    ptype = ProductType.objects.create(name="Mount")
+    return Product.objects.create(name="Phone Mount", variant="V", description="x", type=ptype, tier="Standard",
+                                  category=cat, price=5, stock=10, sku="S-PM", product_code="PC-PM")
+
+
+@pytest.fixture
+def bundle(product):
+    bundle = Bundle.objects.create(name="Dash Kit", description="", bundle_type="Standard", price=0,
+                                   subtotal_price=0, sku="B-DK", bundle_code="bundle-dash-kit")
+    ProductBundle.objects.create(bundle=bundle, product=product)
+    return bundle
+
+
+def _revalidate(client, url, first):
+    headers = {"If-None-Match": first["ETag"]}
+    if first.has_header("Last-Modified"):
+        headers["If-Modified-Since"] = first["Last-Modified"]
+    return client.get(url, headers=headers)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["products:product_list", "products:bundle_list"])
+def test_unchanged_lists_return_304_for_one_query(client, product, url_name, django_assert_num_queries):
+    url = reverse(url_name)
+    first = client.get(url)
+    assert first.has_header("ETag") and not first.has_header("Last-Modified")
+    assert "no-cache" in first["Cache-Control"] and "private" in first["Cache-Control"]
+
+    # Just the catalogue version
+    with django_assert_num_queries(1):
+        resp = _revalidate(client, url, first)
+
+    assert resp.status_code == 304
+    assert resp.templates == []
+
+
+@pytest.mark.django_db
+def test_validators_do_not_depend_on_the_local_cache(client, product):
+    url = reverse("products:product_list")
+    first = client.get(url)
+
+    # A worker with an empty (or different LocMem) cache agrees on the ETag
+    cache.clear()
+    assert _revalidate(client, url, first).status_code == 304
+
+    # and a write made through any worker changes it for all of them
+    bump_catalogue_version()
+    cache.clear()
+    assert _revalidate(client, url, first).status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_304_costs_two_queries(client, product, django_assert_num_queries):
+    url = reverse("products:product_detail", args=[product.pk])
+    first = client.get(url)
+    assert first.has_header("Last-Modified")
+
+    # The catalogue version and the product's updated_at
+    with django_assert_num_queries(2):
+        assert _revalidate(client, url, first).status_code == 304
+    # Crawlers that only send If-Modified-Since
+    assert client.get(url, headers={"If-Modified-Since": first["Last-Modified"]}).status_code == 304
+
+
+@pytest.mark.django_db
+def test_review_writes_change_the_detail_validators(client, product, django_capture_on_commit_callbacks):
+    url = reverse("products:product_detail", args=[product.pk])
+    first = client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        review = Review.objects.create(user=User.objects.create_user("rev"), product=product, rating=5, comment="A")
+    second = _revalidate(client, url, first)
+    assert second.status_code == 200
+
+    # Comment-only edits do not touch the rating summary but still change the page
+    with django_capture_on_commit_callbacks(execute=True):
+        review.comment = "Edited"
+        review.save()
+    assert _revalidate(client, url, second).status_code == 200
+
+
+@pytest.mark.django_db
+def test_product_edits_change_the_bundle_validators(client, bundle, product):
+    url = reverse("products:bundle_detail", args=[bundle.pk])
+    first = client.get(url)
+
+    # Only the product row changes; the bundle page lists it
+    Product.objects.filter(pk=product.pk).update(updated_at=product.updated_at.replace(year=2099))
+
+    assert _revalidate(client, url, first).status_code == 200
+
+
+@pytest.mark.django_db
+def test_viewer_state_is_part_of_the_validator(client, product):
+    url = reverse("products:product_list")
+    first = client.get(url)
+
+    client.post(reverse("orders:add_to_cart", args=[product.pk]), {"quantity": 1})
+    # A flash message is pending: no validators, full render
+    with_message = client.get(url, headers={"If-None-Match": first["ETag"]})
+    assert with_message.status_code == 200 and not with_message.has_header("ETag")
+
+    # The cart badge changed, so the guest's old copy is stale
+    with_cart = client.get(url, headers={"If-None-Match": first["ETag"]})
+    assert with_cart.status_code == 200
+    assert with_cart["ETag"] != first["ETag"] and not with_cart.has_header("Last-Modified")
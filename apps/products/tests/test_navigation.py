@@ -0,0 +1,108 @@
+"""
+Tests for the cached category navigation tree (apps.products.navigation).
+Covers the tree's contents and public product counts, navbar renders
+without category queries, and invalidation on category, subcategory and
+product writes.
+Located at apps/products/tests/test_navigation.py
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.products import navigation
+from apps.products.models import Category, Product, ProductType, Subcategory
+from apps.products.navigation import get_category_tree
+from apps.products.page_cache import bump_catalogue_version
+
+
+@pytest.fixture(autouse=True)
+def fresh_tree():
+    navigation._tree.clear()
+    yield
+    navigation._tree.clear()
+
+
+@pytest.fixture
+def catalogue(db):
+    care = Category.objects.create(name="Car Care", slug="car-care")
+    tech = Category.objects.create(name="Tech", slug="tech")
+    wax = Subcategory.objects.create(name="Wax", slug="wax", category=care)
+    Subcategory.objects.create(name="Cloths", slug="cloths", category=care)
+    ptype = ProductType.objects.create(name="Kit")
+
+    def make(i, category, subcategory=None, **extra):
+        return Product.objects.create(name=f"Item {i}", variant="V", description="x", type=ptype, tier="Standard",
+                                      category=category, subcategory=subcategory, price=5, stock=1,
+                                      sku=f"S-N{i}", product_code=f"PC-N{i}", **extra)
+
+    products = [make(0, care, wax), make(1, care, wax), make(2, care, is_draft=True), make(3, tech)]
+    return care, tech, products
+
+
+def _category_queries(ctx):
+    return [q for q in ctx.captured_queries if f'FROM "{Category._meta.db_table}"' in q["sql"]]
+
+
+def _shape(tree):
+    return [
+        (c.slug, c.product_count, [(s.slug, s.product_count) for s in c.subcategories])
+        for c in tree
+    ]
+
+
+def test_tree_counts_public_products(catalogue):
+    assert _shape(get_category_tree()) == [
+        ("car-care", 2, [("cloths", 0), ("wax", 2)]),
+        ("tech", 1, []),
+    ]
+
+
+def test_pages_render_navigation_without_category_queries(client, catalogue):
+    url = reverse("pages:privacy")
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as ctx:
+        html = client.get(url).content.decode()
+
+    assert _category_queries(ctx) == []
+    assert "?category=car-care" in html and "?category=tech" in html
+
+
+def test_product_list_reads_the_tree_once(client, catalogue, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    get_category_tree()
+
+    with CaptureQueriesContext(connection) as ctx:
+        html = client.get(reverse("products:product_list")).content.decode()
+
+    assert _category_queries(ctx) == []
+    assert html.count('value="car-care"') == 1
+
+
+def test_writes_invalidate_the_tree(catalogue, django_capture_on_commit_callbacks):
+    care, tech, products = catalogue
+    get_category_tree()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(name="Lighting", slug="lighting")
+        products[2].is_draft = False
+        products[2].save()
+        Subcategory.objects.filter(slug="cloths").get().delete()
+        products[3].delete()
+
+    assert _shape(get_category_tree()) == [
+        ("car-care", 3, [("wax", 2)]),
+        ("tech", 0, []),
+        ("lighting", 0, []),
+    ]
+
+
+def test_writes_from_other_workers_invalidate_the_tree(catalogue):
+    get_category_tree()
+
+    # Another worker's write: only the shared catalogue version tells this process
+    Category.objects.filter(slug="tech").update(name="Gadgets")
+    bump_catalogue_version()
+
+    assert [c.name for c in get_category_tree()] == ["Car Care", "Gadgets"]
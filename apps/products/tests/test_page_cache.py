@@ -0,0 +1,113 @@
+"""
+Tests for the anonymous full-page cache (apps.products.page_cache).
+Covers warm hits costing only the catalogue version read, per-viewer cart badge, messages and CSRF
+tokens on cached pages, invalidation on catalogue writes, and the requests
+that bypass the cache.
+Located at apps/products/tests/test_page_cache.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from apps.products import page_cache
+from apps.products.models import Category, Product, ProductType, Review
+
+
+@pytest.fixture
+def product(db):
+    cat = Category.objects.create(name="Accessories", slug="accessories")
+    ptype = ProductType.objects.create(name="Mount")
+    return Product.objects.create(name="Phone Mount", variant="V", description="x", type=ptype, tier="Standard",
+                                  category=cat, price=5, stock=10, sku="S-PM", product_code="PC-PM")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["home", "products:product_list", "products:bundle_list"])
+def test_warm_guest_pages_cost_one_query(client, product, url_name, django_assert_num_queries):
+    url = reverse(url_name)
+    assert client.get(url)["X-Page-Cache"] == "miss"
+
+    # The catalogue version, shared with the ETag on list pages
+    with django_assert_num_queries(1):
+        resp = Client().get(url)
+
+    assert resp.status_code == 200
+    assert resp["X-Page-Cache"] == "hit"
+
+
+@pytest.mark.django_db
+def test_querystrings_are_normalized(client, product):
+    url = reverse("products:product_list")
+    client.get(url, {"sort": "price_asc", "category": "accessories"})
+
+    assert client.get(url + "?category=accessories&sort=price_asc&utm_source=mail")["X-Page-Cache"] == "hit"
+    assert client.get(url, {"sort": "price_desc", "category": "accessories"})["X-Page-Cache"] == "miss"
+
+
+@pytest.mark.django_db
+def test_cart_badge_messages_and_csrf_are_per_viewer(client, product):
+    url = reverse("products:product_detail", args=[product.pk])
+    client.get(url)
+
+    shopper = Client()
+    shopper.post(reverse("orders:add_to_cart", args=[product.pk]), {"quantity": 2})
+    shopper_html = shopper.get(url).content.decode()
+    guest_html = client.get(url).content.decode()
+
+    assert "View Cart (2)" in shopper_html and "Added Phone Mount to your cart." in shopper_html
+    assert "Your cart is empty" in guest_html and "Added Phone Mount" not in guest_html
+    # Messages are consumed when shown
+    assert "Added Phone Mount" not in shopper.get(url).content.decode()
+
+    assert page_cache.CSRF_PLACEHOLDER not in shopper_html + guest_html
+    assert 'name="csrfmiddlewaretoken" value=""' not in guest_html
+    assert shopper.cookies["csrftoken"].value != client.cookies["csrftoken"].value
+
+
+@pytest.mark.django_db
+def test_catalogue_writes_invalidate_cached_pages(client, product, django_capture_on_commit_callbacks):
+    list_url = reverse("products:product_list")
+    detail_url = reverse("products:product_detail", args=[product.pk])
+    client.get(list_url)
+    client.get(detail_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.name = "Windscreen Mount"
+        product.save()
+    assert "Windscreen Mount" in client.get(list_url).content.decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Review.objects.create(user=User.objects.create_user("rev"), product=product, rating=5, comment="Solid")
+    assert "Solid" in client.get(detail_url).content.decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(name="Cleaning", slug="cleaning")
+    assert client.get(list_url)["X-Page-Cache"] == "miss"
+
+
+@pytest.mark.django_db
+def test_signed_in_users_and_unknown_params_bypass_the_cache(client, product, settings):
+    url = reverse("products:product_list")
+    client.get(url)
+
+    assert "X-Page-Cache" not in client.get(url, {"foo": "1"})
+
+    client.force_login(User.objects.create_user("member"))
+    assert "X-Page-Cache" not in client.get(url)
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+    assert "X-Page-Cache" not in Client().get(url)
+
+
+@pytest.mark.django_db
+def test_catalogue_version_is_shared_between_workers(client, product):
+    list_url = reverse("products:product_list")
+    client.get(list_url)
+    before = page_cache.catalogue_version()
+
+    # Another worker's write: this process's cache never sees a bump
+    page_cache.bump_catalogue_version()
+
+    assert page_cache.catalogue_version() == before + 1
+    assert client.get(list_url)["X-Page-Cache"] == "miss"
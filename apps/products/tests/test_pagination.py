@@ -0,0 +1,112 @@
+"""
+Tests for keyset (cursor) pagination (apps.products.pagination) and the
+product list's cursor mode.
+Located at apps/products/tests/test_pagination.py
+"""
+
+import re
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.products.models import Category, Product, ProductType
+from apps.products.pagination import CursorPaginator
+
+
+@pytest.fixture
+def many_products(db):
+    cat = Category.objects.create(name="Accessories", slug="accessories")
+    ptype = ProductType.objects.create(name="Mount")
+    Product.objects.bulk_create([
+        # Only five distinct prices, so every page boundary falls inside a tie
+        Product(name=f"Item {i}", slug=f"item-{i}", variant="V", description="x", type=ptype, tier="Standard",
+                category=cat, price=Decimal("5.00") + i % 5, stock=1, sku=f"SKU-{i}", product_code=f"PC-{i}")
+        for i in range(23)
+    ])
+    return Product.objects.all()
+
+
+def _walk(qs, per_page):
+    paginator = CursorPaginator(qs, per_page)
+    page = paginator.page()
+    pages = [[p.id for p in page]]
+    while page.has_next():
+        page = paginator.page(page.next_cursor)
+        pages.append([p.id for p in page])
+    return paginator, page, pages
+
+
+@pytest.mark.parametrize("ordering", [("id",), ("price", "id"), ("-price", "id")])
+def test_cursor_pages_match_offset_order_both_ways(many_products, ordering):
+    qs = many_products.order_by(*ordering)
+    expected = list(qs.values_list("id", flat=True))
+
+    paginator, last, pages = _walk(qs, 5)
+    assert [i for page in pages for i in page] == expected
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+
+    # And back again from the last page
+    page, backwards = last, []
+    while page.has_previous():
+        page = paginator.page(page.previous_cursor)
+        backwards.append([p.id for p in page])
+    assert backwards == pages[-2::-1]
+
+
+def test_deep_pages_cost_the_same_as_the_first(many_products):
+    qs = many_products.order_by("-price", "id")
+    paginator = CursorPaginator(qs, 5)
+    page = paginator.page()
+    counts = []
+    while page.has_next():
+        with CaptureQueriesContext(connection) as ctx:
+            page = paginator.page(page.next_cursor)
+        counts.append(len(ctx.captured_queries))
+        assert not any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+        assert "OFFSET" not in ctx.captured_queries[0]["sql"].upper()
+
+    assert counts == [1, 1, 1, 1]
+
+
+def test_bad_or_foreign_cursors_start_from_the_first_page(many_products):
+    by_price = CursorPaginator(many_products.order_by("price", "id"), 5)
+    first_ids = [p.id for p in by_price.page()]
+    cursor = by_price.page().next_cursor
+
+    assert [p.id for p in by_price.page(cursor[:-3] + "abc")] == first_ids
+    assert [p.id for p in CursorPaginator(many_products.order_by("id"), 5).page(cursor)] == list(
+        many_products.order_by("id").values_list("id", flat=True)[:5]
+    )
+
+
+def test_cursors_are_stable_urls(many_products, monkeypatch):
+    paginator = CursorPaginator(many_products.order_by("price", "id"), 5)
+    cursor = paginator.page().next_cursor
+
+    # No timestamp: the same position signs the same way at any time
+    monkeypatch.setattr("time.time", lambda: 4102444800)
+    assert paginator.page().next_cursor == cursor
+
+
+def test_ordering_must_end_with_the_primary_key(many_products):
+    with pytest.raises(ValueError):
+        CursorPaginator(many_products.order_by("price"), 5)
+
+
+@pytest.mark.django_db
+def test_product_list_cursor_mode(client, many_products, settings):
+    settings.PRODUCT_LIST_CURSOR_PAGINATION = True
+    url = reverse("products:product_list")
+
+    resp = client.get(url, {"sort": "price_desc"})
+    seen = [p.name for p in resp.context["products"]]
+    while resp.context["page_obj"].has_next():
+        next_href = re.search(r'href="(\?[^"]*cursor=[^"]*)" aria-label="Next"', resp.content.decode()).group(1)
+        assert "sort=price_desc" in next_href
+        resp = client.get(url + next_href.replace("&amp;", "&"))
+        seen.extend(p.name for p in resp.context["products"])
+
+    assert seen == [p.name for p in many_products.order_by("-price", "-id")]
+    assert resp.context["cursor_mode"] is True
@@ -1,12 +1,16 @@
 """
 Tests for the Product list view with filtering, sorting,
-searching, and pagination.
+searching, and pagination, and review stats read without
+per-card queries.
 Located at apps/products/tests/test_product_list_view.py
 """
 
 import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from apps.products.models import Category, ProductType, Product
+from apps.products.models import Category, ProductType, Product, Review
 
 
 @pytest.fixture
@@ -92,3 +96,33 @@ def test_list_pagination_with_invalid_page_falls_back(client, cat_a, ptype):
     assert resp_over.status_code == 200
     # fallback to page 1 again per the view
     assert len(resp_over.context["products"]) == 20
+
+
+@pytest.mark.django_db
+def test_list_review_stats_do_not_query_per_card(client, cat_a, ptype, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    reviewers = [User.objects.create_user(f"r{i}") for i in range(2)]
+
+    def add_products(start, count):
+        for i in range(start, start + count):
+            p = Product.objects.create(
+                name=f"Rated {i}", variant="V", description="x", type=ptype, tier="Standard",
+                category=cat_a, price=5, stock=1, sku=f"SKU-R{i}", product_code=f"PC-R{i}",
+            )
+            for rating, reviewer in zip((5, 2), reviewers):
+                Review.objects.create(user=reviewer, product=p, rating=rating, comment="")
+
+    def page_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(reverse("products:product_list"))
+        return resp, len(ctx.captured_queries)
+
+    add_products(0, 2)
+    _, few = page_queries()
+    add_products(2, 8)
+    resp, many = page_queries()
+
+    assert few == many
+    card = resp.context["products"][0]
+    assert card.review_count() == 2
+    assert float(card.average_rating()) == 3.5
@@ -0,0 +1,96 @@
+"""
+Tests for the stored rating summary on Product and Bundle.
+Covers incremental updates on review create/update/delete (model and
+staff views), the derived average, and the rebuild_rating_summaries
+command's drift check and repair.
+Located at apps/products/tests/test_rating_summary.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from apps.products.models import Bundle, Category, Product, ProductType, Review
+from apps.products.page_cache import catalogue_version
+
+
+@pytest.fixture
+def rated(db):
+    product = Product.objects.create(
+        name="Rated Mount", variant="V", description="x",
+        type=ProductType.objects.create(name="Mount"),
+        category=Category.objects.create(name="Accessories", slug="accessories"),
+        tier="Standard", price=5, stock=1, sku="S-RATE", product_code="C-RATE",
+    )
+    bundle = Bundle.objects.create(
+        name="Rated Kit", description="x", bundle_type="Standard", price=0,
+        subtotal_price=0, sku="B-RATE", bundle_code="bundle-rated-kit",
+    )
+    return product, bundle
+
+
+def _summary(obj):
+    obj.refresh_from_db()
+    return obj.rating_count, obj.rating_sum, obj.rating_average
+
+
+@pytest.mark.django_db
+def test_summary_tracks_create_update_and_delete(rated):
+    product, bundle = rated
+    alice, bob = User.objects.create_user("alice"), User.objects.create_user("bob")
+
+    first = Review.objects.create(user=alice, product=product, rating=5)
+    Review.objects.create(user=bob, product=product, rating=2)
+    assert _summary(product) == (2, 7, 3.5)
+
+    first.rating = 3
+    first.save()
+    assert _summary(product) == (2, 5, 2.5)
+
+    # Moving a review to another target updates both
+    first.product, first.bundle = None, bundle
+    first.save()
+    assert _summary(product) == (1, 2, 2.0)
+    assert _summary(bundle) == (1, 3, 3.0)
+
+    first.delete()
+    Review.objects.filter(product=product).delete()
+    assert _summary(product) == (0, 0, 0.0)
+    assert _summary(bundle) == (0, 0, 0.0)
+    assert product.average_rating() == 0
+
+
+@pytest.mark.django_db
+def test_staff_review_views_keep_summary_in_step(client, rated):
+    product, _ = rated
+    User.objects.create_user("admin", password="pw", is_staff=True)
+    review = Review.objects.create(user=User.objects.create_user("carol"), product=product, rating=1)
+    client.login(username="admin", password="pw")
+
+    client.post(reverse("products:review_update", kwargs={"review_id": review.id}), {"rating": 4, "comment": ""})
+    assert _summary(product) == (1, 4, 4.0)
+
+    client.post(reverse("products:review_delete", kwargs={"review_id": review.id}))
+    assert _summary(product) == (0, 0, 0.0)
+
+
+@pytest.mark.django_db
+def test_rebuild_command_detects_and_repairs_drift(rated, capsys):
+    product, bundle = rated
+    Review.objects.create(user=User.objects.create_user("dave"), bundle=bundle, rating=4)
+    call_command("rebuild_rating_summaries", "--check")
+
+    Product.objects.filter(pk=product.pk).update(rating_count=3, rating_sum=12)
+    with pytest.raises(CommandError) as exc:
+        call_command("rebuild_rating_summaries", "--check")
+    assert exc.value.returncode == 1
+    assert _summary(product) == (3, 12, 4.0)
+
+    card_version, version = Product.objects.get(pk=product.pk).card_version, catalogue_version()
+    call_command("rebuild_rating_summaries")
+    assert _summary(product) == (0, 0, 0.0)
+    assert _summary(bundle) == (1, 4, 4.0)
+    assert "Rebuilt 1 rating summaries." in capsys.readouterr().out
+    # Cached cards and pages pick up the repaired ratings
+    assert product.card_version == card_version + 1
+    assert catalogue_version() == version + 1
@@ -7,6 +7,8 @@ Located at apps/products/tests/test_reviews_frontend.py
 """
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from apps.products.models import Product, Bundle, Category, ProductType, Review
@@ -202,3 +204,80 @@ def test_admin_controls_visible_only_for_staff(client, product, user, staff):
     resp2 = client.get(url)
     assert resp2.status_code == 200
     assert all(get(resp2.content, frag) for frag in [f"reviews/{r.id}/edit", f"reviews/{r.id}/delete"])
+
+
+def _seed_reviews(product, count):
+    start = User.objects.count()
+    users = User.objects.bulk_create([User(username=f"reviewer{start + i}") for i in range(count)])
+    return [Review.objects.create(user=u, product=product, rating=4, comment=f"Review #{i}") for i, u in enumerate(users)]
+
+
+@pytest.mark.django_db
+def test_product_reviews_are_paged_newest_first_with_load_more(client, product, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    _seed_reviews(product, 23)
+    url = reverse("products:product_detail", kwargs={"pk": product.id})
+
+    resp = client.get(url)
+    shown = [r.comment for r in resp.context["reviews"]]
+    assert shown == [f"Review #{i}" for i in range(22, 12, -1)]
+    assert get(resp.content, 'data-load-more-reviews="%s"' % reverse("products:product_reviews", args=[product.id]))
+
+    cursor, loaded = resp.context["reviews"].next_cursor, []
+    while cursor:
+        data = client.get(reverse("products:product_reviews", args=[product.id]), {"cursor": cursor}).json()
+        loaded.append(data["html"])
+        cursor = data["next"]
+    assert len(loaded) == 2
+    assert "Review #3" in loaded[0] and "Review #0" in loaded[1] and "Review #13" not in "".join(loaded)
+
+    # Without JavaScript the button is a plain link to the next page
+    resp = client.get(url, {"reviews": resp.context["reviews"].next_cursor})
+    assert [r.comment for r in resp.context["reviews"]][0] == "Review #12"
+    assert get(resp.content, "Newer reviews")
+
+
+@pytest.mark.django_db
+def test_detail_queries_do_not_grow_with_reviews(client, product, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    url = reverse("products:product_detail", kwargs={"pk": product.id})
+    _seed_reviews(product, 2)
+    client.get(url)  # builds the category tree
+    with CaptureQueriesContext(connection) as few:
+        client.get(url)
+
+    Review.objects.all().delete()
+    _seed_reviews(product, 40)
+    with CaptureQueriesContext(connection) as many:
+        client.get(url)
+
+    # The catalogue version and updated_at for the validators, the product
+    # (with its type, category and subcategory) and one page of reviews
+    assert len(few.captured_queries) == len(many.captured_queries) == 4
+
+
+@pytest.mark.django_db
+def test_user_review_comes_from_the_loaded_page_when_possible(client, user, product, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    Review.objects.create(user=user, product=product, rating=5, comment="Mine")
+    client.login(username="alice", password="pw")
+    url = reverse("products:product_detail", kwargs={"pk": product.id})
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(url)
+    assert resp.context["user_review"].comment == "Mine"
+    # The page query is the only review query
+    assert sum('FROM "products_review"' in q["sql"] for q in ctx.captured_queries) == 1
+
+    # Older than the first page: looked up separately
+    _seed_reviews(product, 12)
+    resp = client.get(url)
+    assert "Mine" not in [r.comment for r in resp.context["reviews"]]
+    assert get(resp.content, "You have already submitted a review.")
+
+
+@pytest.mark.django_db
+def test_review_endpoints_404_for_missing_parents(client, product, bundle):
+    assert client.get(reverse("products:product_reviews", args=[product.id + 1000])).status_code == 404
+    assert client.get(reverse("products:bundle_reviews", args=[bundle.id + 1000])).status_code == 404
+    assert client.get(reverse("products:product_reviews", args=[product.id])).status_code == 200
@@ -0,0 +1,101 @@
+"""
+Tests for catalogue search (apps.products.search).
+Full-text ranking and prefix matching run on PostgreSQL only; elsewhere
+the icontains fallback is checked.
+Located at apps/products/tests/test_search.py
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.products.models import Bundle, Category, Product, ProductType
+from apps.products.search import parse_query, prefix_tsquery, search_bundles, search_enabled, search_products
+
+postgres_only = pytest.mark.skipif(connection.vendor != "postgresql", reason="full-text search needs PostgreSQL")
+
+
+@pytest.fixture
+def catalogue(db):
+    cat = Category.objects.create(name="Accessories", slug="accessories")
+    mount = ProductType.objects.create(name="Mount")
+    charger = ProductType.objects.create(name="Charger")
+    products = [
+        Product.objects.create(name="Phone Mount", variant="Vent", description="x", type=mount, tier="Standard",
+                               category=cat, price=5, stock=1, sku="S-1", product_code="ACC-001"),
+        Product.objects.create(name="Dash Mount Phone Holder", variant="Dash", description="x", type=mount,
+                               tier="Pro", category=cat, price=9, stock=1, sku="S-2", product_code="ACC-002"),
+        Product.objects.create(name="Fast Charger", variant="USB-C", description="x", type=charger,
+                               tier="Standard", category=cat, price=12, stock=1, sku="S-3", product_code="ACC-003"),
+    ]
+    bundle = Bundle.objects.create(name="Road Trip Kit", description="<p>Phone <b>chargers</b> and more</p>",
+                                   bundle_type="Standard", price=0, subtotal_price=0, sku="B-1",
+                                   bundle_code="bundle-road-trip")
+    return products, bundle
+
+
+def test_prefix_tsquery_sanitises_terms():
+    assert parse_query("  ") is None
+    assert prefix_tsquery("Pho mou_nt!") == "pho:* & mou:* & nt:*"
+    assert prefix_tsquery("'a' | !b") == "a:* & b:*"
+
+
+@pytest.mark.django_db
+def test_fallback_search_matches_name_variant_and_type(catalogue):
+    if search_enabled():
+        pytest.skip("fallback path is for non-PostgreSQL databases")
+    products, bundle = catalogue
+
+    assert list(search_products(Product.objects.all(), "mount")) == products[:2]
+    assert list(search_products(Product.objects.all(), "usb")) == [products[2]]
+    assert list(search_bundles(Bundle.objects.all(), "chargers")) == [bundle]
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_full_text_search_is_ranked_and_prefix_matched(catalogue):
+    products, bundle = catalogue
+
+    assert list(search_products(Product.objects.all(), "pho mou")) == [products[0], products[1]]
+    assert list(search_products(Product.objects.all(), "acc-003")) == [products[2]]
+    # HTML tags in the description are not indexed
+    assert list(search_bundles(Bundle.objects.all(), "charg")) == [bundle]
+    assert not search_bundles(Bundle.objects.all(), "strong").exists()
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_renaming_a_product_type_reindexes_its_products(catalogue):
+    products, _ = catalogue
+    mount = products[0].type
+    mount.name = "Cradle"
+    mount.save()
+
+    assert list(search_products(Product.objects.all(), "cradle")) == products[:2]
+
+
+@pytest.mark.django_db
+def test_list_views_use_search(client, catalogue):
+    products, bundle = catalogue
+
+    resp = client.get(reverse("products:product_list") + "?q=charger")
+    bundles = client.get(reverse("products:bundle_list") + "?q=road")
+
+    assert list(resp.context["products"]) == [products[2]]
+    assert list(bundles.context["bundles"]) == [bundle]
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_saving_a_product_does_not_load_its_type(catalogue):
+    products, _ = catalogue
+    product = Product.objects.get(pk=products[2].pk)
+    product.variant = "Lightning"
+
+    with CaptureQueriesContext(connection) as ctx:
+        product.save()
+
+    # The type name is read by a subquery inside the UPDATE, not a separate SELECT
+    assert not [q for q in ctx.captured_queries
+                if q["sql"].startswith("SELECT") and '"products_producttype"' in q["sql"]]
+    assert list(search_products(Product.objects.all(), "charger light")) == [products[2]]
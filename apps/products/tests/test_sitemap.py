@@ -1,16 +1,23 @@
 """
-Tests for the sitemap.xml and robots.txt endpoints.
+Tests for the sitemap.xml and robots.txt endpoints, rendered on demand
+and served from the precomputed files written by build_sitemaps.
 Located at apps/products/tests/test_sitemap.py
 """
 
+import gzip
 import xml.etree.ElementTree as ET
 from decimal import Decimal
+from io import StringIO
 from urllib.parse import urlparse
 
 import pytest
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse, NoReverseMatch
 
+from apps.products import sitemap_files
 from apps.products.models import Category, ProductType, Product, Bundle
+from apps.products.sitemaps import SITEMAPS
 
 pytestmark = pytest.mark.django_db
 
@@ -49,10 +56,11 @@ def test_products_sitemap_has_urls(client):
     try:
         url = reverse("sitemap_section", kwargs={"section": "products"})
         resp = client.get(url)
+        body = b"".join(resp.streaming_content)  # sections are streamed
         print("SECTION URL:", url, "status:", resp.status_code, "CT:", resp.get("Content-Type"))
-        print(resp.content.decode()[:1500])
+        print(body.decode()[:1500])
         assert resp.status_code == 200
-        root = ET.fromstring(resp.content)
+        root = ET.fromstring(body)
         assert _local(root) == "urlset"
     except NoReverseMatch:
         # Fall back to index then follow the products section
@@ -89,3 +97,130 @@ def test_robots_points_to_sitemap(client):
     body = resp.content.decode()
     assert "Sitemap:" in body
     assert reverse("sitemap") in body
+
+
+@pytest.fixture
+def precomputed(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.SITEMAP_PRECOMPUTED = True
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+def _build(**kwargs):
+    out = StringIO()
+    call_command("build_sitemaps", "--base-url", "https://example.com", stdout=out, **kwargs)
+    return out.getvalue()
+
+
+def test_build_writes_sharded_gzipped_files(client, precomputed, django_assert_num_queries):
+    p, b = _seed_minimum()
+    Product.objects.create(
+        name="Y", variant="V", description="d", type=p.type, tier="Standard", category=p.category,
+        price=Decimal("1.00"), stock=1, sku="S2", product_code="C2",
+    )
+    _build(shard_size=1)
+
+    with django_assert_num_queries(0):
+        resp = client.get(reverse("sitemap"), HTTP_ACCEPT_ENCODING="gzip, br")
+    assert resp["Content-Encoding"] == "gzip" and "Accept-Encoding" in resp["Vary"]
+    locs = _locs(ET.fromstring(gzip.decompress(b"".join(resp.streaming_content))))
+    assert "https://example.com/sitemap-products-1.xml" in locs
+    assert "https://example.com/sitemap-products-2.xml" in locs
+
+    # Clients without gzip get plain XML
+    shard = client.get(urlparse(locs[0]).path)
+    assert not shard.has_header("Content-Encoding")
+    root = ET.fromstring(b"".join(shard.streaming_content))
+    assert _locs(root) == ["https://example.com" + reverse("products:product_detail", kwargs={"pk": p.pk})]
+
+    assert client.get("/sitemap-products-9.xml").status_code == 404
+
+
+def test_rendered_on_demand_until_first_build(client, precomputed):
+    _seed_minimum()
+    resp = client.get(reverse("sitemap_section", kwargs={"section": "products"}), HTTP_ACCEPT_ENCODING="gzip")
+    assert resp.status_code == 200 and not resp.has_header("Content-Encoding")
+    assert _locs(ET.fromstring(b"".join(resp.streaming_content)))
+
+
+def test_if_stale_rebuilds_only_after_catalogue_writes(precomputed, django_capture_on_commit_callbacks):
+    p, _ = _seed_minimum()
+    assert "Built sitemaps" in _build(if_stale=True)
+    assert "up to date" in _build(if_stale=True)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        p.name = "Renamed"
+        p.save()
+    # The scheduler runs in another process, with none of this one's cache
+    cache.clear()
+    assert "Built sitemaps" in _build(if_stale=True)
+    assert "up to date" in _build(if_stale=True)
+
+
+def test_workers_follow_builds_made_elsewhere(client, precomputed):
+    _seed_minimum()
+    _build()
+    assert client.get(reverse("sitemap"), HTTP_ACCEPT_ENCODING="gzip").status_code == 200
+    stale = cache.get(sitemap_files.CURRENT_BUILD_KEY)
+
+    # Two rebuilds by the scheduler remove the build this worker has cached
+    _build()
+    _build()
+    cache.set(sitemap_files.CURRENT_BUILD_KEY, stale, sitemap_files.POINTER_TTL)
+
+    assert client.get(reverse("sitemap"), HTTP_ACCEPT_ENCODING="gzip").status_code == 200
+    assert client.get("/sitemap-products-1.xml").status_code == 200
+    assert cache.get(sitemap_files.CURRENT_BUILD_KEY) != stale
+
+
+def test_unsharded_section_urls_serve_their_shards(client, precomputed):
+    p, _ = _seed_minimum()
+    Product.objects.create(
+        name="Y", variant="V", description="d", type=p.type, tier="Standard", category=p.category,
+        price=Decimal("1.00"), stock=1, sku="S2", product_code="C2",
+    )
+    _build(shard_size=1)
+
+    def body(path):
+        return b"".join(client.get(path).streaming_content)
+
+    assert body("/sitemap-products.xml") == body("/sitemap-products-1.xml")
+    assert body("/sitemap-products.xml?p=2") == body("/sitemap-products-2.xml")
+    assert client.get("/sitemap-products.xml?p=3").status_code == 404
+    assert client.get("/sitemap-products.xml?p=x").status_code == 404
+    # Empty sections still have their first shard
+    ProductType.objects.all().delete()
+    _build()
+    assert client.get("/sitemap-product_types.xml").status_code == 200
+
+
+def test_pointer_is_replaced_without_a_gap(precomputed, monkeypatch):
+    _seed_minimum()
+    _build()
+    deleted = []
+    monkeypatch.setattr(sitemap_files.default_storage, "delete", lambda name: deleted.append(name))
+
+    build = sitemap_files.build_sitemaps(SITEMAPS, "https://example.com")
+
+    assert sitemap_files.POINTER_FILE not in deleted
+    assert sitemap_files._read_pointer()[0] == build
+
+
+def test_section_streams_in_chunked_queries(client, django_assert_num_queries):
+    p, b = _seed_minimum()
+    url = reverse("sitemap_section", kwargs={"section": "bundles"})
+
+    resp = client.get(url)
+    assert resp.streaming and resp["Content-Type"] == "application/xml"
+    # Nothing is read until the body is consumed, then one bulk query
+    with django_assert_num_queries(1):
+        root = ET.fromstring(b"".join(resp.streaming_content))
+    url_el = root.find("sm:url", NS)
+    assert url_el.find("sm:loc", NS).text.endswith(reverse("products:bundle_detail", args=[b.pk]))
+    assert url_el.find("sm:lastmod", NS).text == b.updated_at.isoformat()
+
+    assert not _locs(ET.fromstring(b"".join(client.get(url, {"p": 2}).streaming_content)))
+    assert client.get(url, {"p": "x"}).status_code == 404
+    assert client.get(reverse("sitemap_section", kwargs={"section": "nope"})).status_code == 404
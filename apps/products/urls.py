@@ -8,8 +8,11 @@ app_name = 'products'
 urlpatterns = [
     path('', views.product_list_view, name='product_list'),
     path('<int:pk>/', views.product_detail_view, name='product_detail'),
+    path('<int:pk>/reviews/', views.product_reviews_view, name='product_reviews'),
+    path('autocomplete/', views.autocomplete_view, name='autocomplete'),
     path('bundles/', views.bundle_list_view, name='bundle_list'),
     path('bundles/<int:bundle_id>/', views.bundle_detail_view, name='bundle_detail'),
+    path('bundles/<int:bundle_id>/reviews/', views.bundle_reviews_view, name='bundle_reviews'),
     path("reviews/<int:review_id>/edit/", views.review_update_view, name="review_update"),
     path("reviews/<int:review_id>/delete/", views.review_delete_view, name="review_delete"),
 ]
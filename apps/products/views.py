@@ -4,15 +4,29 @@ and filtering in the e-commerce application.
 Located at apps/products/views.py
 """
 
+from django.conf import settings
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Q
-from .models import Product, Bundle, Category, Review
+from django.db.models import Max
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
+from . import autocomplete
+from .models import Product, Bundle, Review
+from .page_cache import cache_anonymous_page
+from .conditional import conditional_page
 from .forms import ReviewForm
+from .pagination import CursorPaginator
+from .reviews import find_user_review, review_page
+from .search import search_bundles, search_products
 
 
+@conditional_page()
+@cache_anonymous_page(params=("category", "tier", "sort", "q", "page", "cursor"))
 def product_list_view(request):
     # 1) Read all query-params
     category_slug = request.GET.get("category")
@@ -24,13 +38,9 @@ def product_list_view(request):
     # 2) Base queryset
     qs = Product.objects.filter(is_draft=False)
 
-    # 3) Search filter
+    # 3) Search filter (ranked full-text on PostgreSQL)
     if search_q:
-        qs = qs.filter(
-            Q(name__icontains=search_q) |
-            Q(variant__icontains=search_q) |
-            Q(type__name__icontains=search_q)
-        )
+        qs = search_products(qs, search_q)
 
     # 4) Category filter
     if category_slug:
@@ -40,26 +50,34 @@ def product_list_view(request):
     if tier_param in ("Standard", "Pro"):
         qs = qs.filter(tier=tier_param)
 
-    # 6) Price sort
+    # 6) Price / rating sort (always ending in id, so cursors have a unique
+    # key; each one matches an index in Product.Meta)
     if sort_param == "price_asc":
-        qs = qs.order_by("price")
+        qs = qs.order_by("price", "id")
     elif sort_param == "price_desc":
-        qs = qs.order_by("-price")
-    else:
-        qs = qs.order_by("id")
+        qs = qs.order_by("-price", "-id")
+    elif sort_param == "rating":
+        qs = qs.order_by("-rating_average", "-rating_count", "id")
+    elif not search_q:
+        qs = qs.order_by("id")  # search results stay in relevance order
 
-    # 7) Paginate (20 per page)
-    paginator = Paginator(qs, 20)
-    try:
-        page_obj = paginator.page(page_number)
-    except (PageNotAnInteger, EmptyPage):
-        page_obj = paginator.page(1)
+    # 7) Paginate (20 per page): numbered pages, or keyset cursors when
+    # enabled (or when following a cursor link), which skip COUNT and OFFSET
+    cursor_mode = settings.PRODUCT_LIST_CURSOR_PAGINATION or "cursor" in request.GET
+    if cursor_mode:
+        page_obj = CursorPaginator(qs, 20).page(request.GET.get("cursor"))
+    else:
+        paginator = Paginator(qs, 20)
+        try:
+            page_obj = paginator.page(page_number)
+        except (PageNotAnInteger, EmptyPage):
+            page_obj = paginator.page(1)
 
-    # 8) Build context
+    # 8) Build context (categories come from the all_categories context processor)
     context = {
         "products":         page_obj.object_list,
         "page_obj":         page_obj,
-        "categories":       Category.objects.all(),
+        "cursor_mode":      cursor_mode,
         "selected_category": category_slug,
         "selected_tier":    tier_param,
         "selected_sort":    sort_param,
@@ -70,41 +88,45 @@ def product_list_view(request):
     return render(request, "products/product_list.html", context)
 
 
+def _product_last_modified(request, pk):
+    return Product.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+
+
+@conditional_page(last_modified=_product_last_modified)
+@cache_anonymous_page(params=("reviews",))
 def product_detail_view(request, pk):
-    product = get_object_or_404(Product, pk=pk)
-    reviews = product.reviews.select_related('user').all()
-    user_review = None
+    product = get_object_or_404(Product.objects.select_related('type', 'category', 'subcategory'), pk=pk)
+    reviews = review_page(product.reviews.all(), request.GET.get('reviews'))
+    user_review = find_user_review(product.reviews.all(), reviews, request.user)
     review_form = None
 
-    if request.user.is_authenticated:
-        # .get() can raise MultipleObjectsReturned if duplicates ever slip in; safer:
-        user_review = product.reviews.filter(user=request.user).first()
-
-        if not user_review:
-            if request.method == "POST":
-                # Pre-bind instance so Model.clean sees product+user
-                instance = Review(product=product, user=request.user)
-                review_form = ReviewForm(request.POST, instance=instance)
-                if review_form.is_valid():
-                    review_form.save()
-                    messages.success(request, "Your review has been submitted.")
-                    from django.urls import reverse
-                    return redirect(reverse('products:product_detail', kwargs={'pk': product.id}) + '#reviews')
-            else:
-                review_form = ReviewForm()
+    if request.user.is_authenticated and not user_review:
+        if request.method == "POST":
+            # Pre-bind instance so Model.clean sees product+user
+            instance = Review(product=product, user=request.user)
+            review_form = ReviewForm(request.POST, instance=instance)
+            if review_form.is_valid():
+                review_form.save()
+                messages.success(request, "Your review has been submitted.")
+                return redirect(reverse('products:product_detail', kwargs={'pk': product.id}) + '#reviews')
+        else:
+            review_form = ReviewForm()
 
     context = {
         'product': product,
         'reviews': reviews,
+        'reviews_url': reverse('products:product_reviews', kwargs={'pk': product.id}),
         'user_review': user_review,
         'review_form': review_form,
     }
     return render(request, 'products/product_detail.html', context)
 
 
+@conditional_page()
+@cache_anonymous_page(params=("type", "sort", "q", "page"))
 def bundle_list_view(request):
     bundle_type = request.GET.get('type')  # e.g. "Standard", "Pro", "Special"
-    sort_param = request.GET.get('sort')  # "price_asc" or "price_desc"
+    sort_param = request.GET.get('sort')  # "price_asc", "price_desc" or "rating"
     search_q = request.GET.get('q', '').strip()  # navbar search query
 
     # 1) Base queryset & type filter
@@ -112,22 +134,32 @@ def bundle_list_view(request):
     if bundle_type in ["Standard", "Pro", "Special"]:
         qs = qs.filter(bundle_type=bundle_type)
 
-    # 2) Global navbar search
+    # 2) Global navbar search (ranked full-text on PostgreSQL)
     if search_q:
-        qs = qs.filter(
-            Q(name__icontains=search_q) |
-            Q(description__icontains=search_q)
-        )
+        qs = search_bundles(qs, search_q)
 
-    # 3) Price sorting
+    # 3) Price / rating sorting
     if sort_param == "price_asc":
-        qs = qs.order_by("price")
+        qs = qs.order_by("price", "id")
     elif sort_param == "price_desc":
-        qs = qs.order_by("-price")
+        qs = qs.order_by("-price", "-id")
+    elif sort_param == "rating":
+        qs = qs.order_by("-rating_average", "-rating_count", "id")
+    elif not search_q:
+        qs = qs.order_by("id")  # search results stay in relevance order
+
+    # 4) Paginate (20 per page); cards (and their product thumbnails) come
+    # from the fragment cache, see apps/products/cards.py
+    paginator = Paginator(qs, 20)
+    try:
+        page_obj = paginator.page(request.GET.get('page', 1))
+    except (PageNotAnInteger, EmptyPage):
+        page_obj = paginator.page(1)
 
-    # 4) Build context
+    # 5) Build context
     context = {
-        'bundles': qs,
+        'bundles': page_obj.object_list,
+        'page_obj': page_obj,
         'active_filter': bundle_type,
         'selected_sort': sort_param,
         'search_q': "",   # clears the search input after submit
@@ -136,30 +168,37 @@ def bundle_list_view(request):
     return render(request, 'products/bundle_list.html', context)
 
 
+def _bundle_last_modified(request, bundle_id):
+    # The page also shows the bundle's products
+    changed = Bundle.objects.filter(pk=bundle_id).aggregate(
+        bundle=Max('updated_at'), products=Max('products__updated_at'),
+    )
+    return max(filter(None, changed.values()), default=None)
+
+
+@conditional_page(last_modified=_bundle_last_modified)
+@cache_anonymous_page(params=("reviews",))
 def bundle_detail_view(request, bundle_id):
     bundle = get_object_or_404(Bundle, id=bundle_id)
-    reviews = bundle.reviews.select_related('user').all()
-    user_review = None
+    reviews = review_page(bundle.reviews.all(), request.GET.get('reviews'))
+    user_review = find_user_review(bundle.reviews.all(), reviews, request.user)
     review_form = None
 
-    if request.user.is_authenticated:
-        user_review = bundle.reviews.filter(user=request.user).first()
-
-        if not user_review:
-            if request.method == "POST":
-                instance = Review(bundle=bundle, user=request.user)
-                review_form = ReviewForm(request.POST, instance=instance)
-                if review_form.is_valid():
-                    review_form.save()
-                    messages.success(request, "Your review has been submitted.")
-                    from django.urls import reverse
-                    return redirect(reverse('products:bundle_detail', kwargs={'bundle_id': bundle.id}) + '#reviews')
-            else:
-                review_form = ReviewForm()
+    if request.user.is_authenticated and not user_review:
+        if request.method == "POST":
+            instance = Review(bundle=bundle, user=request.user)
+            review_form = ReviewForm(request.POST, instance=instance)
+            if review_form.is_valid():
+                review_form.save()
+                messages.success(request, "Your review has been submitted.")
+                return redirect(reverse('products:bundle_detail', kwargs={'bundle_id': bundle.id}) + '#reviews')
+        else:
+            review_form = ReviewForm()
 
     context = {
         'bundle': bundle,
         'reviews': reviews,
+        'reviews_url': reverse('products:bundle_reviews', kwargs={'bundle_id': bundle.id}),
         'user_review': user_review,
         'review_form': review_form,
     }
@@ -196,3 +235,42 @@ def review_delete_view(request, review_id):
         return redirect('products:bundle_detail', bundle_id=bid)
     # simple confirm page (optional)
     return render(request, "products/review_confirm_delete.html", {"review": review})
+
+
+@require_GET
+@cache_control(public=True, max_age=60)
+def autocomplete_view(request):
+    """
+    JSON suggestions for the navbar search box, served from the in-process
+    prefix index (see apps/products/autocomplete.py).
+    """
+    q = request.GET.get("q", "").strip()
+    try:
+        limit = max(1, min(int(request.GET.get("limit", autocomplete.DEFAULT_LIMIT)), autocomplete.MAX_LIMIT))
+    except ValueError:
+        limit = autocomplete.DEFAULT_LIMIT
+    results = autocomplete.suggest(q, limit) if q else []
+    return JsonResponse({"q": q, "results": results})
+
+
+def _reviews_json(request, reviews):
+    """The next page of reviews as rendered list items, plus the cursor after it."""
+    page = review_page(reviews, request.GET.get('cursor'))
+    return JsonResponse({
+        "html": render_to_string("include/review_items.html", {"reviews": page}, request=request),
+        "next": page.next_cursor,
+    })
+
+
+@require_GET
+def product_reviews_view(request, pk):
+    """JSON "load more" endpoint for the product detail page's reviews."""
+    product = get_object_or_404(Product.objects.only('id'), pk=pk)
+    return _reviews_json(request, product.reviews.all())
+
+
+@require_GET
+def bundle_reviews_view(request, bundle_id):
+    """JSON "load more" endpoint for the bundle detail page's reviews."""
+    bundle = get_object_or_404(Bundle.objects.only('id'), id=bundle_id)
+    return _reviews_json(request, bundle.reviews.all())
@@ -33,7 +33,49 @@ if not DEBUG:
 hosts = config("ALLOWED_HOSTS", default="")
 ALLOWED_HOSTS = [h.strip() for h in hosts.split(",") if h.strip()]
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessions & cache
+# e.g. SESSION_ENGINE=django.contrib.sessions.backends.cached_db to serve
+# session reads from CACHES and only write through to the database.
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
+
+# Local-memory by default; point CACHE_BACKEND at FileBasedCache (with a
+# directory in CACHE_LOCATION) to share the cache between local processes.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='autovise'),
+    }
+}
+
+# Guest cart storage: session (default) or a signed cookie
+# ('apps.orders.utils.cart_storage.SignedCookieCartStorage').
+CART_STORAGE = config('CART_STORAGE', default='apps.orders.utils.cart_storage.SessionCartStorage')
+
+# Navbar search suggestions (apps/products/autocomplete.py): rebuild the
+# in-process prefix index at least this often, and optionally fall back to
+# pg_trgm fuzzy matches when a prefix has no hits (PostgreSQL only).
+AUTOCOMPLETE_INDEX_TTL = config('AUTOCOMPLETE_INDEX_TTL', default=900, cast=int)
+AUTOCOMPLETE_FUZZY = config('AUTOCOMPLETE_FUZZY', default=False, cast=bool)
+
+# Paginate the product list with keyset cursors (prev/next links, no COUNT
+# or OFFSET) instead of numbered pages. Cursor links work either way.
+PRODUCT_LIST_CURSOR_PAGINATION = config('PRODUCT_LIST_CURSOR_PAGINATION', default=False, cast=bool)
+
+# Rebuild the in-process category navigation tree (apps/products/navigation.py)
+# at least this often; category and product writes rebuild it sooner.
+CATEGORY_TREE_TTL = config('CATEGORY_TREE_TTL', default=300, cast=int)
+
+# Serve /sitemap.xml and its sections from gzipped files written by
+# `manage.py build_sitemaps` (apps/products/sitemap_files.py) instead of
+# rendering them per request; rendering is still used until the first build.
+SITEMAP_PRECOMPUTED = config('SITEMAP_PRECOMPUTED', default=False, cast=bool)
+SITEMAP_SHARD_SIZE = config('SITEMAP_SHARD_SIZE', default=50000, cast=int)
+
+# Cache anonymous catalogue pages for this many seconds (0 disables); see
+# apps/products/page_cache.py. Entries are also dropped on catalogue writes,
+# in every worker. With the default LocMem cache each worker holds its own
+# copy of each page.
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=300, cast=int)
 
 # Application Definition
 INSTALLED_APPS = [
@@ -47,6 +89,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sites',
     'django.contrib.sitemaps',
+    'django.contrib.postgres',
     # Allauth
     'allauth',
     'allauth.account',
@@ -72,6 +115,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.orders.middleware.CartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -6,19 +6,7 @@ from django.views.generic import TemplateView
 from apps.pages.views import home
 from apps.orders.views.webhook import stripe_webhook_view
 from config.views_sitemap import sitemap_index_xml, sitemap_section_xml
-from apps.products.sitemaps import (
-    ProductSitemap,
-    CategorySitemap,
-    ProductTypeSitemap,
-    BundleSitemap,
-)
-
-sitemaps = {
-    'products': ProductSitemap,
-    'categories': CategorySitemap,
-    'product_types': ProductTypeSitemap,
-    'bundles': BundleSitemap,
-}
+from apps.products.sitemaps import SITEMAPS as sitemaps
 
 urlpatterns = [
     # Homepage
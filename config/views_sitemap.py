@@ -1,13 +1,62 @@
+from itertools import islice
+
+from django.conf import settings
 from django.contrib.sitemaps import views as sitemaps_views
+from django.contrib.sites.shortcuts import get_current_site
+from django.http import Http404, StreamingHttpResponse
+from apps.products.sitemap_files import serve_sitemap_file
+from apps.products.sitemaps import urlset_xml
 
 
 def sitemap_index_xml(request, *args, **kwargs):
+    # Prebuilt files (manage.py build_sitemaps), once a build exists
+    if settings.SITEMAP_PRECOMPUTED:
+        resp = serve_sitemap_file(request, "sitemap.xml")
+        if resp is not None:
+            return resp
     resp = sitemaps_views.index(request, *args, **kwargs)
     resp["Content-Type"] = "application/xml"
     return resp
 
 
 def sitemap_section_xml(request, *args, **kwargs):
-    resp = sitemaps_views.sitemap(request, *args, **kwargs)
-    resp["Content-Type"] = "application/xml"
-    return resp
+    if settings.SITEMAP_PRECOMPUTED:
+        resp = serve_sitemap_file(request, _shard_name(request, kwargs["sitemaps"], kwargs["section"]))
+        if resp is not None:
+            return resp
+    return stream_sitemap_section(request, kwargs["sitemaps"], kwargs["section"])
+
+
+def _shard_name(request, sitemaps, section):
+    """
+    The prebuilt file for a section URL: shards are named
+    sitemap-<section>-<n>.xml, and the unsharded URLs (a section name,
+    optionally with ?p=N) map to shard N.
+    """
+    if section not in sitemaps:
+        return f"sitemap-{section}.xml"
+    page = request.GET.get("p", "1")
+    if not page.isdigit() or int(page) < 1:
+        raise Http404(f"No page '{page}'")
+    return f"sitemap-{section}-{int(page)}.xml"
+
+
+def stream_sitemap_section(request, sitemaps, section):
+    """
+    Render one section as it is read from the database, so memory stays
+    flat however many rows it has. Pages (?p=) follow Django's sitemap
+    limit, as linked from the index.
+    """
+    if section not in sitemaps:
+        raise Http404(f"No sitemap available for section: {section!r}")
+    sitemap = sitemaps[section]()
+    try:
+        page = int(request.GET.get("p", 1))
+    except ValueError:
+        raise Http404(f"No page '{request.GET['p']}'")
+    if page < 1:
+        raise Http404(f"No page '{page}'")
+
+    base_url = f"{sitemap.get_protocol(request.scheme)}://{sitemap.get_domain(get_current_site(request))}"
+    rows = islice(sitemap.rows(), (page - 1) * sitemap.limit, page * sitemap.limit)
+    return StreamingHttpResponse(urlset_xml(rows, base_url, sitemap), content_type="application/xml")
@@ -2,12 +2,19 @@
 
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from apps.products.models import (
     Product, Category, ProductType, Subcategory,
     Bundle, Tag
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Card fragments are keyed by pk, which the test database reuses
+    cache.clear()
+
+
 @pytest.fixture
 def user(db):
     return User.objects.create_user(username="testuser", password="pass")
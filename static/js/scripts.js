@@ -282,6 +282,7 @@ function updateFilterParam(key, value) {
     params.delete(key);
   }
   params.delete('page');
+  params.delete('cursor');
   window.location.search = params;
 }
 
@@ -314,3 +315,114 @@ document.addEventListener("click", async (e) => {
     }
   }
 });
+
+// Navbar search suggestions (products:autocomplete)
+(function initSearchSuggestions() {
+  const input = document.getElementById("nav-search");
+  const menu = document.getElementById("nav-search-suggestions");
+  if (!input || !menu || !input.dataset.autocompleteUrl) return;
+
+  const seen = new Map();  // prefix -> results, so backspacing is free
+  let controller = null;
+  let timer = null;
+  let active = -1;
+
+  function close() {
+    menu.classList.remove("show");
+    input.setAttribute("aria-expanded", "false");
+    active = -1;
+  }
+
+  function render(results) {
+    menu.replaceChildren(...results.map((item) => {
+      const li = document.createElement("li");
+      const link = document.createElement("a");
+      link.className = "dropdown-item";
+      link.href = item.url;
+      link.setAttribute("role", "option");
+      link.textContent = item.variant ? `${item.name} (${item.variant})` : item.name;
+      if (item.type === "bundle") {
+        const badge = document.createElement("span");
+        badge.className = "badge bg-secondary ms-2";
+        badge.textContent = "Bundle";
+        link.appendChild(badge);
+      }
+      li.appendChild(link);
+      return li;
+    }));
+    active = -1;
+    menu.classList.toggle("show", results.length > 0);
+    input.setAttribute("aria-expanded", results.length > 0 ? "true" : "false");
+  }
+
+  async function lookup(q) {
+    if (seen.has(q)) return render(seen.get(q));
+    if (controller) controller.abort();
+    controller = new AbortController();
+    try {
+      const url = `${input.dataset.autocompleteUrl}?q=${encodeURIComponent(q)}`;
+      const resp = await fetch(url, { signal: controller.signal, headers: { Accept: "application/json" } });
+      if (!resp.ok) return;
+      const data = await resp.json();
+      seen.set(q, data.results);
+      if (input.value.trim() === q) render(data.results);
+    } catch (err) {
+      if (err.name !== "AbortError") console.error("Search suggestions failed:", err);
+    }
+  }
+
+  input.addEventListener("input", () => {
+    const q = input.value.trim();
+    clearTimeout(timer);
+    if (!q) return close();
+    timer = setTimeout(() => lookup(q), 120);
+  });
+
+  input.addEventListener("keydown", (e) => {
+    const items = menu.querySelectorAll(".dropdown-item");
+    if (!menu.classList.contains("show") || !items.length) return;
+    if (e.key === "ArrowDown" || e.key === "ArrowUp") {
+      e.preventDefault();
+      active = (active + (e.key === "ArrowDown" ? 1 : -1) + items.length) % items.length;
+      items.forEach((el, i) => el.classList.toggle("active", i === active));
+    } else if (e.key === "Enter" && active >= 0) {
+      e.preventDefault();
+      window.location.href = items[active].href;
+    } else if (e.key === "Escape") {
+      close();
+    }
+  });
+
+  document.addEventListener("click", (e) => {
+    if (!menu.contains(e.target) && e.target !== input) close();
+  });
+})();
+
+// Review "Load more" (products:product_reviews / products:bundle_reviews);
+// without JS the button is a plain ?reviews=<cursor> link
+document.addEventListener("click", async (e) => {
+  const button = e.target.closest("[data-load-more-reviews]");
+  if (!button) return;
+  e.preventDefault();
+  if (button.classList.contains("disabled")) return;
+
+  const list = document.getElementById("review-list");
+  button.classList.add("disabled");
+  try {
+    const url = `${button.dataset.loadMoreReviews}?cursor=${encodeURIComponent(button.dataset.cursor)}`;
+    const resp = await fetch(url, { headers: { Accept: "application/json" } });
+    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+    const data = await resp.json();
+    list.insertAdjacentHTML("beforeend", data.html);
+    if (data.next) {
+      button.dataset.cursor = data.next;
+      button.href = `?reviews=${encodeURIComponent(data.next)}#reviews`;
+      button.classList.remove("disabled");
+    } else {
+      button.remove();
+    }
+  } catch (err) {
+    console.error("Loading reviews failed:", err);
+    window.location.href = button.href;
+  }
+});